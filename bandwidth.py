@@ -0,0 +1,222 @@
+"""
+전역 대역폭 관리
+- BandwidthManager: max_download_rate 총량을 실행 중 다운로드에 균등 분배하고
+  시작/종료/일시정지/재개/취소마다 재계산해 각 다운로더에 즉시 반영
+- TokenBucket: 실행 중 속도 변경이 가능한 토큰 버킷 (HTTP 직접 다운로드)
+- ProcessThrottle: 실행 중 속도 변경이 불가능한 외부 프로세스(ffmpeg, yt-dlp/aria2c)를
+  SIGSTOP/SIGCONT 듀티 사이클로 평균 속도 제한 (POSIX 전용)
+"""
+import os
+import signal
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Set
+
+try:
+    from .setup import P
+    logger = P.logger
+except:
+    import logging
+    logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """조정 가능한 토큰 버킷 (rate 0: 무제한)"""
+
+    def __init__(self, rate_bps: float = 0.0, burst_sec: float = 0.5):
+        self._lock = threading.Lock()
+        self._rate = max(0.0, float(rate_bps or 0))
+        self._burst_sec = burst_sec
+        self._tokens = 0.0
+        self._stamp = time.monotonic()
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+    def set_rate(self, rate_bps: float) -> None:
+        with self._lock:
+            self._refill()
+            self._rate = max(0.0, float(rate_bps or 0))
+            self._tokens = min(self._tokens, self._rate * self._burst_sec)
+
+    def consume(self, amount: int, should_stop: Optional[Callable[[], bool]] = None) -> None:
+        """amount 바이트만큼 토큰 차감, 부족하면 채워질 때까지 대기 (속도 변경 시 즉시 재계산)"""
+        with self._lock:
+            self._refill()
+            if self._rate <= 0:
+                return
+            self._tokens -= amount
+        while True:
+            with self._lock:
+                self._refill()
+                if self._rate <= 0 or self._tokens >= 0:
+                    return
+                wait = -self._tokens / self._rate
+            if should_stop and should_stop():
+                return
+            time.sleep(min(wait, 0.25))
+
+    def _refill(self) -> None:
+        # _lock 보유 상태에서 호출
+        now = time.monotonic()
+        if self._rate > 0:
+            self._tokens = min(self._tokens + (now - self._stamp) * self._rate, self._rate * self._burst_sec)
+        self._stamp = now
+
+
+class ProcessThrottle:
+    """
+    외부 프로세스 듀티 사이클 제한
+    - byte_source()로 누적 수신 바이트를 주기적으로 읽어 크레딧이 음수가 되면 SIGSTOP,
+      크레딧이 회복되면 SIGCONT
+    - group=True 이면 프로세스 그룹 전체(yt-dlp가 띄운 aria2c 포함)에 신호 전달
+      (Popen(start_new_session=True)로 띄운 경우)
+    """
+
+    INTERVAL = 0.2
+    BURST_SEC = 1.0
+
+    supported = hasattr(signal, 'SIGSTOP') and hasattr(os, 'killpg')
+
+    def __init__(self, byte_source: Callable[[], int], rate_bps: float = 0.0, group: bool = False):
+        self._byte_source = byte_source
+        self._rate = max(0.0, float(rate_bps or 0))
+        self._group = group
+        self._paused = False
+        self._process = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._stopped = False
+
+    def set_rate(self, rate_bps: float) -> None:
+        self._rate = max(0.0, float(rate_bps or 0))
+
+    def set_paused(self, paused: bool) -> None:
+        self._paused = paused
+        if self._process is not None:
+            self._signal(paused)
+
+    def start(self, process: Any) -> None:
+        self._process = process
+        if not self.supported:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, name='gdm-throttle', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """감시 종료 (정지 상태면 반드시 SIGCONT)"""
+        self._running = False
+        if self._process is not None:
+            self._signal(False)
+
+    def _loop(self) -> None:
+        credit = 0.0
+        last = time.monotonic()
+        prev = self._read_bytes()
+        while self._running and self._process.poll() is None:
+            time.sleep(self.INTERVAL)
+            now = time.monotonic()
+            current = self._read_bytes()
+            # 파일 전환(비디오→오디오 등)으로 누적값이 줄면 새 기준점
+            delta = current - prev if current >= prev else current
+            prev = current
+            elapsed, last = now - last, now
+
+            if self._paused:
+                self._signal(True)
+                continue
+            if self._rate <= 0:
+                credit = 0.0
+                self._signal(False)
+                continue
+            credit = min(credit + self._rate * elapsed, self._rate * self.BURST_SEC) - delta
+            self._signal(credit < 0)
+        self._signal(False)
+
+    def _read_bytes(self) -> int:
+        try:
+            return int(self._byte_source() or 0)
+        except Exception:
+            return 0
+
+    def _signal(self, stop: bool) -> None:
+        if not self.supported or stop == self._stopped or self._process is None:
+            return
+        if self._process.poll() is not None:
+            return
+        sig = signal.SIGSTOP if stop else signal.SIGCONT
+        try:
+            if self._group:
+                os.killpg(self._process.pid, sig)
+            else:
+                self._process.send_signal(sig)
+            self._stopped = stop
+        except Exception as e:
+            logger.debug(f'[GDM] throttle signal failed: {e}')
+
+
+class BandwidthManager:
+    """전역 속도 상한을 실행 중(일시정지 제외) 다운로드에 균등 분배"""
+
+    def __init__(self, total_bps: float = 0.0):
+        self._lock = threading.Lock()
+        self._total = max(0.0, float(total_bps or 0))
+        self._members: Dict[str, Any] = {}
+        self._paused: Set[str] = set()
+        self._share = 0.0
+
+    @property
+    def total_bps(self) -> float:
+        return self._total
+
+    @property
+    def share_bps(self) -> float:
+        return self._share
+
+    def set_total(self, total_bps: float) -> None:
+        with self._lock:
+            self._total = max(0.0, float(total_bps or 0))
+        self.rebalance()
+
+    def register(self, key: str, target: Any) -> None:
+        """target: set_rate_limit(bps) 를 가진 다운로더"""
+        with self._lock:
+            self._members[key] = target
+            self._paused.discard(key)
+        self.rebalance()
+
+    def unregister(self, key: str) -> None:
+        with self._lock:
+            removed = self._members.pop(key, None)
+            self._paused.discard(key)
+        if removed is not None:
+            self.rebalance()
+
+    def set_paused(self, key: str, paused: bool) -> None:
+        with self._lock:
+            if key not in self._members:
+                return
+            if paused:
+                self._paused.add(key)
+            else:
+                self._paused.discard(key)
+        self.rebalance()
+
+    def rebalance(self) -> None:
+        with self._lock:
+            active = [t for k, t in self._members.items() if k not in self._paused]
+            share = self._total / len(active) if self._total > 0 and active else 0.0
+            changed = abs(share - self._share) > 1
+            self._share = share
+        for target in active:
+            try:
+                target.set_rate_limit(share)
+            except Exception as e:
+                logger.error(f'[GDM] set_rate_limit failed: {e}')
+        if changed and self._total > 0:
+            logger.info(
+                f'[GDM] bandwidth rebalance: total={self._total / 1024 ** 2:.2f}MB/s, '
+                f'active={len(active)}, per-task={share / 1024 ** 2:.2f}MB/s'
+            )
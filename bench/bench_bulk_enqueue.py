@@ -0,0 +1,103 @@
+"""
+일괄 등록 벤치마크
+
+add_download 반복 호출(행마다 커밋 + 태스크마다 submit)과
+add_downloads(한 트랜잭션 INSERT + submit_many)의 등록 시간을 비교한다.
+FlaskFarm 없이 돌리기 위해 같은 컬럼 구성의 SQLite 파일 DB와 scheduler.py 를 직접 사용한다.
+
+    python bench/bench_bulk_enqueue.py --count 1000
+"""
+import argparse
+import importlib.util
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COLUMNS = (
+    'created_time', 'url', 'save_path', 'filename', 'source_type', 'status',
+    'caller_plugin', 'callback_id', 'title', 'thumbnail', 'meta', 'options', 'priority',
+)
+
+
+def load_scheduler():
+    spec = importlib.util.spec_from_file_location('gdm_scheduler', os.path.join(ROOT, 'scheduler.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.DownloadScheduler
+
+
+class FakeTask:
+    __slots__ = ('url', 'source_type', 'caller_plugin', 'priority', 'db_id')
+
+    def __init__(self, index: int):
+        self.url = f'https://cdn{index % 7}.example.com/ep{index}.m3u8'
+        self.source_type = 'hls'
+        self.caller_plugin = 'anime_downloader'
+        self.priority = 0
+        self.db_id = None
+
+    def _run(self):
+        pass
+
+
+def open_db(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute(f'CREATE TABLE item (id INTEGER PRIMARY KEY, {", ".join(COLUMNS)})')
+    conn.commit()
+    return conn
+
+
+def row(task: FakeTask):
+    return ('2026-01-01 00:00:00', task.url, '/tmp', None, task.source_type, 'pending',
+            task.caller_plugin, None, '', '', None, '{}', task.priority)
+
+
+def run_loop(conn, scheduler, count):
+    sql = f'INSERT INTO item ({", ".join(COLUMNS)}) VALUES ({", ".join("?" * len(COLUMNS))})'
+    for index in range(count):
+        task = FakeTask(index)
+        cursor = conn.execute(sql, row(task))
+        conn.commit()
+        task.db_id = cursor.lastrowid
+        scheduler.submit(task)
+
+
+def run_bulk(conn, scheduler, count):
+    sql = f'INSERT INTO item ({", ".join(COLUMNS)}) VALUES ({", ".join("?" * len(COLUMNS))})'
+    tasks = [FakeTask(index) for index in range(count)]
+    with conn:
+        for task in tasks:
+            task.db_id = conn.execute(sql, row(task)).lastrowid
+    scheduler.submit_many(tasks)
+
+
+def measure(mode, count):
+    DownloadScheduler = load_scheduler()
+    # 벤치 동안 디스패치가 끼어들지 않도록 워커가 잡아둘 수 없는 상태로 시작
+    gate = threading.Event()
+    scheduler = DownloadScheduler(max_workers=1, runner=lambda task: gate.wait())
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = open_db(os.path.join(tmp, 'bench.db'))
+        started = time.perf_counter()
+        (run_bulk if mode == 'bulk' else run_loop)(conn, scheduler, count)
+        elapsed = time.perf_counter() - started
+        conn.close()
+    gate.set()
+    scheduler.shutdown()
+    print(f'[{mode}] enqueued={count} elapsed={elapsed * 1000:.1f}ms per-item={elapsed / count * 1e6:.1f}us')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--count', type=int, default=1000)
+    args = parser.parse_args()
+    measure('loop', args.count)
+    measure('bulk', args.count)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""
+HTTP 직접 다운로드 구간 분할 벤치마크
+
+연결당 속도를 제한한 로컬 HTTP 서버(Range 지원)에서 같은 파일을 받아 걸린 시간을 비교한다.
+- single: 단일 스트림 (connections=1 → 기존 경로)
+- static: 연결 수만큼 고정 분할 (RangeFetcher, 작업 훔치기 끔)
+- split: 고정 분할 + 작업 훔치기 (HttpDirectDownloader 기본 경로)
+--slow-every N 이면 N번째 요청마다 --slow-factor 배 느리게 보내 느린 연결이 섞인 경우를 흉내 낸다.
+
+    python bench/bench_http_split.py --size 64 --rate 4 --connections 8 --slow-every 3
+"""
+import argparse
+import hashlib
+import http.server
+import importlib
+import itertools
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHUNK = 64 * 1024
+
+
+def load_modules():
+    sys.path.insert(0, os.path.dirname(ROOT))
+    package = os.path.basename(ROOT)
+    direct = importlib.import_module(f'{package}.downloader.http_direct')
+    ranges = importlib.import_module(f'{package}.downloader.http_ranges')
+    return direct.HttpDirectDownloader, ranges.RangeFetcher
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    payload = b''
+    rate = 4 * 1024 ** 2  # 연결당 bytes/s
+    slow_every = 0
+    slow_factor = 4
+    counter = itertools.count(1)
+
+    def do_GET(self):
+        start, end = 0, len(self.payload) - 1
+        match = re.match(r'bytes=(\d+)-(\d*)', self.headers.get('Range', ''))
+        if match:
+            start = int(match.group(1))
+            end = min(int(match.group(2)), end) if match.group(2) else end
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{end}/{len(self.payload)}')
+        else:
+            self.send_response(200)
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('ETag', '"bench"')
+        self.send_header('Content-Length', str(end - start + 1))
+        self.end_headers()
+        rate = self.rate
+        if self.slow_every and next(self.counter) % self.slow_every == 0:
+            rate /= self.slow_factor
+        try:
+            for offset in range(start, end + 1, CHUNK):
+                self.wfile.write(self.payload[offset:min(offset + CHUNK, end + 1)])
+                time.sleep(CHUNK / rate)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # 훔쳐 가서 클라이언트가 먼저 끊은 경우
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server(size_mb, rate_mb, slow_every, slow_factor):
+    _Handler.payload = os.urandom(size_mb * 1024 ** 2)
+    _Handler.rate = rate_mb * 1024 ** 2
+    _Handler.slow_every = slow_every
+    _Handler.slow_factor = slow_factor
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_downloader(downloader_cls, url, save_path, connections):
+    downloader = downloader_cls()
+    result = downloader.download(url=url, save_path=save_path, filename='out.bin', connections=connections)
+    assert result.get('success'), result
+    return result['filepath'], getattr(downloader._fetcher, 'steals', 0)
+
+
+def run_static(fetcher_cls, url, save_path, connections, total):
+    filepath = os.path.join(save_path, 'out.bin')
+    fetcher = fetcher_cls(url, {}, total, connections, validator='"bench"', work_stealing=False)
+    assert fetcher.run(filepath)
+    return filepath, 0
+
+
+def measure(name, func, expected):
+    _Handler.counter = itertools.count(1)
+    with tempfile.TemporaryDirectory() as save_path:
+        started = time.perf_counter()
+        filepath, steals = func(save_path)
+        elapsed = time.perf_counter() - started
+        with open(filepath, 'rb') as f:
+            ok = hashlib.sha1(f.read()).hexdigest() == expected
+    size_mb = len(_Handler.payload) / 1024 ** 2
+    print(f'{name:<8} {elapsed:7.2f}s  {size_mb / elapsed:7.2f}MB/s  steals={steals:<3} sha1={"ok" if ok else "MISMATCH"}')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size', type=int, default=64, help='파일 크기 (MB)')
+    parser.add_argument('--rate', type=float, default=4, help='연결당 속도 제한 (MB/s)')
+    parser.add_argument('--connections', type=int, default=8)
+    parser.add_argument('--slow-every', type=int, default=0)
+    parser.add_argument('--slow-factor', type=float, default=4)
+    args = parser.parse_args()
+    downloader_cls, fetcher_cls = load_modules()
+    server = start_server(args.size, args.rate, args.slow_every, args.slow_factor)
+    url = f'http://127.0.0.1:{server.server_address[1]}/file.bin'
+    total = len(_Handler.payload)
+    expected = hashlib.sha1(_Handler.payload).hexdigest()
+    try:
+        measure('single', lambda d: run_downloader(downloader_cls, url, d, 1), expected)
+        measure('static', lambda d: run_static(fetcher_cls, url, d, args.connections, total), expected)
+        measure('split', lambda d: run_downloader(downloader_cls, url, d, args.connections), expected)
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,194 @@
+"""
+태스크 레지스트리 메모리 벤치마크
+
+태스크 N개를 등록 → 다운로드 → 완료 처리하면서 일정 간격으로 프로세스 RSS 를 기록한다.
+- unbounded: 기존 방식 (dict 레지스트리, 인스턴스 __dict__, 끝난 태스크가 다운로더/콜백을 계속 참조)
+- bounded: registry.TaskRegistry + __slots__ 태스크, 끝나면 다운로더/콜백 해제, 유예 시간/개수 초과분 제외
+FlaskFarm 없이 돌리기 위해 DownloadTask 와 같은 필드 구성의 대체 클래스를 쓰고,
+태스크 하나당 가상 시계를 0.1초씩 진행시킨다. 모드마다 별도 프로세스에서 측정한다.
+
+    python bench/bench_registry_memory.py --count 50000
+"""
+import argparse
+import gc
+import importlib.util
+import os
+import subprocess
+import sys
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FIELDS = (
+    'id', 'url', 'save_path', 'filename', 'source_type', 'caller_plugin', 'callback_id',
+    'title', 'thumbnail', 'meta', 'priority', 'options',
+    '_on_progress', '_on_complete', '_on_error', '_subscribers', 'dedup_key',
+    '_status', 'progress', 'speed', 'eta', 'error_message', 'filepath', 'duration', 'filesize',
+    '_downloader', '_cancelled', 'db_id', '_version', 'resume_state',
+    'retry_count', 'retry_at', 'error_kind', 'start_time', 'end_time', 'created_time',
+)
+
+
+def load_registry():
+    spec = importlib.util.spec_from_file_location('gdm_registry', os.path.join(ROOT, 'registry.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def rss_mb() -> float:
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class FakeDownloader:
+    """실행 중 다운로더가 들고 있는 상태 (프로세스 핸들, 출력 버퍼, 로그)"""
+
+    def __init__(self, index: int):
+        self.process = {'pid': 10000 + index, 'args': ['ffmpeg', '-i', f'https://cdn.example.com/{index}.m3u8']}
+        self.buffer = bytearray(4096)
+        self.log = [f'frame={n} size={n * 1024}kB time=00:00:{n:02d}.00' for n in range(20)]
+
+
+def make_fields(index: int):
+    def on_progress(progress, speed, eta):
+        return index
+
+    return {
+        'id': f'dl_1700000000_{index}',
+        'url': f'https://cdn{index % 7}.example.com/show/ep{index}/index.m3u8',
+        'save_path': '/data/download/anime',
+        'filename': f'Show.E{index:05d}.mp4',
+        'source_type': 'ohli24',
+        'caller_plugin': 'anime_downloader_ohli24',
+        'callback_id': f'ohli24_{index}',
+        'title': f'Show episode {index}',
+        'thumbnail': f'https://img.example.com/{index}.jpg',
+        'meta': {'season': 1, 'episode': index, 'source': 'ohli24'},
+        'priority': 0,
+        'options': {
+            'headers': {'Referer': 'https://ohli24.example.com/', 'User-Agent': 'Mozilla/5.0'},
+            'cookies_file': '/data/tmp/cookies.txt',
+            'connections': 16,
+        },
+        '_on_progress': on_progress,
+        '_on_complete': lambda path: index,
+        '_on_error': lambda message: index,
+        '_subscribers': [],
+        'dedup_key': None,
+        '_status': 'pending',
+        'progress': 0,
+        'speed': '',
+        'eta': '',
+        'error_message': '',
+        'filepath': '',
+        'duration': 0,
+        'filesize': 0,
+        '_downloader': None,
+        '_cancelled': False,
+        'db_id': None,
+        '_version': 0,
+        'resume_state': {},
+        'retry_count': 0,
+        'retry_at': None,
+        'error_kind': '',
+        'start_time': None,
+        'end_time': None,
+        'created_time': '2026-01-01 00:00:00',
+    }
+
+
+class DictTask:
+    def __init__(self, index: int):
+        self.__dict__.update(make_fields(index))
+
+    @property
+    def status(self):
+        return self._status
+
+
+class SlotTask:
+    __slots__ = FIELDS
+    registry = None
+
+    def __init__(self, index: int):
+        for key, value in make_fields(index).items():
+            setattr(self, key, value)
+
+    @property
+    def status(self):
+        return self._status
+
+    @status.setter
+    def status(self, value):
+        old = self._status
+        self._status = value
+        if old != value:
+            SlotTask.registry.status_changed(self, old)
+
+
+def run(mode: str, count: int, grace: float, max_finished: int) -> None:
+    clock = [0.0]
+    if mode == 'bounded':
+        registry_module = load_registry()
+        # 가상 시계로 유예 시간 계산
+        registry_module.time = types.SimpleNamespace(monotonic=lambda: clock[0])
+        registry = registry_module.TaskRegistry(finished_statuses=('completed', 'cancelled', 'error'),
+                                                grace_sec=grace, max_finished=max_finished)
+        SlotTask.registry = registry
+        task_cls = SlotTask
+    else:
+        registry = {}
+        task_cls = DictTask
+
+    gc.collect()
+    base = rss_mb()
+    print(f'[{mode}] start rss={base:.1f}MB')
+    step = max(1, count // 5)
+    for index in range(count):
+        clock[0] += 0.1
+        task = task_cls(index)
+        registry[task.id] = task
+        task._downloader = FakeDownloader(index)
+        if mode == 'bounded':
+            task.status = 'downloading'
+        else:
+            task._status = 'downloading'
+        task.progress = 100
+        task.filepath = f'/data/download/anime/{task.filename}'
+        task.filesize = 350 * 1024 * 1024
+        task.db_id = index + 1
+        if mode == 'bounded':
+            task.status = 'completed'
+            task._downloader = None
+            task._on_progress = task._on_complete = task._on_error = None
+            registry.evict()
+        else:
+            task._status = 'completed'
+        if (index + 1) % step == 0:
+            gc.collect()
+            print(f'[{mode}] processed={index + 1:>6} live={len(registry):>6} '
+                  f'rss={rss_mb():.1f}MB (+{rss_mb() - base:.1f}MB)')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--count', type=int, default=50000)
+    parser.add_argument('--grace', type=float, default=300.0)
+    parser.add_argument('--max-finished', type=int, default=200)
+    parser.add_argument('--mode', choices=('unbounded', 'bounded'))
+    args = parser.parse_args()
+    if args.mode:
+        run(args.mode, args.count, args.grace, args.max_finished)
+        return
+    for mode in ('unbounded', 'bounded'):
+        subprocess.run([sys.executable, os.path.abspath(__file__), '--mode', mode, '--count', str(args.count),
+                        '--grace', str(args.grace), '--max-finished', str(args.max_finished)], check=True)
+
+
+if __name__ == '__main__':
+    main()
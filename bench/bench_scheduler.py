@@ -0,0 +1,125 @@
+"""
+스케줄러 스트레스 벤치마크
+
+가짜 다운로더로 대량 태스크를 넣고 스레드 수, CPU 사용량, 디스패치 지연을 측정한다.
+기존 방식(태스크당 스레드 + 0.5초 폴링 세마포어)과 워커 풀 방식을 비교한다.
+
+    python bench/bench_scheduler.py --tasks 10000 --workers 3
+"""
+import argparse
+import importlib.util
+import os
+import statistics
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_scheduler():
+    spec = importlib.util.spec_from_file_location('gdm_scheduler', os.path.join(ROOT, 'scheduler.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.DownloadScheduler
+
+
+class FakeTask:
+    __slots__ = ('submitted', 'started', 'work', 'done')
+
+    def __init__(self, work: float, done: threading.Semaphore):
+        self.submitted = time.perf_counter()
+        self.started = 0.0
+        self.work = work
+        self.done = done
+
+    def _run(self):
+        self.started = time.perf_counter()
+        if self.work:
+            time.sleep(self.work)
+        self.done.release()
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def sample_threads(stop: threading.Event, peak: list):
+    while not stop.is_set():
+        peak[0] = max(peak[0], threading.active_count())
+        time.sleep(0.01)
+
+
+def run_legacy(count: int, workers: int, work: float):
+    """태스크당 스레드 + 폴링 세마포어 (기존 구현 재현)"""
+    sem = threading.Semaphore(workers)
+    done = threading.Semaphore(0)
+    tasks = []
+
+    def run(task):
+        while not sem.acquire(timeout=0.5):
+            pass
+        try:
+            task._run()
+        finally:
+            sem.release()
+
+    for _ in range(count):
+        task = FakeTask(work, done)
+        tasks.append(task)
+        threading.Thread(target=run, args=(task,), daemon=True).start()
+    return tasks, done
+
+
+def run_pool(count: int, workers: int, work: float):
+    DownloadScheduler = load_scheduler()
+    scheduler = DownloadScheduler(max_workers=workers)
+    done = threading.Semaphore(0)
+    tasks = []
+    for _ in range(count):
+        task = FakeTask(work, done)
+        tasks.append(task)
+        scheduler.submit(task)
+    return tasks, done
+
+
+def measure(mode: str, count: int, workers: int, work: float):
+    stop = threading.Event()
+    peak = [threading.active_count()]
+    sampler = threading.Thread(target=sample_threads, args=(stop, peak), daemon=True)
+    sampler.start()
+
+    cpu0, wall0 = time.process_time(), time.perf_counter()
+    tasks, done = (run_legacy if mode == 'legacy' else run_pool)(count, workers, work)
+    for _ in range(count):
+        done.acquire()
+    cpu1, wall1 = time.process_time(), time.perf_counter()
+    stop.set()
+    sampler.join()
+
+    # 디스패치 지연: 워커가 비었을 때부터 다음 태스크가 시작되기까지
+    starts = sorted(t.started for t in tasks)
+    gaps = [max(0.0, b - a - work) for a, b in zip(starts, starts[workers:])]
+    print(f'[{mode}] tasks={count} workers={workers} work={work * 1000:.1f}ms')
+    print(f'  wall={wall1 - wall0:.2f}s cpu={cpu1 - cpu0:.2f}s peak_threads={peak[0]}')
+    print(f'  dispatch latency p50={statistics.median(gaps) * 1000:.3f}ms '
+          f'p99={percentile(gaps, 99) * 1000:.3f}ms max={max(gaps) * 1000:.3f}ms')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--tasks', type=int, default=10000)
+    parser.add_argument('--workers', type=int, default=3)
+    parser.add_argument('--work-ms', type=float, default=0.5)
+    parser.add_argument('--legacy', action='store_true', help='기존 thread-per-task 방식도 측정')
+    args = parser.parse_args()
+
+    measure('pool', args.tasks, args.workers, args.work_ms / 1000)
+    if args.legacy:
+        measure('legacy', args.tasks, args.workers, args.work_ms / 1000)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""
+yt-dlp 실행 방식 벤치마크 (time-to-first-byte)
+
+로컬 HTTP 서버에 짧은 영상 파일 N개를 올려 두고 YtdlpAria2Downloader 로 차례로 받으면서
+download() 호출부터 첫 바이트 수신(_downloaded_bytes > 0)까지 걸린 시간을 비교한다.
+- subprocess: 다운로드마다 yt-dlp CLI 실행 (인터프리터 시작 + 추출기 import 포함)
+- pool: ytdlp_workers 상주 워커 (워커가 ready 된 뒤 측정 시작)
+yt-dlp(모듈 + CLI)가 설치되어 있어야 한다. aria2c 는 쓰지 않는다.
+
+    python bench/bench_ytdlp_pool.py --count 50 --workers 2
+"""
+import argparse
+import http.server
+import importlib
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAYLOAD_SIZE = 512 * 1024
+
+
+def load_modules():
+    sys.path.insert(0, os.path.dirname(ROOT))
+    package = os.path.basename(ROOT)
+    downloader = importlib.import_module(f'{package}.downloader.ytdlp_aria2')
+    pool = importlib.import_module(f'{package}.downloader.ytdlp_pool')
+    return downloader.YtdlpAria2Downloader, pool.YtdlpWorkerPool
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    payload = b''
+
+    def do_HEAD(self):
+        self._headers()
+
+    def do_GET(self):
+        self._headers()
+        # 작은 조각으로 나눠 보내 첫 바이트 시점이 분명하게 보이도록
+        for offset in range(0, len(self.payload), 64 * 1024):
+            self.wfile.write(self.payload[offset:offset + 64 * 1024])
+            time.sleep(0.002)
+
+    def _headers(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'video/mp4')
+        self.send_header('Content-Length', str(len(self.payload)))
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server():
+    _Handler.payload = os.urandom(PAYLOAD_SIZE)
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def time_to_first_byte(downloader_cls, url, save_path):
+    downloader = downloader_cls()
+    first = {}
+    started = time.perf_counter()
+    done = threading.Event()
+
+    def watch():
+        while not done.is_set():
+            if downloader._downloaded_bytes > 0:
+                first['at'] = time.perf_counter() - started
+                return
+            time.sleep(0.002)
+
+    watcher = threading.Thread(target=watch, daemon=True)
+    watcher.start()
+    result = downloader.download(
+        url=url,
+        save_path=save_path,
+        filename='%(id)s.%(ext)s',
+        aria2c_path='/nonexistent/aria2c',
+        ffmpeg_path='ffmpeg',
+        max_download_rate='0',
+    )
+    total = time.perf_counter() - started
+    done.set()
+    watcher.join()
+    if not result.get('success'):
+        raise RuntimeError(result.get('error'))
+    # 첫 진행 이벤트 전에 끝난 경우 완료 시각을 상한으로 사용
+    return first.get('at', total), total
+
+
+def measure(mode, count, workers, port):
+    YtdlpAria2Downloader, YtdlpWorkerPool = load_modules()
+    pool = YtdlpWorkerPool.shared()
+    if mode == 'pool':
+        pool.resize(workers)
+        pool.warm()
+        deadline = time.monotonic() + 120
+        while len(pool._idle) < workers and time.monotonic() < deadline:
+            time.sleep(0.05)
+        if len(pool._idle) < workers:
+            raise RuntimeError('yt-dlp workers did not start (is the yt_dlp module installed?)')
+    else:
+        pool.resize(0)
+
+    ttfb, totals = [], []
+    with tempfile.TemporaryDirectory() as tmp:
+        for index in range(count):
+            first, total = time_to_first_byte(
+                YtdlpAria2Downloader, f'http://127.0.0.1:{port}/{mode}-clip{index}.mp4', tmp)
+            ttfb.append(first)
+            totals.append(total)
+    pool.shutdown()
+    ttfb.sort()
+    print(
+        f'[{mode}] videos={count} ttfb mean={statistics.mean(ttfb) * 1000:.0f}ms '
+        f'median={statistics.median(ttfb) * 1000:.0f}ms p95={ttfb[int(len(ttfb) * 0.95) - 1] * 1000:.0f}ms '
+        f'total={sum(totals):.1f}s'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--count', type=int, default=50)
+    parser.add_argument('--workers', type=int, default=2)
+    args = parser.parse_args()
+    server = start_server()
+    port = server.server_address[1]
+    try:
+        measure('subprocess', args.count, args.workers, port)
+        measure('pool', args.count, args.workers, port)
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+"""
+완료 다운로드 캐시
+- 완료된 결과 파일을 (정규화 URL + 포맷) 키로 색인 (ModelCompletedFile)
+- 같은 요청이 다시 오면 기존 파일을 새 save_path 에 하드링크 → reflink → 복사 순으로 만들어 즉시 완료
+- 검증 패스: 파일이 사라졌거나 내용이 바뀐 색인 항목 제거 (content_hash 가 있으면 해시로 재확인)
+"""
+import hashlib
+import os
+import shutil
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+try:
+    from .setup import P
+    logger = P.logger
+except:
+    import logging
+    logger = logging.getLogger(__name__)
+
+
+class CompletedCache:
+    """완료 파일 색인 조회/기록/검증"""
+
+    FICLONE = 0x40049409  # Linux ioctl (btrfs/xfs/bcachefs reflink)
+
+    @staticmethod
+    def cache_key(normalized_url: str, fmt: Optional[str]) -> str:
+        return f'{normalized_url}|{fmt or ""}'
+
+    @classmethod
+    def lookup(cls, key: str) -> Optional[str]:
+        """키에 해당하는 존재하는 완료 파일 경로 (없어진 항목은 그 자리에서 제거)"""
+        from framework import F
+        from .model import ModelCompletedFile
+        with F.app.app_context():
+            entries = F.db.session.query(ModelCompletedFile).filter_by(cache_key=key) \
+                .order_by(ModelCompletedFile.id.desc()).all()
+            found = None
+            stale = False
+            for entry in entries:
+                if found is None and cls._unchanged(entry):
+                    found = entry.filepath
+                elif not os.path.exists(entry.filepath or ''):
+                    F.db.session.delete(entry)
+                    stale = True
+            if stale:
+                F.db.session.commit()
+            return found
+
+    @classmethod
+    def record(cls, key: str, url: str, fmt: Optional[str], filepath: str, with_hash: bool = False) -> None:
+        """완료 파일 색인 추가 (같은 키/경로 항목은 갱신)"""
+        if not filepath or not os.path.isfile(filepath):
+            return
+        from framework import F
+        from .model import ModelCompletedFile
+        stat = os.stat(filepath)
+        content_hash = cls.file_hash(filepath) if with_hash else None
+        with F.app.app_context():
+            entry = F.db.session.query(ModelCompletedFile).filter_by(cache_key=key, filepath=filepath).first()
+            if entry is None:
+                entry = ModelCompletedFile()
+                entry.created_time = datetime.now()
+                entry.cache_key = key
+                entry.url = url
+                entry.format = fmt or ''
+                entry.filepath = filepath
+                F.db.session.add(entry)
+            entry.filesize = stat.st_size
+            entry.mtime = stat.st_mtime
+            entry.content_hash = content_hash
+            F.db.session.commit()
+
+    @classmethod
+    def verify(cls) -> Dict[str, int]:
+        """
+        전체 색인 검증
+        파일 없음 → 제거, 크기/수정시각 변경 → 해시가 있으면 재계산해 같으면 갱신 아니면 제거
+        """
+        from framework import F
+        from .model import ModelCompletedFile
+        kept = dropped = 0
+        with F.app.app_context():
+            for entry in F.db.session.query(ModelCompletedFile).all():
+                path = entry.filepath or ''
+                if not os.path.isfile(path):
+                    F.db.session.delete(entry)
+                    dropped += 1
+                    continue
+                if cls._unchanged(entry):
+                    kept += 1
+                    continue
+                if entry.content_hash and cls.file_hash(path) == entry.content_hash:
+                    stat = os.stat(path)
+                    entry.filesize, entry.mtime = stat.st_size, stat.st_mtime
+                    kept += 1
+                else:
+                    F.db.session.delete(entry)
+                    dropped += 1
+            F.db.session.commit()
+        logger.info(f'[GDM] completed cache verify: kept={kept}, dropped={dropped}')
+        return {'kept': kept, 'dropped': dropped}
+
+    @classmethod
+    def materialize(cls, src: str, dst: str, allow_copy: bool = True) -> Optional[str]:
+        """
+        src 를 dst 에 만듦. 반환: 'hardlink' | 'reflink' | 'copy' | 'same' | None(실패)
+        allow_copy=False 면 즉시 끝나는 방법(하드링크/reflink)만 시도
+        """
+        if os.path.exists(dst):
+            try:
+                return 'same' if os.path.samefile(src, dst) else None
+            except OSError:
+                return None
+        os.makedirs(os.path.dirname(dst) or '.', exist_ok=True)
+        try:
+            os.link(src, dst)
+            return 'hardlink'
+        except OSError:
+            pass
+        if cls._reflink(src, dst):
+            return 'reflink'
+        if not allow_copy:
+            return None
+        tmp = dst + '.gdmcopy'
+        try:
+            shutil.copy2(src, tmp)
+            os.replace(tmp, dst)
+            return 'copy'
+        except OSError as e:
+            logger.error(f'[GDM] completed cache copy failed: {e}')
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return None
+
+    @classmethod
+    def _reflink(cls, src: str, dst: str) -> bool:
+        try:
+            import fcntl
+        except ImportError:
+            return False
+        try:
+            with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                fcntl.ioctl(fdst.fileno(), cls.FICLONE, fsrc.fileno())
+            return True
+        except OSError:
+            try:
+                os.remove(dst)
+            except OSError:
+                pass
+            return False
+
+    @staticmethod
+    def file_hash(path: str) -> str:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(4 * 1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _unchanged(entry: Any) -> bool:
+        try:
+            stat = os.stat(entry.filepath)
+        except (OSError, TypeError):
+            return False
+        return stat.st_size == (entry.filesize or 0) and abs(stat.st_mtime - (entry.mtime or 0)) < 1
@@ -0,0 +1,188 @@
+"""
+DB 쓰기 지연(write-behind) 처리
+- 다운로드 스레드는 변경 내용을 큐에 넣기만 하고 바로 반환
+- 전용 writer 스레드가 같은 행에 대한 반복 변경을 병합해 한 트랜잭션으로 커밋
+- 신규 행 INSERT 도 같은 배치에서 처리하고 생성된 id 를 태스크에 돌려줌 (task.db_id)
+- 커밋 실패(database is locked 등) 배치와 아직 INSERT 되지 않은 행의 갱신은 버리지 않고 다시 대기열로
+"""
+import threading
+from typing import Any, Dict, List, Optional
+
+try:
+    from .setup import P
+    logger = P.logger
+except:
+    import logging
+    logger = logging.getLogger(__name__)
+
+
+class _PendingRow:
+    __slots__ = ('task', 'insert', 'fields')
+
+    def __init__(self, task: Any, insert: bool):
+        self.task = task
+        self.insert = insert
+        self.fields: Dict[str, Any] = {}
+
+
+class DbWriter:
+    """ModelDownloadItem 변경 배치 기록기 (태스크 id 단위 병합)"""
+
+    STOP_RETRIES = 3  # 종료 시 남은 변경 커밋 재시도 횟수
+    MAX_DROPPED = 10000  # 기억해 둘 삭제 태스크 id 수 (오래된 것부터 잊음)
+
+    def __init__(self, interval: float = 0.5, max_batch: int = 500):
+        self.interval = interval
+        self.max_batch = max_batch
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._pending: Dict[str, _PendingRow] = {}
+        # discard 된 태스크 id (늦게 온 진행 콜백/실패한 배치로 행이 되살아나지 않도록, 삽입 순서로 오래된 것부터 제거)
+        self._dropped: Dict[str, None] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    def insert(self, task: Any, **fields) -> None:
+        """신규 행 예약 (커밋 후 task.db_id 설정)"""
+        with self._lock:
+            row = self._pending.get(task.id)
+            if row is None:
+                row = self._pending[task.id] = _PendingRow(task, insert=True)
+            else:
+                row.insert = True
+            # INSERT 전에 들어온 갱신이 더 최신이므로 덮어쓰지 않음
+            for key, value in fields.items():
+                row.fields.setdefault(key, value)
+        self._kick()
+
+    def update(self, task: Any, **fields) -> None:
+        """기존(또는 INSERT 대기 중) 행의 컬럼 갱신 예약, 마지막 값만 남김 (삭제된 태스크는 무시)"""
+        with self._lock:
+            if task.id in self._dropped:
+                return
+            row = self._pending.get(task.id)
+            if row is None:
+                row = self._pending[task.id] = _PendingRow(task, insert=False)
+            row.fields.update(fields)
+        self._kick()
+
+    def discard(self, task_id: str) -> None:
+        """삭제된 태스크의 대기 중 쓰기 폐기 (삭제 후 행이 되살아나지 않도록)"""
+        with self._lock:
+            self._pending.pop(task_id, None)
+            self._dropped[task_id] = None
+            if len(self._dropped) > self.MAX_DROPPED:
+                del self._dropped[next(iter(self._dropped))]
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def start(self) -> None:
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, name='gdm-db-writer', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """writer 스레드 종료 + 남은 변경 동기 커밋"""
+        self._running = False
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        for _ in range(self.STOP_RETRIES):
+            self.flush()
+            if not self._pending:
+                return
+            self._wakeup.wait(self.interval)
+        logger.error(f'[GDM] DB write-behind stopped with {len(self._pending)} unwritten rows')
+
+    def flush(self) -> int:
+        """
+        대기 중인 변경을 호출 스레드에서 즉시 커밋, 처리한 행 수 반환
+        실패한 배치는 대기열로 되돌려 다음 주기에 다시 시도
+        """
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    if not self._pending:
+                        return written
+                    keys = list(self._pending.keys())[:self.max_batch]
+                    batch = [self._pending.pop(key) for key in keys]
+                try:
+                    deferred = self._commit(batch)
+                except Exception as e:
+                    logger.error(f'[GDM] DB write-behind batch failed ({len(batch)} rows), will retry: {e}')
+                    self._requeue(batch)
+                    return written
+                written += len(batch) - len(deferred)
+                if deferred:
+                    # INSERT 전 갱신만 남았으면 INSERT 가 들어올 때까지 다음 주기로
+                    self._requeue(deferred)
+                    if len(deferred) == len(batch):
+                        return written
+
+    def _requeue(self, rows: List[_PendingRow]) -> None:
+        """커밋하지 못한 행을 대기열로 되돌림 (그 사이 들어온 값이 더 최신이므로 우선, insert 표시는 유지)"""
+        with self._lock:
+            for row in rows:
+                if row.task.id in self._dropped:
+                    continue
+                newer = self._pending.get(row.task.id)
+                if newer is not None:
+                    row.fields.update(newer.fields)
+                    row.insert = row.insert or newer.insert
+                self._pending[row.task.id] = row
+
+    def _kick(self) -> None:
+        if not self._running:
+            self.start()
+        if len(self._pending) >= self.max_batch:
+            self._wakeup.set()
+
+    def _loop(self) -> None:
+        while self._running:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            if self._pending:
+                self.flush()
+
+    def _commit(self, batch: List[_PendingRow]) -> List[_PendingRow]:
+        """배치 커밋, 아직 INSERT 되지 않은 행의 갱신(반영 못 한 행) 반환"""
+        from framework import F
+        from .model import ModelDownloadItem
+        with F.app.app_context():
+            session = F.db.session
+            inserted = []
+            try:
+                for row in batch:
+                    if row.insert:
+                        item = ModelDownloadItem()
+                        for key, value in row.fields.items():
+                            setattr(item, key, value)
+                        session.add(item)
+                        inserted.append((row.task, item))
+                if inserted:
+                    session.flush()
+                    for task, item in inserted:
+                        task.db_id = item.id
+
+                deferred = [row for row in batch if not row.insert and not row.task.db_id]
+                updates = {row.task.db_id: row.fields for row in batch if not row.insert and row.task.db_id}
+                if updates:
+                    items = session.query(ModelDownloadItem).filter(ModelDownloadItem.id.in_(list(updates.keys()))).all()
+                    for item in items:
+                        for key, value in updates[item.id].items():
+                            setattr(item, key, value)
+                session.commit()
+                return deferred
+            except Exception:
+                session.rollback()
+                # 롤백된 INSERT 의 id 는 무효 (다시 INSERT 될 때 새로 받음)
+                for task, _ in inserted:
+                    task.db_id = None
+                raise
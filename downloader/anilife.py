@@ -64,6 +64,21 @@ class AnilifeDnloader(BaseDownloader):
         """URL 정보 추출"""
         return {'source': 'anilife'}
     
+    def set_rate_limit(self, bps: float):
+        """내부 ffmpeg 다운로더에 속도 상한 전달"""
+        super().set_rate_limit(bps)
+        self._ffmpeg_downloader.set_rate_limit(bps)
+    
+    def pause(self):
+        """다운로드 일시정지"""
+        super().pause()
+        self._ffmpeg_downloader.pause()
+    
+    def resume(self):
+        """다운로드 재개"""
+        super().resume()
+        self._ffmpeg_downloader.resume()
+    
     def cancel(self):
         """다운로드 취소"""
         super().cancel()
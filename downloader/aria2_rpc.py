@@ -0,0 +1,320 @@
+"""
+aria2c 상주 데몬 (JSON-RPC)
+- GDM 이 aria2c --enable-rpc 하나를 띄워 관리하고 yt-dlp 의 외부 다운로더 호출은
+  aria2_shim/aria2c 가 받아 이 데몬에 addUri 로 넘김 (다운로드마다 aria2c 를 새로 띄우지 않음)
+- 전역 속도/동시 다운로드 상한은 데몬 전역 옵션(changeGlobalOption), 태스크 몫은 GID별 changeOption
+- 태스크 구분: shim 이 만드는 GID 앞 8자리가 태스크 태그 → 공용 폴러가 tellActive/tellWaiting 결과를
+  태그별로 나눠 다운로더에 전달 (진행률을 출력 파싱 대신 RPC 로 읽음)
+- 데몬이 죽으면 다음 요청 때 다시 띄우고, 시작 실패 시 일정 시간 태스크별 aria2c 실행 방식으로 대체
+"""
+import json
+import os
+import secrets
+import socket
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.request
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    from ..setup import P
+    logger = P.logger
+except:
+    import logging
+    logger = logging.getLogger(__name__)
+
+
+SHIM_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'aria2_shim', 'aria2c')
+
+STATUS_KEYS = ['gid', 'status', 'totalLength', 'completedLength', 'downloadSpeed', 'connections']
+
+
+class Aria2RpcError(Exception):
+    pass
+
+
+class Aria2RpcClient:
+    """aria2 JSON-RPC (HTTP) 클라이언트"""
+
+    def __init__(self, url: str, secret: str = '', timeout: float = 5.0):
+        self.url = url
+        self.secret = secret
+        self.timeout = timeout
+
+    def call(self, method: str, *params: Any) -> Any:
+        payload = {'jsonrpc': '2.0', 'id': 'gdm', 'method': method, 'params': self._params(params)}
+        return self._post(payload)
+
+    def multicall(self, calls: List[Tuple[str, tuple]]) -> List[Any]:
+        """system.multicall, 항목별 결과 (실패 항목은 Aria2RpcError 인스턴스)"""
+        if not calls:
+            return []
+        payload = {
+            'jsonrpc': '2.0', 'id': 'gdm', 'method': 'system.multicall',
+            'params': [[{'methodName': method, 'params': self._params(params)} for method, params in calls]],
+        }
+        results = []
+        for item in self._post(payload):
+            if isinstance(item, list) and item:
+                results.append(item[0])
+            else:
+                results.append(Aria2RpcError((item or {}).get('message', 'unknown error')))
+        return results
+
+    def _params(self, params: tuple) -> list:
+        return ([f'token:{self.secret}'] if self.secret else []) + list(params)
+
+    def _post(self, payload: Dict[str, Any]) -> Any:
+        request = urllib.request.Request(
+            self.url, data=json.dumps(payload).encode('utf-8'),
+            headers={'Content-Type': 'application/json'},
+        )
+        # 로컬 데몬 호출이므로 환경 프록시를 타지 않도록
+        opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+        try:
+            with opener.open(request, timeout=self.timeout) as response:
+                body = json.loads(response.read().decode('utf-8'))
+        except urllib.error.HTTPError as e:
+            try:
+                body = json.loads(e.read().decode('utf-8'))
+            except Exception:
+                raise Aria2RpcError(str(e))
+        except (OSError, ValueError) as e:
+            raise Aria2RpcError(str(e))
+        if body.get('error'):
+            raise Aria2RpcError(body['error'].get('message', 'unknown error'))
+        return body.get('result')
+
+
+class Aria2Daemon:
+    """aria2c RPC 데몬 관리 (프로세스 하나 공유)"""
+
+    START_TIMEOUT = 10
+    RETRY_AFTER_FAILURE_SEC = 300
+    POLL_INTERVAL = 0.5
+
+    _shared: Optional['Aria2Daemon'] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self):
+        self.enabled = True
+        self.aria2c_path = 'aria2c'
+        self.max_connections = 16  # 다운로드당 연결 수 (max-connection-per-server)
+        self.max_downloads = 48  # 동시 다운로드(GID) 수 (max-concurrent-downloads)
+        self.max_overall_bps = 0  # 전역 속도 상한 (0: 무제한)
+        self._lock = threading.RLock()
+        self._process: Optional[subprocess.Popen] = None
+        self._client: Optional[Aria2RpcClient] = None
+        self._failed_at = 0.0
+        self._watchers: Dict[str, Callable[[List[Dict[str, Any]]], None]] = {}
+        self._poller: Optional[threading.Thread] = None
+
+    @classmethod
+    def shared(cls) -> 'Aria2Daemon':
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    @property
+    def usable(self) -> bool:
+        """shim 실행 가능 환경(POSIX)이고 데몬 사용 설정이며 최근 시작 실패가 없음"""
+        if not self.enabled or os.name == 'nt':
+            return False
+        return not self._failed_at or time.monotonic() - self._failed_at >= self.RETRY_AFTER_FAILURE_SEC
+
+    def configure(self, enabled: Optional[bool] = None, aria2c_path: Optional[str] = None,
+                  max_connections: Optional[int] = None, max_downloads: Optional[int] = None,
+                  max_overall_bps: Optional[float] = None) -> None:
+        """설정 반영 (실행 중이면 전역 옵션 즉시 변경, 경로 변경/비활성화는 재시작/종료)"""
+        restart = False
+        with self._lock:
+            if enabled is not None:
+                self.enabled = bool(enabled)
+            if aria2c_path is not None and (aria2c_path or 'aria2c') != self.aria2c_path:
+                self.aria2c_path = aria2c_path or 'aria2c'
+                restart = True
+            if max_connections is not None:
+                self.max_connections = max(1, min(16, int(max_connections)))
+            if max_downloads is not None:
+                self.max_downloads = max(1, int(max_downloads))
+            if max_overall_bps is not None:
+                self.max_overall_bps = max(0, int(max_overall_bps or 0))
+            self._failed_at = 0.0
+            running = self._alive()
+        if running and (restart or not self.enabled):
+            self.shutdown()
+        elif running:
+            try:
+                self._client.call('aria2.changeGlobalOption', self._global_options())
+            except Aria2RpcError as e:
+                logger.warning(f'[GDM] aria2c changeGlobalOption failed: {e}')
+
+    def client(self) -> Optional[Aria2RpcClient]:
+        """실행 중인 데몬 클라이언트 (필요하면 시작), 사용 불가면 None"""
+        if not self.usable:
+            return None
+        with self._lock:
+            if self._alive():
+                return self._client
+            if self._process is not None:
+                logger.warning(f'[GDM] aria2c daemon exited ({self._process.poll()}), restarting')
+            return self._start()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            process, client = self._process, self._client
+            self._process = self._client = None
+        if process is None or process.poll() is not None:
+            return
+        try:
+            client.call('aria2.forceShutdown')
+            process.wait(timeout=5)
+        except Exception:
+            process.terminate()
+            try:
+                process.wait(timeout=3)
+            except Exception:
+                process.kill()
+
+    # ===== 태스크 단위 (GID 태그) =====
+
+    @staticmethod
+    def new_tag() -> str:
+        return secrets.token_hex(4)
+
+    def watch(self, tag: str, callback: Callable[[List[Dict[str, Any]]], None]) -> None:
+        """태그 소속 GID 상태(tellActive + tellWaiting)를 POLL_INTERVAL 마다 callback 으로 전달"""
+        with self._lock:
+            self._watchers[tag] = callback
+            if self._poller is None or not self._poller.is_alive():
+                self._poller = threading.Thread(target=self._poll_loop, name='gdm-aria2-poll', daemon=True)
+                self._poller.start()
+
+    def unwatch(self, tag: str) -> None:
+        with self._lock:
+            self._watchers.pop(tag, None)
+
+    def tagged(self, tag: str) -> List[Dict[str, Any]]:
+        """태그 소속 활성/대기 GID 상태"""
+        return [s for s in self._list_unfinished() or [] if s.get('gid', '').startswith(tag)]
+
+    def apply(self, method: str, gids: List[str], *extra: Any) -> None:
+        """여러 GID 에 같은 명령 (forcePause / unpause / forceRemove / changeOption)"""
+        client = self._client
+        if client is None or not gids:
+            return
+        try:
+            for gid, result in zip(gids, client.multicall([(method, (gid,) + extra) for gid in gids])):
+                if isinstance(result, Aria2RpcError):
+                    logger.debug(f'[GDM] aria2 {method}({gid}) failed: {result}')
+        except Aria2RpcError as e:
+            logger.warning(f'[GDM] aria2 {method} failed: {e}')
+
+    # ===== 내부 =====
+
+    def _alive(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def _global_options(self) -> Dict[str, str]:
+        return {
+            'max-overall-download-limit': str(self.max_overall_bps),
+            'max-concurrent-downloads': str(self.max_downloads),
+            'max-connection-per-server': str(self.max_connections),
+        }
+
+    def _start(self) -> Optional[Aria2RpcClient]:
+        """(lock 보유 상태) 데몬 시작 후 getVersion 응답까지 대기"""
+        self._process = self._client = None
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            port = sock.getsockname()[1]
+        secret = secrets.token_hex(16)
+        cmd = [
+            self.aria2c_path,
+            '--no-conf=true',
+            '--enable-rpc=true',
+            '--rpc-listen-all=false',
+            f'--rpc-listen-port={port}',
+            f'--rpc-secret={secret}',
+            '--rpc-max-request-size=16M',  # 조각 목록 multicall
+            f'--stop-with-process={os.getpid()}',  # GDM 이 비정상 종료해도 함께 종료
+            '--continue=true',
+            '--auto-file-renaming=false',
+            '--file-allocation=none',
+            '--max-download-result=2000',
+            '--console-log-level=warn',
+            '--summary-interval=0',
+        ] + [f'--{key}={value}' for key, value in self._global_options().items()]
+        try:
+            process = subprocess.Popen(
+                cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                start_new_session=True,  # 태스크 프로세스 그룹 신호(정지/종료) 영향 없음
+            )
+        except OSError as e:
+            return self._start_failed(f'spawn error: {e}')
+
+        client = Aria2RpcClient(f'http://127.0.0.1:{port}/jsonrpc', secret, timeout=5.0)
+        deadline = time.monotonic() + self.START_TIMEOUT
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                return self._start_failed(f'exited with {process.returncode}')
+            try:
+                version = client.call('aria2.getVersion').get('version', '')
+                break
+            except Aria2RpcError:
+                time.sleep(0.1)
+        else:
+            process.kill()
+            return self._start_failed('no RPC response')
+        self._process, self._client = process, client
+        logger.info(f'[GDM] aria2c daemon started (pid={process.pid}, aria2 {version}, port={port})')
+        return client
+
+    def _start_failed(self, reason: str) -> None:
+        # (lock 보유 상태)
+        self._failed_at = time.monotonic()
+        logger.warning(
+            f'[GDM] aria2c daemon unavailable ({reason}), '
+            f'using one aria2c per download for {self.RETRY_AFTER_FAILURE_SEC}s'
+        )
+        return None
+
+    def _list_unfinished(self) -> Optional[List[Dict[str, Any]]]:
+        """활성 + 대기 GID 상태, 조회 실패면 None"""
+        client = self._client
+        if client is None:
+            return None
+        try:
+            active, waiting = client.multicall([
+                ('aria2.tellActive', (STATUS_KEYS,)),
+                ('aria2.tellWaiting', (0, 1000, STATUS_KEYS)),
+            ])
+        except Aria2RpcError:
+            return None
+        items = []
+        for part in (active, waiting):
+            if isinstance(part, list):
+                items.extend(part)
+        return items
+
+    def _poll_loop(self) -> None:
+        while True:
+            with self._lock:
+                watchers = dict(self._watchers)
+                if not watchers:
+                    self._poller = None
+                    return
+            items = self._list_unfinished()
+            if items is None:
+                # 데몬 재시작 중 등: 이번 주기는 건너뜀 (사라진 GID 를 완료로 오인하지 않도록)
+                time.sleep(self.POLL_INTERVAL)
+                continue
+            for tag, callback in watchers.items():
+                try:
+                    callback([s for s in items if s.get('gid', '').startswith(tag)])
+                except Exception as e:
+                    logger.debug(f'[GDM] aria2 watcher error: {e}')
+            time.sleep(self.POLL_INTERVAL)
@@ -11,6 +11,7 @@ class BaseDownloader(ABC):
     def __init__(self):
         self._cancelled = False
         self._paused = False
+        self._rate_limit_bps = 0.0
     
     @abstractmethod
     def download(
@@ -56,6 +57,13 @@ class BaseDownloader(ABC):
         """
         pass
     
+    def set_rate_limit(self, bps: float):
+        """
+        속도 상한 변경 (bytes/sec, 0: 무제한)
+        전역 대역폭 관리자가 시작/종료/일시정지마다 호출. 실행 중 반영 여부는 다운로더별 구현
+        """
+        self._rate_limit_bps = max(0.0, float(bps or 0))
+    
     def cancel(self):
         """다운로드 취소"""
         self._cancelled = True
@@ -75,3 +83,7 @@ class BaseDownloader(ABC):
     @property
     def is_paused(self) -> bool:
         return self._paused
+    
+    @property
+    def rate_limit_bps(self) -> float:
+        return self._rate_limit_bps
@@ -2,14 +2,28 @@
 FFmpeg HLS 다운로더
 - ani24, 링크애니 등 HLS 스트림용
 - 기존 SupportFfmpeg 로직 재사용
+- VOD 재생목록은 세그먼트를 직접 병렬로 받아(HlsSegmentEngine, AES-128 복호화 포함)
+  세그먼트별 파일 + 완료 비트맵으로 저장 (재개 시 빠진 세그먼트만 받음), 모두 받으면 순서대로 합친 뒤
+  ffmpeg로 컨테이너만 변환 (hls_remux 꺼짐 또는 ffmpeg 없음: TS/fMP4 그대로 저장)
+- 재생목록은 한 번만 받아 길이(EXTINF 합)/세그먼트 수 계산과 다운로드에 함께 사용,
+  진행률은 세그먼트 수와 받은 바이트로 보고
+- ffmpeg 직접 입력은 -progress pipe:1 (key=value 블록)을 stdout 으로 받아 바이트/속도/ETA 계산,
+  stderr 는 별도 스레드에서 오류 로그용 마지막 줄만 보관
 """
 import os
+import shutil
 import subprocess
-import re
+import threading
+import time
+from collections import deque
 import traceback
-from typing import Dict, Any, Optional, Callable
+from typing import Dict, Any, List, Optional, Callable
 
 from .base import BaseDownloader
+from .hls_engine import HlsSegmentEngine, SegmentBitmap, aes_available, playlist_fingerprint
+from .hls_mirrors import parse_mirrors
+from .hls_playlist import HlsPlaylist, load_media_playlist
+from ..bandwidth import ProcessThrottle, TokenBucket
 
 try:
     from ..setup import P
@@ -19,12 +33,95 @@ except:
     logger = logging.getLogger(__name__)
 
 
+class FfmpegProgress:
+    """
+    ffmpeg -progress 출력 누적 (progress=continue|end 줄에서 블록 하나 완료)
+    total_size(출력 바이트)로 평활 속도, 재생 위치/전체 길이로 전체 크기 추정과 ETA 계산
+    """
+
+    ALPHA = 0.3  # 속도 EWMA 가중치
+
+    def __init__(self, duration: float = 0.0):
+        self.duration = duration
+        self.total_size = 0
+        self.out_time = 0.0  # 초
+        self.bps = 0.0
+        self.ended = False
+        self._fields: Dict[str, str] = {}
+        self._last: Optional[tuple] = None  # (monotonic, total_size)
+
+    def feed(self, line: str) -> bool:
+        """한 줄 반영, 블록이 끝났으면 True"""
+        key, sep, value = line.strip().partition('=')
+        if not sep:
+            return False
+        self._fields[key] = value.strip()
+        if key != 'progress':
+            return False
+        self._update(value.strip() == 'end')
+        return True
+
+    @staticmethod
+    def _number(value: Optional[str]) -> Optional[float]:
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None  # 'N/A' 등
+
+    def _update(self, ended: bool) -> None:
+        now = time.monotonic()
+        size = self._number(self._fields.get('total_size'))
+        if size is not None:
+            self.total_size = int(size)
+        # out_time_ms 도 실제 단위는 마이크로초 (ffmpeg 호환 유지용 이름)
+        out_us = self._number(self._fields.get('out_time_us') or self._fields.get('out_time_ms'))
+        if out_us is not None and out_us >= 0:
+            self.out_time = out_us / 1_000_000
+        if self._last is not None:
+            elapsed = now - self._last[0]
+            if elapsed > 0:
+                instant = max(0, self.total_size - self._last[1]) / elapsed
+                self.bps = instant if self.bps <= 0 else self.bps * (1 - self.ALPHA) + instant * self.ALPHA
+        self._last = (now, self.total_size)
+        self.ended = ended
+
+    @property
+    def fraction(self) -> float:
+        return min(self.out_time / self.duration, 1.0) if self.duration > 0 else 0.0
+
+    @property
+    def total_estimate(self) -> int:
+        """재생 위치 비율로 추정한 최종 크기 (길이를 모르면 0)"""
+        return int(self.total_size / self.fraction) if self.fraction > 0 else 0
+
+    @property
+    def eta(self) -> Optional[float]:
+        total = self.total_estimate
+        if not total or self.bps <= 0:
+            return None
+        return max(0, total - self.total_size) / self.bps
+
+
 class FfmpegHlsDownloader(BaseDownloader):
     """FFmpeg HLS 다운로더"""
     
+    HOST_REPORT_SEC = 5.0  # 호스트별 통계 meta 보고 주기
+    
     def __init__(self):
         super().__init__()
         self._process: Optional[subprocess.Popen] = None
+        self._throttle: Optional[ProcessThrottle] = None
+        self._bucket = TokenBucket()
+
+    def set_rate_limit(self, bps: float):
+        """
+        세그먼트 직접 다운로드는 토큰 버킷, ffmpeg 프로세스는 실행 중 속도 변경이 불가하므로
+        SIGSTOP/SIGCONT 듀티 사이클로 제한
+        """
+        super().set_rate_limit(bps)
+        self._bucket.set_rate(self._rate_limit_bps)
+        if self._throttle:
+            self._throttle.set_rate(self._rate_limit_bps)
 
     def _build_hls_input_args(self):
         # Non-standard `.txt` manifests need the HLS demuxer selected before
@@ -51,50 +148,58 @@ class FfmpegHlsDownloader(BaseDownloader):
         try:
             os.makedirs(save_path, exist_ok=True)
             
-            # 파일명 결정
+            resume_state = options.get('resume_state') or {}
+            state_callback = options.get('state_callback')
+            
+            # 파일명 결정 (재개 시 이전에 정한 경로 유지)
             if not filename:
-                filename = f"download_{int(__import__('time').time())}.mp4"
+                if resume_state.get('filepath'):
+                    filename = os.path.basename(resume_state['filepath'])
+                else:
+                    filename = f"download_{int(time.time())}.mp4"
             
             filepath = os.path.abspath(os.path.join(save_path, filename))
             filepath = os.path.normpath(filepath)
             
             # ffmpeg 명령어 구성
             ffmpeg_path = options.get('ffmpeg_path', 'ffmpeg')
-            if options.get('effective_max_download_rate') or options.get('max_download_rate'):
-                logger.warning('[GDM] ffmpeg_hls downloader does not support strict bandwidth cap; total limit may be approximate for HLS tasks.')
             
-            cmd = [ffmpeg_path, '-y']
+            # 헤더 + 쿠키 파일
+            headers = self._merge_cookie_header(options.get('headers') or {}, options.get('cookies_file'))
+            
+            # VOD 재생목록이면 세그먼트 직접 다운로드 (재개 가능)
+            playlist = None
+            try:
+                playlist = load_media_playlist(url, headers)
+            except Exception as e:
+                logger.debug(f'[GDM] playlist preload failed, using ffmpeg input directly: {e}')
+            info_callback = options.get('info_callback')
+            if playlist and playlist.segments and info_callback:
+                info_callback({'duration': playlist.duration})
+            if playlist and self._segment_mode_supported(playlist):
+                if self._bucket.rate <= 0 and options.get('max_download_rate'):
+                    from .http_direct import HttpDirectDownloader
+                    self.set_rate_limit(HttpDirectDownloader._rate_to_bps(options.get('max_download_rate')))
+                return self._download_segments(
+                    playlist, filepath, headers, ffmpeg_path,
+                    progress_callback, state_callback, resume_state,
+                    window=int(options.get('hls_window') or 6),
+                    remux=str(options.get('hls_remux', True)).lower() not in ('false', '0', ''),
+                    max_skip=int(options.get('hls_max_skip_segments') or 0),
+                    mirrors=parse_mirrors(options.get('mirrors')),
+                    hedge=str(options.get('hls_hedge', False)).lower() in ('true', '1', 'on'),
+                    info_callback=info_callback,
+                )
+            
+            if self._rate_limit_bps > 0 and not ProcessThrottle.supported:
+                logger.warning('[GDM] ffmpeg_hls downloader cannot be throttled on this platform; total limit may be approximate for HLS tasks.')
             
-            # 헤더 추가
-            headers = options.get('headers', {})
-            cookies_file = options.get('cookies_file')
+            cmd = [ffmpeg_path, '-y']
             
             if headers:
                 header_str = '\r\n'.join([f'{k}: {v}' for k, v in headers.items() if v is not None])
                 if header_str:
                     cmd.extend(['-headers', header_str])
-            
-            if cookies_file and os.path.exists(cookies_file):
-                # FFmpeg basically uses custom headers for cookies if not using a library that supports it
-                # or we can pass it as a header
-                if 'Cookie' not in headers:
-                    try:
-                        with open(cookies_file, 'r') as f:
-                            cookie_lines = []
-                            for line in f:
-                                if line.startswith('#') or not line.strip(): continue
-                                parts = line.strip().split('\t')
-                                if len(parts) >= 7:
-                                    cookie_lines.append(f"{parts[5]}={parts[6]}")
-                            if cookie_lines:
-                                cookie_str = '; '.join(cookie_lines)
-                                if headers:
-                                    header_str += f'\r\nCookie: {cookie_str}'
-                                    cmd[-1] = header_str # Update headers
-                                else:
-                                    cmd.extend(['-headers', f'Cookie: {cookie_str}'])
-                    except Exception as ce:
-                        logger.error(f"Failed to read cookies_file: {ce}")
 
             # 입력 전 설정 (Reconnection & Allowed extensions for non-standard m3u8 like .txt)
             cmd.extend(self._build_hls_input_args())
@@ -105,6 +210,9 @@ class FfmpegHlsDownloader(BaseDownloader):
             # 코덱 복사 (트랜스코딩 없이 빠르게)
             cmd.extend(['-c', 'copy'])
             
+            # 진행률은 stdout 의 key=value 블록으로 (사람용 통계 줄은 끔)
+            cmd.extend(['-nostats', '-progress', 'pipe:1'])
+            
             # 출력 파일
             cmd.append(filepath)
             
@@ -112,47 +220,74 @@ class FfmpegHlsDownloader(BaseDownloader):
             safe_cmd = [str(x) if x is not None else "" for x in cmd]
             logger.debug(f'ffmpeg 명령어: {" ".join(safe_cmd[:15])}...')
             
-            # 먼저 duration 얻기 위해 ffprobe 실행
-            duration = self._get_duration(url, options.get('ffprobe_path', 'ffprobe'), headers)
+            # ffmpeg 직접 입력은 이어받기 불가, 재시작 시 같은 파일명만 유지
+            if state_callback:
+                state_callback({'filepath': filepath})
+            
+            # 길이는 미리 받은 재생목록의 EXTINF 합 (라이브 등 판별 불가 시 0 → 진행률 생략)
+            duration = playlist.duration if playlist else 0
+            total_segments = len(playlist.segments) if playlist else 0
             
-            # 프로세스 실행
+            # 프로세스 실행 (stdout: 진행률, stderr: 로그)
             self._process = subprocess.Popen(
                 cmd,
                 stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
+                stderr=subprocess.PIPE,
                 text=True,
                 bufsize=1
             )
             
-            # 출력 파싱 및 에러 메시지 캡처를 위한 변수
-            last_lines = []
+            # 오류 메시지용 stderr 마지막 줄 (파이프가 차서 ffmpeg 가 멈추지 않도록 계속 비움)
+            last_lines = deque(maxlen=20)
+            
+            def drain_stderr(stream):
+                try:
+                    for err_line in stream:
+                        if err_line.strip():
+                            last_lines.append(err_line.strip())
+                except (OSError, ValueError):
+                    pass
+            stderr_thread = threading.Thread(target=drain_stderr, args=(self._process.stderr,), daemon=True)
+            stderr_thread.start()
+            
+            # 출력 파일 증가량 기준 속도 제한 (전역 대역폭 관리자가 실행 중 조정)
+            self._throttle = ProcessThrottle(
+                lambda: os.path.getsize(filepath) if os.path.exists(filepath) else 0,
+                rate_bps=self._rate_limit_bps,
+            )
+            if self._paused:
+                self._throttle.set_paused(True)
+            self._throttle.start(self._process)
+            
+            tracker = FfmpegProgress(duration)
             for line in self._process.stdout:
                 if self._cancelled:
                     self._process.terminate()
                     return {'success': False, 'error': 'Cancelled'}
+                if not tracker.feed(line) or not progress_callback:
+                    continue
                 
-                line = line.strip()
-                if line:
-                    last_lines.append(line)
-                    if len(last_lines) > 20: last_lines.pop(0)
-                
-                # 진행률 계산 (time= 파싱)
-                if duration > 0 and progress_callback:
-                    time_match = re.search(r'time=(\d+):(\d+):(\d+)', line)
-                    if time_match:
-                        h, m, s = map(int, time_match.groups())
-                        current_time = h * 3600 + m * 60 + s
-                        progress = min(int(current_time / duration * 100), 99)
-                        
-                        # 속도 파싱
-                        speed = ''
-                        speed_match = re.search(r'speed=\s*([\d.]+)x', line)
-                        if speed_match:
-                            speed = f'{speed_match.group(1)}x'
-                        
-                        progress_callback(progress, speed, '')
+                eta = tracker.eta
+                detail = {
+                    'downloaded_bytes': tracker.total_size,
+                    'total_bytes': tracker.total_estimate,
+                    'speed_bps': int(tracker.bps),
+                    'eta_sec': int(eta) if eta is not None else 0,
+                }
+                if total_segments:
+                    detail.update(
+                        segments_done=playlist.segments_before(tracker.out_time),
+                        segments_total=total_segments,
+                    )
+                progress_callback(
+                    min(int(tracker.fraction * 100), 99),
+                    f'{tracker.bps / 1024 ** 2:.2f}MB/s' if tracker.bps > 0 else '',
+                    time.strftime('%H:%M:%S', time.gmtime(eta)) if eta is not None else '',
+                    **detail
+                )
             
             self._process.wait()
+            stderr_thread.join(timeout=2)
             
             if self._process.returncode == 0 and os.path.exists(filepath):
                 if progress_callback:
@@ -167,21 +302,216 @@ class FfmpegHlsDownloader(BaseDownloader):
             logger.error(f'FfmpegHls download error: {e}')
             logger.error(traceback.format_exc())
             return {'success': False, 'error': str(e)}
+        finally:
+            if self._throttle:
+                self._throttle.stop()
     
+    @staticmethod
+    def _merge_cookie_header(headers: Dict[str, Any], cookies_file: Optional[str]) -> Dict[str, Any]:
+        """Netscape 쿠키 파일을 Cookie 헤더로 병합 (이미 Cookie 헤더가 있으면 그대로)"""
+        headers = dict(headers)
+        if not cookies_file or not os.path.exists(cookies_file) or 'Cookie' in headers:
+            return headers
+        try:
+            with open(cookies_file, 'r') as f:
+                cookie_lines = []
+                for line in f:
+                    if line.startswith('#') or not line.strip(): continue
+                    parts = line.strip().split('\t')
+                    if len(parts) >= 7:
+                        cookie_lines.append(f"{parts[5]}={parts[6]}")
+            if cookie_lines:
+                headers['Cookie'] = '; '.join(cookie_lines)
+        except Exception as ce:
+            logger.error(f"Failed to read cookies_file: {ce}")
+        return headers
+
+    @staticmethod
+    def _segment_mode_supported(playlist: HlsPlaylist) -> bool:
+        """직접 다운로드 가능한 재생목록인지 (VOD, 평문 또는 AES-128 세그먼트)"""
+        if not (playlist.endlist and playlist.segments) or playlist.has_alternate_media:
+            return False
+        methods = {(s.key or {}).get('METHOD', 'NONE').upper() for s in playlist.segments}
+        if methods - {'NONE', 'AES-128'}:
+            return False
+        if 'AES-128' in methods:
+            # 암호화된 초기화 구간(EXT-X-MAP)은 ffmpeg 에 맡김
+            return aes_available() and not playlist.has_map
+        return True
+
+    def _download_segments(
+        self,
+        playlist: HlsPlaylist,
+        filepath: str,
+        headers: Dict[str, Any],
+        ffmpeg_path: str,
+        progress_callback: Optional[Callable],
+        state_callback: Optional[Callable],
+        resume_state: Dict[str, Any],
+        window: int = 6,
+        remux: bool = True,
+        max_skip: int = 1,
+        mirrors: Optional[List[str]] = None,
+        hedge: bool = False,
+        info_callback: Optional[Callable] = None,
+    ) -> Dict[str, Any]:
+        """
+        세그먼트를 window 개씩 동시에 받아 세그먼트별 파일로 저장하고 완료 비트맵 기록
+        (재시작/재시도 시 빠진 세그먼트만 받음), 모두 받으면 순서대로 합친 뒤 변환
+        재시도 라운드까지 실패한 세그먼트가 max_skip 개 이하면 건너뛰고 완료
+        호스트(미러)별 통계는 주기적으로 태스크 meta['hls_hosts'] 로 보고
+        """
+        segments = playlist.segments
+        total = len(segments)
+        duration = playlist.duration
+        staging = filepath + ('.gdm.mp4' if playlist.has_map else '.gdm.ts')
+        # 비트맵은 resume_state 가 없어도(같은 경로 재등록) 부분 파일 옆에서 찾음
+        bitmap = SegmentBitmap.open(filepath + '.gdm.parts', total, playlist_fingerprint(playlist))
+        if bitmap.count:
+            logger.info(f'[GDM] HLS resume: {bitmap.count}/{total} segments already on disk ({bitmap.bytes / 1024 ** 2:.1f}MB)')
+        
+        def checkpoint():
+            if state_callback:
+                state_callback({
+                    'filepath': filepath,
+                    'hls_parts': bitmap.directory,
+                    'hls_segments_total': total,
+                    'hls_segments_done': bitmap.count,
+                    'partial_files': [bitmap.directory, staging],
+                })
+        checkpoint()
+        
+        engine = HlsSegmentEngine(
+            playlist, headers, window=window, bucket=self._bucket,
+            is_cancelled=lambda: self._cancelled, is_paused=lambda: self._paused,
+            mirrors=mirrors or (), hedge=hedge,
+        )
+        started = time.monotonic()
+        report_lock = threading.Lock()
+        played = sum(segments[i].duration for i in bitmap.done())
+        last_report = 0.0
+        
+        def report_hosts():
+            if info_callback:
+                info_callback({'meta': {'hls_hosts': engine.mirrors.snapshot()}})
+        
+        def on_segment(index: int, data: bytes):
+            nonlocal played, last_report
+            bitmap.store(index, data)
+            with report_lock:
+                played += segments[index].duration
+                if time.monotonic() - last_report >= self.HOST_REPORT_SEC:
+                    last_report = time.monotonic()
+                    report_hosts()
+                done, stored = bitmap.count, bitmap.bytes
+                checkpoint()
+                if progress_callback:
+                    elapsed = max(time.monotonic() - started, 0.001)
+                    rate = engine.fetched_bytes / elapsed
+                    remaining = (stored / done) * (total - done) if done else 0
+                    eta = time.strftime('%H:%M:%S', time.gmtime(remaining / rate)) if rate > 0 and remaining else ''
+                    # 세그먼트 길이가 제각각이라 재생 시간 기준으로 진행률 계산
+                    progress = played / duration if duration > 0 else done / total
+                    progress_callback(
+                        min(int(progress * 100), 99), f'{rate / 1024 ** 2:.2f}MB/s', eta,
+                        segments_done=done, segments_total=total,
+                        downloaded_bytes=stored, total_bytes=int(stored + remaining),
+                        speed_bps=int(rate), eta_sec=int(remaining / rate) if rate > 0 else 0,
+                    )
+        
+        try:
+            failed = engine.run(bitmap.missing(), on_segment)
+            if failed is None:
+                return {'success': False, 'error': 'Cancelled'}
+            if len(failed) > max_skip:
+                # 받은 세그먼트는 비트맵에 남아 재시도 시 나머지만 받음
+                return {'success': False, 'error': f'HLS: {len(failed)}/{total} segments failed (first: #{failed[0]})'}
+            if failed:
+                logger.warning(f'[GDM] HLS skipping {len(failed)} unrecoverable segment(s): {failed}')
+            
+            # 재생 순서대로 합치기 (fMP4 는 초기화 구간이 바뀔 때마다 앞에 기록)
+            last_init = None
+            with open(staging, 'wb') as out:
+                for index in bitmap.done():
+                    segment = segments[index]
+                    if segment.init and segment.init != last_init:
+                        out.write(engine.init_data(segment))
+                        last_init = segment.init
+                    with open(bitmap.part_path(index), 'rb') as part:
+                        shutil.copyfileobj(part, out, 1024 * 1024)
+        finally:
+            engine.close()
+            report_hosts()
+        
+        result = self._finalize_staging(staging, filepath, ffmpeg_path, remux, playlist.has_map)
+        if result['success']:
+            bitmap.remove()
+            if failed:
+                result['skipped_segments'] = failed
+            if progress_callback:
+                progress_callback(100, '', '')
+        return result
+
+    @staticmethod
+    def _finalize_staging(staging: str, filepath: str, ffmpeg_path: str, remux: bool, fmp4: bool) -> Dict[str, Any]:
+        """
+        임시 파일 → 최종 파일
+        remux: ffmpeg 로 컨테이너만 변환 (재인코딩 없음), 아니면 TS 는 .ts 확장자로, fMP4 는 그대로 이동
+        """
+        if remux:
+            try:
+                result = subprocess.run(
+                    [ffmpeg_path, '-y', '-i', staging, '-c', 'copy', filepath],
+                    stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+                )
+            except FileNotFoundError:
+                logger.warning(f'[GDM] ffmpeg not found ({ffmpeg_path}), keeping HLS output without remux')
+            else:
+                if result.returncode != 0 or not os.path.exists(filepath):
+                    last = (result.stdout or '').strip().splitlines()[-1:] or ['Unknown']
+                    logger.error(f'FFmpeg remux failed with return code {result.returncode}: {last[0]}')
+                    return {'success': False, 'error': f'FFmpeg Error({result.returncode}): {last[0]}'}
+                try:
+                    os.remove(staging)
+                except OSError:
+                    pass
+                return {'success': True, 'filepath': filepath}
+        if not fmp4:
+            filepath = os.path.splitext(filepath)[0] + '.ts'
+        os.replace(staging, filepath)
+        return {'success': True, 'filepath': filepath}
+
     def get_info(self, url: str) -> Dict[str, Any]:
-        """스트림 정보 추출"""
+        """스트림 정보 추출 (재생목록 EXTINF 합)"""
         try:
-            duration = self._get_duration(url, 'ffprobe', {})
+            playlist = load_media_playlist(url)
+            if not playlist:
+                return {}
             return {
-                'duration': duration,
+                'duration': playlist.duration,
+                'segments': len(playlist.segments),
                 'type': 'hls',
             }
         except:
             return {}
     
+    def pause(self):
+        """다운로드 일시정지 (프로세스 정지)"""
+        super().pause()
+        if self._throttle:
+            self._throttle.set_paused(True)
+    
+    def resume(self):
+        """다운로드 재개"""
+        super().resume()
+        if self._throttle:
+            self._throttle.set_paused(False)
+    
     def cancel(self):
         """다운로드 취소"""
         super().cancel()
+        if self._throttle:
+            self._throttle.stop()
         if self._process:
             try:
                 # [FIX] 파이프 명시적으로 닫기
@@ -193,26 +523,3 @@ class FfmpegHlsDownloader(BaseDownloader):
                 try: self._process.wait(timeout=1)
                 except: self._process.kill()
             except: pass
-    
-    def _get_duration(self, url: str, ffprobe_path: str, headers: Dict) -> float:
-        """ffprobe로 영상 길이 획득"""
-        try:
-            cmd = [ffprobe_path, '-v', 'error']
-            cmd.extend(self._build_hls_input_args())
-            cmd.extend([
-                   '-show_entries', 'format=duration',
-                   '-of', 'default=noprint_wrappers=1:nokey=1',
-            ])
-            
-            if headers:
-                header_str = '\r\n'.join([f'{k}: {v}' for k, v in headers.items()])
-                cmd.extend(['-headers', header_str])
-            
-            cmd.append(url)
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-            if result.returncode == 0:
-                return float(result.stdout.strip())
-        except:
-            pass
-        return 0
@@ -0,0 +1,458 @@
+"""
+HLS 세그먼트 병렬 다운로드 엔진 (ffmpeg 없이 VOD 재생목록 수신)
+- keep-alive 연결 풀(requests.Session) 위에서 세그먼트를 window 개까지 동시에 받아
+  받는 즉시 호출 측에 넘김 (SegmentBitmap 의 세그먼트별 파일로 저장, 합치기는 끝난 뒤 순서대로)
+- 실패한 세그먼트는 그 자리에서 재시도하고, 그래도 실패하면 나머지를 모두 받은 뒤
+  실패한 것만 다시 도는 라운드를 반복 (끝까지 실패한 목록은 호출 측이 건너뛸지 결정)
+- SegmentBitmap: 완료 세그먼트 비트맵을 부분 파일 옆(<파일>.gdm.parts/bitmap.json)에 저장,
+  재시작/재시도/같은 경로 재등록 시 빠진 세그먼트만 받음 (재생목록 지문이 다르면 초기화)
+- 미러(MirrorSet): 재시도는 아직 안 써 본 가장 건강한 호스트로, hedge 가 켜져 있으면
+  호스트 p95 지연을 넘긴 요청에 다른 호스트로 중복 요청을 보내 먼저 끝난 쪽 사용
+- AES-128 (EXT-X-KEY) 복호화: 키 URI 별 1회 수신, IV 는 IV 속성 또는 미디어 시퀀스 번호
+  (cryptography 또는 pycryptodome 필요, 없으면 aes_available() False → 호출 측이 ffmpeg 로 처리)
+- fMP4(EXT-X-MAP): 초기화 구간이 바뀔 때마다 해당 세그먼트 앞에 기록
+- EXT-X-BYTERANGE: Range 요청
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .hls_mirrors import MirrorSet
+from .hls_playlist import HlsPlaylist, HlsSegment
+
+try:
+    from ..setup import P
+    logger = P.logger
+except:
+    import logging
+    logger = logging.getLogger(__name__)
+
+
+def _load_aes() -> Optional[Callable[[bytes, bytes, bytes], bytes]]:
+    """AES-128-CBC 복호 함수 (key, iv, data) → bytes, 라이브러리가 없으면 None"""
+    try:
+        from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+        def decrypt(key: bytes, iv: bytes, data: bytes) -> bytes:
+            decryptor = Cipher(algorithms.AES(key), modes.CBC(iv)).decryptor()
+            return decryptor.update(data) + decryptor.finalize()
+        return decrypt
+    except ImportError:
+        pass
+    try:
+        from Crypto.Cipher import AES
+
+        def decrypt(key: bytes, iv: bytes, data: bytes) -> bytes:
+            return AES.new(key, AES.MODE_CBC, iv).decrypt(data)
+        return decrypt
+    except ImportError:
+        return None
+
+
+_aes_decrypt = _load_aes()
+
+
+def aes_available() -> bool:
+    return _aes_decrypt is not None
+
+
+def _unpad(data: bytes) -> bytes:
+    """PKCS7 패딩 제거 (형식이 맞지 않으면 그대로)"""
+    pad = data[-1] if data else 0
+    if 1 <= pad <= 16 and data[-pad:] == bytes([pad]) * pad:
+        return data[:-pad]
+    return data
+
+
+def _range_header(byterange: Optional[Tuple[int, int]]) -> Dict[str, str]:
+    if not byterange:
+        return {}
+    length, offset = byterange
+    return {'Range': f'bytes={offset}-{offset + length - 1}'}
+
+
+def playlist_fingerprint(playlist: HlsPlaylist) -> str:
+    """
+    재생목록 구조 지문 (세그먼트 수/길이/바이트 범위/초기화 구간)
+    서명 토큰이 붙는 세그먼트 URI 는 요청마다 달라질 수 있어 제외
+    """
+    digest = hashlib.sha1(str(len(playlist.segments)).encode())
+    for s in playlist.segments:
+        digest.update(f'|{s.duration:.3f}:{s.byterange}:{bool(s.init)}'.encode())
+    return digest.hexdigest()
+
+
+class SegmentBitmap:
+    """세그먼트별 파일 + 완료 비트맵 (작업 디렉터리 하나에 보관)"""
+
+    FILENAME = 'bitmap.json'
+
+    def __init__(self, directory: str, total: int, fingerprint: str):
+        self.directory = directory
+        self.total = total
+        self.fingerprint = fingerprint
+        self._bits = bytearray((total + 7) // 8)
+        self._lock = threading.Lock()
+        self.bytes = 0  # 완료 세그먼트 파일 크기 합
+
+    @classmethod
+    def open(cls, directory: str, total: int, fingerprint: str) -> 'SegmentBitmap':
+        """저장된 비트맵 복원 (지문이 다르거나 손상됐으면 디렉터리 비우고 새로 시작)"""
+        bitmap = cls(directory, total, fingerprint)
+        try:
+            with open(os.path.join(directory, cls.FILENAME), 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            if saved.get('total') == total and saved.get('fingerprint') == fingerprint:
+                bits = bytes.fromhex(saved.get('bits') or '')
+                if len(bits) == len(bitmap._bits):
+                    bitmap._bits[:] = bits
+        except (OSError, ValueError):
+            pass
+        if not bitmap.count:
+            shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory, exist_ok=True)
+        # 파일이 사라진 세그먼트는 다시 받음
+        for index in list(bitmap.done()):
+            try:
+                bitmap.bytes += os.path.getsize(bitmap.part_path(index))
+            except OSError:
+                bitmap._bits[index >> 3] &= ~(1 << (index & 7))
+        return bitmap
+
+    def part_path(self, index: int) -> str:
+        return os.path.join(self.directory, f'{index:06d}.seg')
+
+    def __contains__(self, index: int) -> bool:
+        return bool(self._bits[index >> 3] & (1 << (index & 7)))
+
+    @property
+    def count(self) -> int:
+        return sum(bin(b).count('1') for b in self._bits)
+
+    def done(self) -> Iterable[int]:
+        return (i for i in range(self.total) if i in self)
+
+    def missing(self) -> List[int]:
+        return [i for i in range(self.total) if i not in self]
+
+    def store(self, index: int, data: bytes) -> None:
+        """세그먼트 파일 기록 후 비트 설정 (임시 파일 → 교체, 비트맵도 원자적 교체로 저장)"""
+        path = self.part_path(index)
+        with open(path + '.tmp', 'wb') as f:
+            f.write(data)
+        os.replace(path + '.tmp', path)
+        with self._lock:
+            if index not in self:
+                self.bytes += len(data)
+            self._bits[index >> 3] |= 1 << (index & 7)
+            state = {'total': self.total, 'fingerprint': self.fingerprint, 'bits': self._bits.hex()}
+            target = os.path.join(self.directory, self.FILENAME)
+            with open(target + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+            os.replace(target + '.tmp', target)
+
+    def remove(self) -> None:
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class HlsSegmentError(Exception):
+    """세그먼트 재시도 소진"""
+
+    def __init__(self, index: int, cause: Exception):
+        super().__init__(f'segment {index}: {cause}')
+        self.index = index
+        self.cause = cause
+
+
+class HlsSegmentEngine:
+    """세그먼트 동시 수신 (재시도 라운드 포함)"""
+
+    RETRIES = 3  # 세그먼트 요청 하나의 즉시 재시도
+    RETRY_ROUNDS = 2  # 전체 패스 후 실패한 세그먼트만 다시 도는 횟수
+    RETRY_ROUND_DELAY = 5  # 라운드 전 대기 (라운드마다 배수 증가)
+    CHUNK_SIZE = 64 * 1024
+    TIMEOUT = 60
+
+    def __init__(
+        self,
+        playlist: HlsPlaylist,
+        headers: Dict[str, Any],
+        window: int = 6,
+        bucket=None,
+        is_cancelled: Callable[[], bool] = lambda: False,
+        is_paused: Callable[[], bool] = lambda: False,
+        mirrors: Iterable[str] = (),
+        hedge: bool = False,
+    ):
+        self.playlist = playlist
+        self.segments = playlist.segments
+        self.window = max(1, int(window or 1))
+        self.bucket = bucket
+        self.is_cancelled = is_cancelled
+        self.is_paused = is_paused
+        self.fetched_bytes = 0  # 네트워크 수신량 (속도 계산용, 중복 요청 포함)
+        self.mirrors = MirrorSet(playlist.url, mirrors)
+        self.hedge = hedge
+        self._headers = {k: v for k, v in (headers or {}).items() if v is not None}
+        self._lock = threading.Lock()
+        self._queue: List[int] = []
+        self._failed: List[int] = []
+        self._error: Optional[Exception] = None
+        self._stop = False
+        self._keys: Dict[str, bytes] = {}
+        self._inits: Dict[Tuple[str, Any], bytes] = {}
+        self._aux_lock = threading.Lock()  # 키/초기화 구간 1회 수신
+        self._local = threading.local()
+        self._sessions: List[Any] = []
+        # 실제 요청은 이 풀에서 실행 (작업 스레드는 결과를 기다리며 필요하면 중복 요청 추가)
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def _session(self):
+        """스레드별 Session (각자 keep-alive 연결 유지, 세그먼트마다 새 TCP/TLS 연결 없음)"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=8, pool_maxsize=2)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers.update(self._headers)
+            self._local.session = session
+            with self._lock:
+                self._sessions.append(session)
+        return session
+
+    def close(self) -> None:
+        """요청 풀과 모든 Session 정리 (run()/init_data() 를 다 쓴 뒤 호출)"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            try:
+                session.close()
+            except Exception:
+                pass
+
+    def run(self, indices: Iterable[int], on_segment: Callable[[int, bytes], None]) -> Optional[List[int]]:
+        """
+        indices 세그먼트를 window 개씩 동시에 받아 받는 대로 on_segment(index, 복호화된 데이터) 호출
+        (작업 스레드에서 호출됨), 재시도 라운드까지 실패한 인덱스 목록 반환, 취소되면 None
+        on_segment 에서 난 예외(디스크 부족 등)는 즉시 중단 후 그대로 전달
+        """
+        pending = sorted(indices)
+        for round_no in range(self.RETRY_ROUNDS + 1):
+            if not pending:
+                return []
+            if round_no:
+                logger.warning(f'[GDM] HLS retrying {len(pending)} failed segment(s), round {round_no}')
+                deadline = time.monotonic() + self.RETRY_ROUND_DELAY * round_no
+                while time.monotonic() < deadline:
+                    if self.is_cancelled():
+                        return None
+                    time.sleep(0.2)
+            pending = self._run_pass(pending, on_segment)
+            if pending is None:
+                return None
+        return pending
+
+    def _run_pass(self, indices: List[int], on_segment: Callable[[int, bytes], None]) -> Optional[List[int]]:
+        self._queue = list(reversed(indices))
+        self._failed = []
+        self._stop = False
+        if self._pool is None:
+            # 작업 스레드마다 원 요청 + 중복 요청 1개
+            self._pool = ThreadPoolExecutor(max_workers=self.window * 2, thread_name_prefix='gdm-hls-get')
+        workers = [
+            threading.Thread(target=self._worker, args=(on_segment,), name=f'gdm-hls-{i}', daemon=True)
+            for i in range(min(self.window, len(indices)))
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            for worker in workers:
+                while worker.is_alive():
+                    worker.join(0.2)
+                    if self.is_cancelled() or self._error is not None:
+                        self._stop = True
+        finally:
+            self._stop = True
+            for worker in workers:
+                worker.join(timeout=5)
+        if self._error is not None:
+            raise self._error
+        if self.is_cancelled():
+            return None
+        return sorted(self._failed)
+
+    def _worker(self, on_segment: Callable[[int, bytes], None]) -> None:
+        try:
+            while not self._stopped():
+                with self._lock:
+                    if not self._queue:
+                        return
+                    index = self._queue.pop()
+                try:
+                    data = self._fetch_segment(index)
+                except HlsSegmentError as e:
+                    logger.warning(f'[GDM] HLS {e}')
+                    with self._lock:
+                        self._failed.append(index)
+                    continue
+                if data is None:  # 취소
+                    return
+                on_segment(index, data)
+        except Exception as e:
+            with self._lock:
+                if self._error is None:
+                    self._error = e
+
+    def _wait_paused(self) -> bool:
+        """일시정지 동안 대기, 취소/중단이면 False"""
+        while self.is_paused() and not self._stopped():
+            time.sleep(0.2)
+        return not self._stopped()
+
+    def _stopped(self) -> bool:
+        return self._stop or self.is_cancelled()
+
+    def _get(self, url: str, byterange: Optional[Tuple[int, int]] = None, throttle: bool = True,
+             abort: Optional[threading.Event] = None) -> Optional[bytes]:
+        """요청 하나 수신, 취소되거나 abort 가 설정되면(경쟁에서 진 중복 요청) None"""
+        chunks = []
+        with self._session().get(url, stream=True, timeout=self.TIMEOUT, headers=_range_header(byterange)) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=self.CHUNK_SIZE):
+                if not self._wait_paused() or (abort is not None and abort.is_set()):
+                    return None
+                chunks.append(chunk)
+                with self._lock:
+                    self.fetched_bytes += len(chunk)
+                if throttle and self.bucket is not None:
+                    self.bucket.consume(len(chunk), self._stopped)
+        data = b''.join(chunks)
+        if byterange and response.status_code == 200 and len(data) > byterange[0]:
+            # Range 를 무시한 서버: 전체에서 잘라냄
+            data = data[byterange[1]:byterange[1] + byterange[0]]
+        return data
+
+    def _fetch_segment(self, index: int) -> Optional[bytes]:
+        segment = self.segments[index]
+        tried: List[str] = []
+        for attempt in range(self.RETRIES):
+            if not self._wait_paused():
+                return None
+            # 재시도는 아직 시도하지 않은 호스트 중 가장 건강한 곳 (미러가 없으면 같은 URL)
+            url = self.mirrors.pick(segment.uri, exclude=tried)
+            tried.append(self.mirrors.host_of(url))
+            try:
+                data = self._race(url, segment)
+                if data is None:
+                    return None
+                return self._decrypt(segment, data)
+            except Exception as e:
+                if attempt == self.RETRIES - 1:
+                    raise HlsSegmentError(index, e)
+                logger.warning(f'[GDM] HLS segment {index} retry ({attempt + 1}) via {self.mirrors.host_of(url)}: {e}')
+                time.sleep(1 + attempt)
+        return None
+
+    def _timed_get(self, url: str, byterange: Optional[Tuple[int, int]], abort: threading.Event) -> Optional[bytes]:
+        """요청 하나 + 호스트 통계 기록 (중단된 요청은 기록하지 않음)"""
+        started = time.monotonic()
+        try:
+            data = self._get(url, byterange, abort=abort)
+        except Exception:
+            self.mirrors.record(url, time.monotonic() - started, 0, ok=False)
+            raise
+        if data is not None:
+            self.mirrors.record(url, time.monotonic() - started, len(data), ok=True)
+        return data
+
+    def _race(self, url: str, segment: HlsSegment) -> Optional[bytes]:
+        """
+        url 로 요청하고, hedge 가 켜져 있고 그 호스트 p95 지연을 넘기면
+        다른 호스트(없으면 같은 URL)로 중복 요청을 보내 먼저 성공한 결과 사용
+        """
+        aborts = {url: threading.Event()}
+        futures = {self._pool.submit(self._timed_get, url, segment.byterange, aborts[url]): url}
+        threshold = self.mirrors.p95(url) if self.hedge else None
+        if threshold is not None:
+            done, _ = wait(list(futures), timeout=threshold)
+            if not done and not self._stopped():
+                alternate = self.mirrors.pick(segment.uri, exclude=[self.mirrors.host_of(url)])
+                key = alternate if alternate not in aborts else alternate + '#hedge'
+                aborts[key] = threading.Event()
+                futures[self._pool.submit(self._timed_get, alternate, segment.byterange, aborts[key])] = key
+                self.mirrors.record_hedge(alternate)
+        pending = set(futures)
+        first_error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                error = future.exception()
+                if error is not None:
+                    first_error = first_error or error
+                    continue
+                data = future.result()
+                if data is None and not self._stopped():
+                    continue  # 진 쪽이 중단된 경우
+                for key, event in aborts.items():
+                    if key != futures[future]:
+                        event.set()
+                if data is not None and futures[future] != url:
+                    self.mirrors.record_hedge(futures[future].split('#')[0], won=True)
+                return data
+        raise first_error
+
+    def init_data(self, segment: HlsSegment) -> bytes:
+        """세그먼트의 fMP4 초기화 구간 (URI+범위별 1회 수신, run() 이 끝난 뒤 호출)"""
+        self._stop = False  # 마지막 패스의 중단 표시 해제 (취소 여부는 is_cancelled 로 따로 확인)
+        return self._fetch_init(segment)
+
+    def _fetch_init(self, segment: HlsSegment) -> bytes:
+        with self._aux_lock:
+            if segment.init not in self._inits:
+                uri, byterange = segment.init
+                for attempt in range(self.RETRIES):
+                    try:
+                        self._inits[segment.init] = self._get(uri, byterange, throttle=False) or b''
+                        break
+                    except Exception as e:
+                        if attempt == self.RETRIES - 1:
+                            raise HlsSegmentError(-1, e)
+                        time.sleep(1 + attempt)
+            return self._inits[segment.init]
+
+    def _key(self, uri: str) -> bytes:
+        with self._aux_lock:
+            if uri not in self._keys:
+                response = self._session().get(uri, timeout=self.TIMEOUT)
+                response.raise_for_status()
+                if len(response.content) != 16:
+                    raise ValueError(f'invalid AES-128 key length {len(response.content)}')
+                self._keys[uri] = response.content
+            return self._keys[uri]
+
+    def _decrypt(self, segment: HlsSegment, data: bytes) -> bytes:
+        key = segment.key or {}
+        method = (key.get('METHOD') or 'NONE').upper()
+        if method == 'NONE':
+            return data
+        if method != 'AES-128' or _aes_decrypt is None:
+            raise ValueError(f'unsupported HLS encryption: {method}')
+        if len(data) % 16:
+            raise ValueError(f'encrypted segment length {len(data)} is not a multiple of 16')
+        iv_attr = key.get('IV') or ''
+        if iv_attr:
+            iv = bytes.fromhex(iv_attr[2:] if iv_attr.lower().startswith('0x') else iv_attr).rjust(16, b'\0')
+        else:
+            iv = segment.sequence.to_bytes(16, 'big')
+        return _unpad(_aes_decrypt(self._key(key.get('URI', '')), iv, data))
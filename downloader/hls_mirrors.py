@@ -0,0 +1,168 @@
+"""
+HLS 세그먼트 미러 선택 / 호스트별 통계
+- 세그먼트 URI 의 원래 호스트 + options['mirrors'] 의 대체 기본 URL 을 후보로 두고
+  호스트별 지연(세그먼트 한 개 수신 시간)과 오류율을 기록해 가장 건강한 호스트 순으로 선택
+- 미러 지정: 'https://cdn2.example.com' 처럼 호스트만 주면 호스트만 바꾸고,
+  경로까지 주면 재생목록 디렉터리 아래 상대 경로를 그 경로 뒤에 붙임
+- 연속 오류가 쌓인 호스트는 잠시 후보에서 뺌 (모두 빠지면 그래도 가장 나은 곳 사용)
+- p95: 지연 표본이 충분하면 중복 요청(헤징) 기준 시간으로 사용
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+
+def parse_mirrors(value: Any) -> List[str]:
+    """목록 또는 쉼표/줄바꿈 구분 문자열 → 기본 URL 목록"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.replace('\n', ',').split(',')
+    return [v.strip() for v in value if v and v.strip()]
+
+
+class HostStats:
+    """호스트 하나의 요청 통계"""
+
+    WINDOW = 50  # 지연 표본 수 (최근 것만)
+    MIN_SAMPLES = 20  # p95 를 믿을 최소 표본 수
+    ERROR_ALPHA = 0.2  # 최근 오류율 EWMA 가중치
+    COOLDOWN_AFTER = 3  # 연속 오류 N회면 잠시 제외
+    COOLDOWN_SEC = 30.0
+
+    def __init__(self, host: str):
+        self.host = host
+        self.requests = 0
+        self.errors = 0
+        self.bytes = 0
+        self.hedges = 0  # 이 호스트로 보낸 중복 요청 수
+        self.hedge_wins = 0  # 중복 요청이 먼저 끝난 횟수
+        self.latencies: Deque[float] = deque(maxlen=self.WINDOW)
+        self.recent_error = 0.0
+        self.consecutive_errors = 0
+        self.cooldown_until = 0.0
+
+    def record(self, seconds: float, nbytes: int, ok: bool) -> None:
+        self.requests += 1
+        self.recent_error = self.recent_error * (1 - self.ERROR_ALPHA) + (0.0 if ok else self.ERROR_ALPHA)
+        if ok:
+            self.bytes += nbytes
+            self.latencies.append(seconds)
+            self.consecutive_errors = 0
+        else:
+            self.errors += 1
+            self.consecutive_errors += 1
+            if self.consecutive_errors >= self.COOLDOWN_AFTER:
+                self.cooldown_until = time.monotonic() + self.COOLDOWN_SEC
+
+    def mean(self) -> Optional[float]:
+        return sum(self.latencies) / len(self.latencies) if self.latencies else None
+
+    def p95(self) -> Optional[float]:
+        if len(self.latencies) < self.MIN_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+    def score(self, baseline: float) -> float:
+        """낮을수록 건강 (표본 없는 호스트는 baseline 지연으로 간주해 한 번은 시험됨)"""
+        mean = self.mean()
+        return (baseline if mean is None else mean) * (1 + 4 * self.recent_error)
+
+    def snapshot(self) -> Dict[str, Any]:
+        mean, p95 = self.mean(), self.p95()
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'error_rate': round(self.errors / self.requests, 3) if self.requests else 0,
+            'avg_ms': int(mean * 1000) if mean is not None else None,
+            'p95_ms': int(p95 * 1000) if p95 is not None else None,
+            'mb': round(self.bytes / 1024 ** 2, 1),
+            'hedges': self.hedges,
+            'hedge_wins': self.hedge_wins,
+        }
+
+
+class MirrorSet:
+    """세그먼트별 후보 호스트 순위 + URL 변환"""
+
+    def __init__(self, playlist_url: str, mirrors: Iterable[str] = ()):
+        self._base = urljoin(playlist_url, '.')  # 재생목록 디렉터리 (상대 경로 기준)
+        self._mirrors: List[str] = []
+        for mirror in mirrors:
+            if '://' not in mirror:
+                mirror = 'https://' + mirror
+            self._mirrors.append(mirror.rstrip('/'))
+        self._stats: Dict[str, HostStats] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def has_mirrors(self) -> bool:
+        return bool(self._mirrors)
+
+    def _stat(self, host: str) -> HostStats:
+        stats = self._stats.get(host)
+        if stats is None:
+            stats = self._stats[host] = HostStats(host)
+        return stats
+
+    def candidates(self, uri: str) -> List[str]:
+        """uri 를 받을 수 있는 URL 목록 (원래 URL 먼저)"""
+        urls = [uri]
+        for mirror in self._mirrors:
+            parts = urlsplit(mirror)
+            if parts.path.strip('/') and uri.startswith(self._base):
+                url = f'{mirror}/{uri[len(self._base):]}'
+            else:
+                original = urlsplit(uri)
+                url = urlunsplit((parts.scheme, parts.netloc, original.path, original.query, ''))
+            if url not in urls:
+                urls.append(url)
+        return urls
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        return urlsplit(url).netloc
+
+    def rank(self, uri: str, exclude: Iterable[str] = ()) -> List[str]:
+        """건강한 순서의 후보 URL (exclude 호스트 제외, 같은 점수면 원래 URL 우선)"""
+        excluded = set(exclude)
+        urls = [u for u in self.candidates(uri) if self.host_of(u) not in excluded]
+        now = time.monotonic()
+        with self._lock:
+            means = [s.mean() for s in self._stats.values() if s.mean() is not None]
+            baseline = min(means) if means else 0.0
+            keyed = []
+            for order, url in enumerate(urls):
+                stats = self._stat(self.host_of(url))
+                cooling = stats.cooldown_until > now
+                keyed.append((cooling, stats.score(baseline), order, url))
+        return [k[-1] for k in sorted(keyed)]
+
+    def pick(self, uri: str, exclude: Iterable[str] = ()) -> str:
+        """가장 건강한 후보 (모두 제외됐으면 제외 없이 다시 고름)"""
+        ranked = self.rank(uri, exclude)
+        return ranked[0] if ranked else self.rank(uri)[0]
+
+    def record(self, url: str, seconds: float, nbytes: int, ok: bool) -> None:
+        with self._lock:
+            self._stat(self.host_of(url)).record(seconds, nbytes, ok)
+
+    def record_hedge(self, url: str, won: bool = False) -> None:
+        with self._lock:
+            stats = self._stat(self.host_of(url))
+            if won:
+                stats.hedge_wins += 1
+            else:
+                stats.hedges += 1
+
+    def p95(self, url: str) -> Optional[float]:
+        with self._lock:
+            return self._stat(self.host_of(url)).p95()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """호스트별 통계 (태스크 meta 표시용)"""
+        with self._lock:
+            return {host: stats.snapshot() for host, stats in self._stats.items() if stats.requests}
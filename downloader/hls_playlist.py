@@ -0,0 +1,177 @@
+"""
+HLS 재생목록(m3u8) 파서
+- 마스터 재생목록이면 최고 대역폭 variant 선택
+- 세그먼트 URI 절대경로화, EXTINF 길이, 암호화 키/디스컨티뉴어티 정보 보존
+- EXT-X-BYTERANGE / EXT-X-MAP BYTERANGE 는 (길이, 시작 오프셋)으로 풀어 둠 (오프셋 생략 시 직전 범위 뒤)
+- 전체 길이/세그먼트별 진행 위치는 EXTINF 합으로 계산 (ffprobe 불필요)
+"""
+import bisect
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+_ATTR_RE = re.compile(r'([A-Z0-9-]+)=("[^"]*"|[^,]*)')
+
+
+def parse_attributes(value: str) -> Dict[str, str]:
+    """'METHOD=AES-128,URI="..."' → {'METHOD': 'AES-128', 'URI': '...'}"""
+    return {k: v.strip('"') for k, v in _ATTR_RE.findall(value or '')}
+
+
+def _parse_byterange(value: str, uri: str, last_end: Dict[str, int]) -> Tuple[int, int]:
+    """'<n>[@<o>]' → (length, offset), 오프셋 생략 시 같은 URI 의 직전 범위 끝"""
+    length, _, offset = (value or '').strip().partition('@')
+    start = int(offset) if offset else last_end.get(uri, 0)
+    last_end[uri] = start + int(length)
+    return int(length), start
+
+
+class HlsSegment:
+    __slots__ = ('uri', 'duration', 'key', 'sequence', 'discontinuity', 'byterange', 'init')
+
+    def __init__(self, uri: str, duration: float, key: Optional[Dict[str, str]], sequence: int,
+                 discontinuity: bool = False, byterange: Optional[Tuple[int, int]] = None,
+                 init: Optional[Tuple[str, Optional[Tuple[int, int]]]] = None):
+        self.uri = uri
+        self.duration = duration
+        self.key = key
+        self.sequence = sequence
+        self.discontinuity = discontinuity
+        self.byterange = byterange  # (length, offset)
+        self.init = init  # EXT-X-MAP (uri, byterange)
+
+
+class HlsPlaylist:
+    """파싱된 재생목록 (마스터면 variants, 미디어면 segments)"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.is_master = False
+        self.variants: List[Tuple[int, str]] = []  # (BANDWIDTH, uri)
+        self.has_alternate_media = False  # 별도 오디오/자막 렌디션 (EXT-X-MEDIA URI)
+        self.segments: List[HlsSegment] = []
+        self.target_duration = 0.0
+        self.media_sequence = 0
+        self.endlist = False
+        self.has_map = False  # fMP4 (EXT-X-MAP)
+
+    @property
+    def duration(self) -> float:
+        return sum(s.duration for s in self.segments)
+
+    def elapsed(self, count: int) -> float:
+        """앞에서 count 개 세그먼트의 재생 길이"""
+        return sum(s.duration for s in self.segments[:count])
+
+    def segments_before(self, seconds: float) -> int:
+        """재생 위치 seconds 까지 끝난 세그먼트 수"""
+        ends, total = [], 0.0
+        for s in self.segments:
+            total += s.duration
+            ends.append(total)
+        return bisect.bisect_right(ends, seconds + 1e-3)
+
+    @property
+    def encrypted(self) -> bool:
+        return any(s.key and s.key.get('METHOD', 'NONE') != 'NONE' for s in self.segments)
+
+    @property
+    def has_byterange(self) -> bool:
+        return any(s.byterange for s in self.segments)
+
+    def best_variant(self) -> Optional[str]:
+        if not self.variants:
+            return None
+        return max(self.variants, key=lambda v: v[0])[1]
+
+
+def parse_playlist(text: str, url: str) -> HlsPlaylist:
+    playlist = HlsPlaylist(url)
+    key: Optional[Dict[str, str]] = None
+    duration = 0.0
+    discontinuity = False
+    byterange: Optional[str] = None
+    init: Optional[Tuple[str, Optional[Tuple[int, int]]]] = None
+    last_end: Dict[str, int] = {}
+    pending_variant: Optional[int] = None
+    sequence = 0
+
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+        if line.startswith('#EXT-X-STREAM-INF:'):
+            playlist.is_master = True
+            try:
+                pending_variant = int(parse_attributes(line.split(':', 1)[1]).get('BANDWIDTH') or 0)
+            except ValueError:
+                pending_variant = 0
+        elif line.startswith('#EXT-X-MEDIA:'):
+            if 'URI' in parse_attributes(line.split(':', 1)[1]):
+                playlist.has_alternate_media = True
+        elif line.startswith('#EXT-X-TARGETDURATION:'):
+            playlist.target_duration = float(line.split(':', 1)[1] or 0)
+        elif line.startswith('#EXT-X-MEDIA-SEQUENCE:'):
+            playlist.media_sequence = sequence = int(line.split(':', 1)[1] or 0)
+        elif line.startswith('#EXT-X-KEY:'):
+            key = parse_attributes(line.split(':', 1)[1])
+            if key.get('URI'):
+                key['URI'] = urljoin(url, key['URI'])
+        elif line.startswith('#EXT-X-MAP:'):
+            playlist.has_map = True
+            attrs = parse_attributes(line.split(':', 1)[1])
+            map_uri = urljoin(url, attrs.get('URI', ''))
+            map_range = _parse_byterange(attrs['BYTERANGE'], map_uri, {}) if attrs.get('BYTERANGE') else None
+            init = (map_uri, map_range)
+        elif line.startswith('#EXTINF:'):
+            try:
+                duration = float(line.split(':', 1)[1].split(',', 1)[0])
+            except ValueError:
+                duration = 0.0
+        elif line.startswith('#EXT-X-BYTERANGE:'):
+            byterange = line.split(':', 1)[1]  # 오프셋 생략 시 기준이 되는 URI 는 세그먼트 줄에서 결정
+        elif line.startswith('#EXT-X-DISCONTINUITY') and not line.startswith('#EXT-X-DISCONTINUITY-SEQUENCE'):
+            discontinuity = True
+        elif line.startswith('#EXT-X-ENDLIST'):
+            playlist.endlist = True
+        elif not line.startswith('#'):
+            if playlist.is_master:
+                if pending_variant is not None:
+                    playlist.variants.append((pending_variant, urljoin(url, line)))
+                    pending_variant = None
+                continue
+            uri = urljoin(url, line)
+            resolved = _parse_byterange(byterange, uri, last_end) if byterange else None
+            playlist.segments.append(HlsSegment(uri, duration, key, sequence, discontinuity, resolved, init))
+            sequence += 1
+            duration = 0.0
+            discontinuity = False
+            byterange = None
+    return playlist
+
+
+def load_media_playlist(url: str, headers: Optional[Dict[str, Any]] = None, timeout: int = 30,
+                        session: Any = None) -> Optional[HlsPlaylist]:
+    """
+    재생목록을 내려받아 미디어 재생목록 반환
+    마스터 재생목록이면 최고 대역폭 variant 를 따라감 (ffmpeg 기본 스트림 선택과 동일한 결과)
+    별도 오디오 렌디션이 있으면 반환한 variant 에 has_alternate_media 표시
+    (길이/진행률 계산용, 세그먼트 직접 다운로드는 불가), 판별 불가 시 None
+    """
+    import requests
+    getter = session or requests
+    response = getter.get(url, headers=headers or {}, timeout=timeout)
+    response.raise_for_status()
+    playlist = parse_playlist(response.text, response.url or url)
+    if playlist.is_master:
+        variant = playlist.best_variant()
+        if not variant:
+            return None
+        alternate = playlist.has_alternate_media
+        response = getter.get(variant, headers=headers or {}, timeout=timeout)
+        response.raise_for_status()
+        playlist = parse_playlist(response.text, response.url or variant)
+        if playlist.is_master:
+            return None
+        playlist.has_alternate_media = alternate
+    return playlist
@@ -1,15 +1,18 @@
 """
 HTTP 직접 다운로더
 - 단순 HTTP 파일 다운로드
-- aiohttp 비동기 사용 (고성능)
+- 서버가 Range 를 지원하면 여러 연결로 구간을 나눠 동시에 받음 (http_ranges.RangeFetcher)
 """
 import os
 import traceback
 import re
 import time
-from typing import Dict, Any, Optional, Callable
+from typing import Dict, Any, List, Optional, Callable
 
 from .base import BaseDownloader
+from .http_ranges import RangeFetcher
+from ..bandwidth import TokenBucket
+from ..tuning import TransferMeter
 
 try:
     from ..setup import P
@@ -22,6 +25,19 @@ except:
 class HttpDirectDownloader(BaseDownloader):
     """HTTP 직접 다운로더"""
 
+    CHECKPOINT_SEC = 2.0  # 구간 진행 상태 저장 간격
+
+    def __init__(self):
+        super().__init__()
+        self._bucket = TokenBucket()
+        self._meter = TransferMeter()
+        self._fetcher: Optional[RangeFetcher] = None
+
+    def set_rate_limit(self, bps: float):
+        """토큰 버킷 속도 즉시 변경 (다운로드 중에도 다음 청크부터 반영)"""
+        super().set_rate_limit(bps)
+        self._bucket.set_rate(self._rate_limit_bps)
+
     @staticmethod
     def _rate_to_bps(rate_value: Any) -> float:
         if rate_value is None:
@@ -59,36 +75,89 @@ class HttpDirectDownloader(BaseDownloader):
             filepath = os.path.normpath(filepath)
             
             # 헤더 설정
-            headers = options.get('headers', {})
+            headers = dict(options.get('headers') or {})
             if 'User-Agent' not in headers:
                 headers['User-Agent'] = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
             
+            resume_state = options.get('resume_state') or {}
+            state_callback = options.get('state_callback')
+            # 전역 대역폭 관리자 없이 단독 호출된 경우 옵션의 속도 제한 적용
+            if self._bucket.rate <= 0:
+                max_rate = options.get('max_download_rate')
+                self.set_rate_limit(self._rate_to_bps(max_rate))
+            
+            # 여러 연결로 구간 분할 (Range 미지원/작은 파일이면 아래 단일 스트림)
+            connections = int(options.get('connections') or 1)
+            if connections > 1:
+                result = self._download_ranges(
+                    url, filepath, headers, connections, resume_state, state_callback, progress_callback
+                )
+                if result is not None:
+                    return result
+            
+            # 이전 실행의 부분 파일이 있으면 Range 로 이어받기 (If-Range 로 원본 변경 시 전체 재다운로드)
+            # 구간 분할 중이던 파일은 전체 크기로 미리 잡혀 있어 이어 붙일 수 없음
+            existing = 0
+            if resume_state.get('filepath') == filepath and os.path.exists(filepath) \
+                    and not resume_state.get('http_ranges'):
+                existing = os.path.getsize(filepath)
+            if existing:
+                headers['Range'] = f'bytes={existing}-'
+                validator = resume_state.get('etag') or resume_state.get('last_modified')
+                if validator:
+                    headers['If-Range'] = validator
+            
             # 스트리밍 다운로드
             response = requests.get(url, headers=headers, stream=True, timeout=60)
+            if existing and response.status_code == 416:
+                response.close()
+                if existing >= int(resume_state.get('total') or 0) > 0:
+                    # 이미 끝까지 받은 파일
+                    if progress_callback:
+                        progress_callback(100, '', '')
+                    return {'success': True, 'filepath': filepath}
+                existing = 0
+                headers.pop('Range', None)
+                headers.pop('If-Range', None)
+                response = requests.get(url, headers=headers, stream=True, timeout=60)
             response.raise_for_status()
             
+            resumed = existing > 0 and response.status_code == 206
+            if existing and not resumed:
+                logger.info(f'[GDM] server ignored Range, restarting from 0: {filepath}')
+            elif resumed:
+                logger.info(f'[GDM] HTTP resume from {existing / 1024 ** 2:.1f}MB: {filepath}')
+            
+            downloaded = existing if resumed else 0
             total_size = int(response.headers.get('content-length', 0))
-            downloaded = 0
-            chunk_size = 1024 * 1024  # 1MB 청크
-            max_rate = options.get('effective_max_download_rate') or options.get('max_download_rate')
-            rate_bps = self._rate_to_bps(max_rate)
-            start_time = time.monotonic()
+            if total_size and resumed:
+                total_size += existing
             
-            with open(filepath, 'wb') as f:
+            if state_callback:
+                state_callback({
+                    'filepath': filepath,
+                    'etag': response.headers.get('ETag') or '',
+                    'last_modified': response.headers.get('Last-Modified') or '',
+                    'total': total_size,
+                    'http_ranges': [],  # 이전 구간 분할 상태 무효화 (상태는 병합 저장됨)
+                })
+            # 속도 제한 시 작은 청크로 버킷을 자주 확인 (상한 변경이 바로 반영되도록)
+            chunk_size = 64 * 1024 if self._bucket.rate > 0 else 1024 * 1024
+            
+            with open(filepath, 'ab' if resumed else 'wb') as f:
                 for chunk in response.iter_content(chunk_size=chunk_size):
                     if self._cancelled:
                         return {'success': False, 'error': 'Cancelled'}
                     
+                    while self._paused and not self._cancelled:
+                        time.sleep(0.2)
+                    
                     if chunk:
                         f.write(chunk)
                         downloaded += len(chunk)
 
-                        # 평균 다운로드 속도를 제한(총량 제한 분배값 포함)
-                        if rate_bps > 0:
-                            elapsed = max(0.001, time.monotonic() - start_time)
-                            expected_elapsed = downloaded / rate_bps
-                            if expected_elapsed > elapsed:
-                                time.sleep(expected_elapsed - elapsed)
+                        # 전역 대역폭 관리자가 조정하는 토큰 버킷으로 속도 제한
+                        self._bucket.consume(len(chunk), lambda: self._cancelled)
                         
                         if total_size > 0 and progress_callback:
                             progress = int(downloaded / total_size * 100)
@@ -105,6 +174,107 @@ class HttpDirectDownloader(BaseDownloader):
             logger.error(traceback.format_exc())
             return {'success': False, 'error': str(e)}
     
+    def _download_ranges(
+        self,
+        url: str,
+        filepath: str,
+        headers: Dict[str, Any],
+        connections: int,
+        resume_state: Dict[str, Any],
+        state_callback: Optional[Callable],
+        progress_callback: Optional[Callable],
+    ) -> Optional[Dict[str, Any]]:
+        """Range 분할 다운로드, 분할할 수 없으면 None (호출 측이 단일 스트림으로 받음)"""
+        try:
+            probe = RangeFetcher.probe(url, headers)
+        except Exception as e:
+            logger.debug(f'[GDM] range probe failed, single stream: {e}')
+            return None
+        if not probe or probe['total'] < 2 * RangeFetcher.MIN_SPLIT:
+            return None
+        total = probe['total']
+        state = {
+            'filepath': filepath,
+            'etag': probe['etag'],
+            'last_modified': probe['last_modified'],
+            'total': total,
+        }
+        # 약한 ETag 는 If-Range 에 쓸 수 없음
+        validator = probe['etag'] if not probe['etag'].startswith('W/') else probe['last_modified']
+        
+        # 같은 원본(크기/검증자 일치)일 때만 남은 구간 이어받기
+        resume: Optional[List[List[int]]] = None
+        if resume_state.get('http_ranges') and os.path.exists(filepath) and os.path.getsize(filepath) == total \
+                and all(resume_state.get(k) == v for k, v in state.items()):
+            resume = resume_state['http_ranges']
+            remaining = sum(end - pos for _, end, pos in resume)
+            logger.info(f'[GDM] HTTP range resume from {(total - remaining) / 1024 ** 2:.1f}MB: {filepath}')
+        
+        fetcher = RangeFetcher(
+            probe['url'], headers, total, connections,
+            bucket=self._bucket,
+            validator=validator,
+            is_cancelled=lambda: self._cancelled,
+            is_paused=lambda: self._paused,
+        )
+        self._fetcher = fetcher
+        self._meter = TransferMeter()
+        
+        def checkpoint(ranges: List[List[int]]):
+            if state_callback:
+                state_callback(dict(state, http_ranges=ranges))
+        
+        # 파일을 미리 잡기 전에 기록 (중간에 죽어도 단일 스트림 이어받기로 오인하지 않게)
+        checkpoint(resume or [[0, total, 0]])
+        started = time.monotonic()
+        start_bytes = total - sum(end - pos for _, end, pos in resume) if resume else 0
+        last_checkpoint = started
+        
+        def on_tick():
+            nonlocal last_checkpoint
+            downloaded = fetcher.downloaded
+            self._meter.sample(downloaded, self._rate_limit_bps > 0)
+            now = time.monotonic()
+            if now - last_checkpoint >= self.CHECKPOINT_SEC:
+                last_checkpoint = now
+                checkpoint(fetcher.snapshot())
+            if progress_callback:
+                rate = (downloaded - start_bytes) / max(now - started, 0.001)
+                remaining = total - downloaded
+                eta = time.strftime('%H:%M:%S', time.gmtime(remaining / rate)) if rate > 0 and remaining else ''
+                progress_callback(
+                    min(int(downloaded / total * 100), 99), f'{rate / 1024 ** 2:.2f}MB/s', eta,
+                    downloaded_bytes=downloaded, total_bytes=total,
+                    speed_bps=int(rate), eta_sec=int(remaining / rate) if rate > 0 else 0,
+                )
+        
+        self._meter.sample(start_bytes)  # 이어받은 부분은 처리량에서 제외
+        try:
+            completed = fetcher.run(filepath, resume, on_tick)
+        finally:
+            self._meter.sample(fetcher.downloaded, self._rate_limit_bps > 0)
+            checkpoint(fetcher.snapshot())
+        if not completed:
+            return {'success': False, 'error': 'Cancelled'}
+        logger.info(
+            f'[GDM] HTTP {fetcher.connections} connections, {fetcher.steals} splits, '
+            f'{total / 1024 ** 2:.1f}MB in {time.monotonic() - started:.1f}s: {filepath}'
+        )
+        if progress_callback:
+            progress_callback(100, '', '')
+        return {'success': True, 'filepath': filepath}
+    
+    def transfer_stats(self) -> Optional[Dict[str, Any]]:
+        """구간 분할로 받은 경우 실측 전송량 {connections, bytes, seconds, limited}, 아니면 None"""
+        if self._fetcher is None:
+            return None
+        return {
+            'connections': self._fetcher.connections,
+            'bytes': self._meter.bytes,
+            'seconds': self._meter.seconds,
+            'limited': self._meter.limited,
+        }
+    
     def get_info(self, url: str) -> Dict[str, Any]:
         """URL 정보 추출"""
         try:
@@ -0,0 +1,269 @@
+"""
+HTTP Range 분할 다운로드 엔진 (HttpDirectDownloader 용)
+- probe(): Range: bytes=0-0 요청으로 분할 가능 여부(206 + Content-Range 전체 크기)와 검증자(ETag/Last-Modified) 확인
+- 파일을 전체 크기로 미리 잡아 두고 연결 수만큼 구간을 나눠 동시에 받아 각자 위치에 기록 (os.pwrite)
+- 작업 훔치기: 할 일이 없어진 연결은 남은 예상 시간이 가장 긴(느린) 구간의 뒤쪽 절반을 가져감
+- 구간별 진행 위치를 스냅샷으로 보고 → 재시작 시 남은 부분만 이어받기 (검증자가 바뀌면 처음부터)
+"""
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    from ..setup import P
+    logger = P.logger
+except:
+    import logging
+    logger = logging.getLogger(__name__)
+
+
+_CONTENT_RANGE_RE = re.compile(r'bytes\s+(\d+)-(\d+)/(\d+)', re.IGNORECASE)
+
+
+class RangeError(Exception):
+    """구간 요청 실패 (재시도 소진, 서버가 Range 를 무시 등)"""
+
+
+class _Range:
+    """[start, end) 구간, pos 는 다음에 기록할 위치 (end 는 훔쳐 가면 줄어듦)"""
+
+    __slots__ = ('start', 'end', 'pos', 'active', 'started', 'base')
+
+    def __init__(self, start: int, end: int, pos: Optional[int] = None):
+        self.start = start
+        self.end = end
+        self.pos = start if pos is None else pos
+        self.active = False
+        self.started = 0.0  # 현재 요청 시작 시각
+        self.base = self.pos  # 현재 요청 시작 위치 (속도 계산용)
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.end - self.pos)
+
+    def rate(self, now: float) -> float:
+        elapsed = now - self.started
+        return (self.pos - self.base) / elapsed if self.active and elapsed > 0 else 0.0
+
+
+class RangeFetcher:
+    """Range 요청 여러 개로 파일 하나 받기"""
+
+    MIN_SPLIT = 1024 * 1024  # 이보다 작은 구간은 더 나누지 않음
+    CHUNK_SIZE = 64 * 1024
+    RETRIES = 3
+    TIMEOUT = 60
+
+    def __init__(
+        self,
+        url: str,
+        headers: Dict[str, Any],
+        total: int,
+        connections: int = 8,
+        bucket=None,
+        validator: str = '',
+        is_cancelled: Callable[[], bool] = lambda: False,
+        is_paused: Callable[[], bool] = lambda: False,
+        work_stealing: bool = True,
+    ):
+        self.url = url
+        self.total = total
+        self.connections = max(1, min(int(connections or 1), max(1, total // self.MIN_SPLIT)))
+        self.bucket = bucket
+        self.validator = validator
+        self.is_cancelled = is_cancelled
+        self.is_paused = is_paused
+        self.work_stealing = work_stealing
+        self.steals = 0
+        self._headers = {k: v for k, v in (headers or {}).items() if v is not None}
+        self._lock = threading.Lock()
+        self._ranges: List[_Range] = []
+        self._error: Optional[Exception] = None
+        self._stop = False
+        self._fd: Optional[int] = None
+        self._file = None  # os.pwrite 가 없는 플랫폼용
+
+    @staticmethod
+    def probe(url: str, headers: Dict[str, Any], timeout: int = 30) -> Optional[Dict[str, Any]]:
+        """분할 가능하면 {'total', 'etag', 'last_modified', 'url'(리다이렉트 후)}, 아니면 None"""
+        import requests
+        probe_headers = {k: v for k, v in (headers or {}).items() if v is not None}
+        probe_headers['Range'] = 'bytes=0-0'
+        with requests.get(url, headers=probe_headers, stream=True, timeout=timeout) as response:
+            if response.status_code != 206 or response.headers.get('Accept-Ranges', '').lower() == 'none':
+                return None
+            match = _CONTENT_RANGE_RE.match(response.headers.get('Content-Range', ''))
+            if not match:
+                return None
+            return {
+                'total': int(match.group(3)),
+                'etag': response.headers.get('ETag') or '',
+                'last_modified': response.headers.get('Last-Modified') or '',
+                'url': response.url or url,
+            }
+
+    def snapshot(self) -> List[List[int]]:
+        """끝나지 않은 구간 [start, end, pos] 목록 (재개 상태 저장용)"""
+        with self._lock:
+            return [[r.start, r.end, r.pos] for r in self._ranges if r.remaining]
+
+    @property
+    def downloaded(self) -> int:
+        with self._lock:
+            return self.total - sum(r.remaining for r in self._ranges)
+
+    def run(self, filepath: str, resume: Optional[List[List[int]]] = None,
+            on_tick: Optional[Callable[[], None]] = None) -> bool:
+        """
+        filepath 에 받기 (resume 이 있으면 그 구간의 남은 부분만), 0.5초마다 on_tick 호출
+        취소되면 False, 구간이 재시도 후에도 실패하면 예외
+        """
+        if resume:
+            self._ranges = [_Range(start, end, pos) for start, end, pos in resume if pos < end]
+        else:
+            size = -(-self.total // self.connections)
+            self._ranges = [_Range(start, min(start + size, self.total)) for start in range(0, self.total, size)]
+        self._open(filepath, fresh=not resume)
+        # 훔치기를 쓰면 재개 구간이 연결 수보다 적어도 남는 연결이 나눠 받음
+        count = self.connections if self.work_stealing else min(self.connections, max(1, len(self._ranges)))
+        workers = [threading.Thread(target=self._worker, name=f'gdm-range-{i}', daemon=True) for i in range(count)]
+        try:
+            for worker in workers:
+                worker.start()
+            while any(w.is_alive() for w in workers):
+                time.sleep(0.5)
+                if on_tick:
+                    on_tick()
+                if self.is_cancelled() or self._error is not None:
+                    self._stop = True
+            if self._error is not None:
+                raise self._error
+            return not self.is_cancelled() and not any(r.remaining for r in self._ranges)
+        finally:
+            self._stop = True
+            for worker in workers:
+                worker.join(timeout=5)
+            self._close()
+
+    def _open(self, filepath: str, fresh: bool) -> None:
+        mode = 'wb' if fresh or not os.path.exists(filepath) else 'r+b'
+        self._file = open(filepath, mode)
+        self._file.truncate(self.total)
+        if fresh and hasattr(os, 'posix_fallocate'):
+            try:
+                # 조각나지 않게 실제 블록 확보 (지원하지 않는 파일 시스템이면 희소 파일 유지)
+                os.posix_fallocate(self._file.fileno(), 0, self.total)
+            except OSError:
+                pass
+        self._fd = self._file.fileno() if hasattr(os, 'pwrite') else None
+
+    def _close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._fd = None
+
+    def _write_at(self, offset: int, data: bytes) -> None:
+        if self._fd is not None:
+            view = memoryview(data)
+            while view:
+                written = os.pwrite(self._fd, view, offset)
+                view, offset = view[written:], offset + written
+        else:
+            with self._lock:
+                self._file.seek(offset)
+                self._file.write(data)
+
+    def _stopped(self) -> bool:
+        return self._stop or self.is_cancelled()
+
+    def _claim(self) -> Optional[_Range]:
+        """아직 아무도 안 맡은 구간, 없으면 남은 시간이 가장 긴 구간의 뒤쪽 절반"""
+        with self._lock:
+            for r in self._ranges:
+                if not r.active and r.remaining:
+                    r.active = True
+                    return r
+            if not self.work_stealing:
+                return None
+            now = time.monotonic()
+            victims = [r for r in self._ranges if r.active and r.remaining >= 2 * self.MIN_SPLIT]
+            if not victims:
+                return None
+            # 아직 속도가 안 잡힌 구간은 가장 느린 것으로 간주
+            victim = max(victims, key=lambda r: r.remaining / max(r.rate(now), 1.0))
+            middle = victim.pos + victim.remaining // 2
+            stolen = _Range(middle, victim.end)
+            victim.end = middle
+            stolen.active = True
+            self._ranges.append(stolen)
+            self.steals += 1
+            return stolen
+
+    def _worker(self) -> None:
+        import requests
+        session = requests.Session()
+        session.headers.update(self._headers)
+        try:
+            while not self._stopped():
+                r = self._claim()
+                if r is None:
+                    return
+                self._fetch_range(session, r)
+        except Exception as e:
+            with self._lock:
+                if self._error is None:
+                    self._error = e
+        finally:
+            session.close()
+
+    def _fetch_range(self, session, r: _Range) -> None:
+        for attempt in range(self.RETRIES):
+            if self._stopped():
+                return
+            try:
+                self._stream(session, r)
+                return
+            except RangeError:
+                raise
+            except Exception as e:
+                if attempt == self.RETRIES - 1:
+                    raise RangeError(f'bytes {r.pos}-{r.end - 1}: {e}')
+                logger.warning(f'[GDM] range {r.pos}-{r.end - 1} retry ({attempt + 1}): {e}')
+                time.sleep(1 + attempt)
+
+    def _stream(self, session, r: _Range) -> None:
+        with self._lock:
+            if not r.remaining:
+                return
+            headers = {'Range': f'bytes={r.pos}-{r.end - 1}'}
+            r.started, r.base = time.monotonic(), r.pos
+        if self.validator:
+            headers['If-Range'] = self.validator
+        with session.get(self.url, headers=headers, stream=True, timeout=self.TIMEOUT) as response:
+            response.raise_for_status()
+            if response.status_code != 206:
+                raise RangeError('server ignored Range (source changed?)')
+            for chunk in response.iter_content(chunk_size=self.CHUNK_SIZE):
+                while self.is_paused() and not self._stopped():
+                    time.sleep(0.2)
+                if self._stopped():
+                    return
+                with self._lock:
+                    # 훔쳐 가서 end 가 줄었으면 그 앞까지만 쓰고 연결 종료
+                    offset, take = r.pos, min(len(chunk), r.end - r.pos)
+                if take <= 0:
+                    return
+                self._write_at(offset, chunk[:take] if take < len(chunk) else chunk)
+                with self._lock:
+                    r.pos = offset + take
+                    done = r.pos >= r.end
+                if self.bucket is not None:
+                    self.bucket.consume(take, self._stopped)
+                if done:
+                    return
+        with self._lock:
+            if r.remaining:
+                raise IOError(f'connection closed at {r.pos} before {r.end}')
@@ -2,14 +2,25 @@
 yt-dlp + aria2c 다운로더 (최고속)
 - aria2c 16개 연결로 3-5배 속도 향상
 - YouTube 및 yt-dlp 지원 사이트 전용
+- 실행 방식: 작업마다 yt-dlp CLI 실행(subprocess) 또는 상주 워커 풀(ytdlp_pool)에서 yt_dlp 직접 실행
+  두 방식 모두 같은 CLI 인자를 사용
+- aria2c: 상주 RPC 데몬(aria2_rpc)이 있으면 shim 을 외부 다운로더로 지정해 데몬에서 받고
+  진행률/일시정지/속도 변경을 RPC 로 처리, 데몬을 쓸 수 없으면 다운로드마다 aria2c 실행
 """
 import os
 import re
+import signal
 import subprocess
+import threading
 import traceback
-from typing import Dict, Any, Optional, Callable
+from typing import Dict, Any, List, Optional, Callable, Tuple
 
+from .aria2_rpc import SHIM_PATH, Aria2Daemon
 from .base import BaseDownloader
+from .ytdlp_pool import YtdlpWorker, YtdlpWorkerPool
+from ..bandwidth import ProcessThrottle
+from ..info_cache import InfoCache
+from ..tuning import TransferMeter
 
 # 상위 모듈에서 로거 가져오기
 try:
@@ -23,9 +34,43 @@ except:
 class YtdlpAria2Downloader(BaseDownloader):
     """yt-dlp + aria2c 다운로더"""
     
+    # aria2c 경로별 실행 가능 여부 (태스크마다 --version 프로세스를 띄우지 않도록)
+    _aria2c_checked: Dict[str, bool] = {}
+    
     def __init__(self):
         super().__init__()
         self._process: Optional[subprocess.Popen] = None
+        self._worker: Optional[YtdlpWorker] = None
+        self._throttle: Optional[ProcessThrottle] = None
+        self._downloaded_bytes = 0
+        # aria2c 전송 실측 (연결 수 적응 제어용, aria2c 를 쓰지 않으면 connections=None)
+        self._meter = TransferMeter()
+        self._connections: Optional[int] = None
+        # aria2c RPC 데몬 사용 시 상태 (태그: 이 태스크 GID 앞 8자리)
+        self._rpc_tag: Optional[str] = None
+        self._rpc_lock = threading.Lock()
+        self._rpc_files: Dict[str, Tuple[int, int]] = {}  # gid → (completed, total)
+        self._rpc_rates: Dict[str, int] = {}  # gid → 적용한 max-download-limit
+        self._rpc_paused: set = set()
+        self._rpc_progress: Optional[Callable] = None
+
+    def set_rate_limit(self, bps: float):
+        """실행 중 속도 상한 변경 (RPC 데몬: GID별 changeOption, 그 외: 프로세스 그룹 듀티 사이클)"""
+        super().set_rate_limit(bps)
+        if self._rpc_tag:
+            self._rpc_sync(Aria2Daemon.shared().tagged(self._rpc_tag))
+        elif self._throttle:
+            self._throttle.set_rate(self._rate_limit_bps)
+
+    @staticmethod
+    def _size_to_bytes(size_str: str) -> int:
+        """'12.5MiB' / '400KiB' / '1.2GB' 형태를 바이트로 변환"""
+        m = re.match(r'^([\d.]+)\s*([KMGT]?)(i?)B$', (size_str or '').strip())
+        if not m:
+            return 0
+        base = 1024 if m.group(3) or m.group(2) else 1
+        exp = ' KMGT'.index(m.group(2) or ' ')
+        return int(float(m.group(1)) * (base ** exp))
 
     @staticmethod
     def _normalize_rate(raw_rate: Any) -> str:
@@ -61,49 +106,55 @@ class YtdlpAria2Downloader(BaseDownloader):
             # 윈도우/리눅스 구분 없이 중복 슬래시 제거 및 절대 경로 확보
             output_template = os.path.normpath(output_template)
 
-            # yt-dlp 명령어 구성
-            cmd = [
-                'yt-dlp',
-                '--newline',  # 진행률 파싱용
+            # yt-dlp 인자 구성 (subprocess / 워커 풀 공용)
+            args = [
                 '--no-check-certificate',
+                '--continue',  # 재시작 시 .part / .ytdl / aria2 컨트롤 파일에서 이어받기
                 '-o', output_template,
             ]
             
-            # 제목/썸네일 업데이트용 출력 추가 (GDM_FIX)
-            cmd.extend(['--print', 'before_dl:GDM_FIX:title:%(title)s'])
-            cmd.extend(['--print', 'before_dl:GDM_FIX:thumb:%(thumbnail)s'])
-            
-            # 속도 제한 설정
+            # 속도 제한 설정 (프로세스 상한은 전역 총량, 태스크별 몫은 듀티 사이클로 실행 중 조정)
             max_rate = self._normalize_rate(
-                options.get('effective_max_download_rate')
-                or options.get('max_download_rate')
+                options.get('max_download_rate')
                 or P.ModelSetting.get('max_download_rate')
             )
             rate_limited = bool(max_rate)
             
-            # aria2c 사용 (설치되어 있으면)
+            # aria2c 사용 (상주 RPC 데몬 우선, 없으면 설치되어 있을 때 다운로드마다 실행)
             aria2c_path = options.get('aria2c_path', 'aria2c')
             connections = options.get('connections', 4)
+            daemon = Aria2Daemon.shared()
+            rpc = daemon.client() if os.access(SHIM_PATH, os.X_OK) else None
             
-            if self._check_aria2c(aria2c_path):
-                cmd.extend(['--external-downloader', aria2c_path])
+            if rpc is not None:
+                self._rpc_tag = daemon.new_tag()
+                args.extend(['--external-downloader', SHIM_PATH])
+                # 전역 속도/동시 다운로드 상한은 데몬, 태스크 몫은 RPC 폴러가 GID별로 적용
+                shim_args = (
+                    f'aria2c:-x{connections} -s{connections} -k1M -c '
+                    f'--gdm-rpc={rpc.url} --gdm-secret={rpc.secret} --gdm-tag={self._rpc_tag}'
+                )
+                if self._rate_limit_bps > 0:
+                    shim_args = f'{shim_args} --max-download-limit={int(self._rate_limit_bps)}'
+                args.extend(['--external-downloader-args', shim_args])
+                self._rpc_progress = progress_callback
+                self._connections = int(connections)
+                daemon.watch(self._rpc_tag, self._on_rpc_status)
+                logger.info(f'[GDM] Using aria2c RPC daemon (connections: {connections}, tag: {self._rpc_tag})')
+            elif self._check_aria2c(aria2c_path):
+                args.extend(['--external-downloader', aria2c_path])
                 # aria2c 설정: -x=연결수, -s=분할수, -j=병렬, -k=조각크기, --console-log-level=notice로 진행률 출력
-                aria2_args = f'aria2c:-x{connections} -s{connections} -j{connections} -k1M --summary-interval=1 --console-log-level=notice'
+                aria2_args = f'aria2c:-x{connections} -s{connections} -j{connections} -k1M -c --summary-interval=1 --console-log-level=notice'
                 if rate_limited:
                     aria2_args = f'{aria2_args} --max-download-limit={max_rate}'
-                cmd.extend(['--external-downloader-args', aria2_args])
+                args.extend(['--external-downloader-args', aria2_args])
+                self._connections = int(connections)
                 logger.info(f'[GDM] Using aria2c for multi-threaded download (connections: {connections})')
             
-            # 진행률 템플릿 추가 (yt-dlp native downloader)
-            cmd.extend(['--progress-template', 'download:GDM_PROGRESS:%(progress._percent_str)s:%(progress._speed_str)s:%(progress._eta_str)s'])
-            
             # yt-dlp native downloader 제한 (external-downloader 미사용/보조 경로)
             if rate_limited:
-                cmd.extend(['--limit-rate', max_rate])
-                if options.get('is_global_rate_split'):
-                    logger.info(f'[GDM] global split limit enabled: {max_rate}/s per task')
-                else:
-                    logger.info(f'[GDM] download speed limit enabled: {max_rate}/s')
+                args.extend(['--limit-rate', max_rate])
+                logger.info(f'[GDM] download speed limit enabled: {max_rate}/s (per-task share: {self._rate_limit_bps / 1024 ** 2:.2f}MB/s)')
 
             # 포맷 선택
             format_spec = options.get('format')
@@ -112,25 +163,25 @@ class YtdlpAria2Downloader(BaseDownloader):
                     format_spec = 'bestaudio/best'
                 else:
                     format_spec = 'bestvideo+bestaudio/best'
-            cmd.extend(['-f', format_spec])
+            args.extend(['-f', format_spec])
             
             # 병합 포맷 (비디오인 경우에만)
             if not options.get('extract_audio'):
                 merge_format = options.get('merge_output_format', 'mp4')
-                cmd.extend(['--merge-output-format', merge_format])
+                args.extend(['--merge-output-format', merge_format])
             
             # 쿠키 파일
             if options.get('cookiefile'):
-                cmd.extend(['--cookies', options['cookiefile']])
+                args.extend(['--cookies', options['cookiefile']])
             
             # 프록시
             if options.get('proxy'):
-                cmd.extend(['--proxy', options['proxy']])
+                args.extend(['--proxy', options['proxy']])
             
             # HTTP 헤더 추가 (Referer 등 - Linkkf 등 리다이렉트 방지용)
             if options.get('headers'):
                 for key, value in options['headers'].items():
-                    cmd.extend(['--add-header', f'{key}:{value}'])
+                    args.extend(['--add-header', f'{key}:{value}'])
 
             # FFmpeg 경로 자동 감지 및 설정
             ffmpeg_path = options.get('ffmpeg_path') or P.ModelSetting.get('ffmpeg_path')
@@ -152,206 +203,447 @@ class YtdlpAria2Downloader(BaseDownloader):
                             break
             
             if ffmpeg_path:
-                cmd.extend(['--ffmpeg-location', ffmpeg_path])
+                args.extend(['--ffmpeg-location', ffmpeg_path])
                 logger.debug(f'[GDM] 감지된 FFmpeg 경로: {ffmpeg_path}')
 
             # 추가 인자 (extra_args: list)
             extra_args = options.get('extra_args', [])
             if isinstance(extra_args, list):
-                cmd.extend(extra_args)
+                args.extend(extra_args)
             
             if options.get('extract_audio'):
-                cmd.append('--extract-audio')
+                args.append('--extract-audio')
                 if options.get('audio_format'):
-                    cmd.extend(['--audio-format', options['audio_format']])
+                    args.extend(['--audio-format', options['audio_format']])
             
             if options.get('embed_thumbnail'):
-                cmd.append('--embed-thumbnail')
+                args.append('--embed-thumbnail')
             
             if options.get('add_metadata'):
-                cmd.append('--add-metadata')
-            
-            # URL 추가
-            cmd.append(url)
-            
-            logger.info(f'[GDM] yt-dlp command: {" ".join(cmd)}')
+                args.append('--add-metadata')
             
-            # 프로세스 실행
-            self._process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1
-            )
-            
-            final_filepath = ''
-            last_logged_pct = -1
+            # URL 추가 (포맷 조회 등으로 이미 추출한 정보가 있고 서명 URL 이 유효하면 재추출 생략)
+            info_cache = InfoCache.shared()
+            info_json = info_cache.info_json_path(url)
+            if info_json:
+                args.extend(['--load-info-json', info_json])
+            else:
+                args.append(url)
             
-            # 출력 파싱
-            for line in self._process.stdout:
-                if self._cancelled:
-                    self._process.terminate()
-                    return {'success': False, 'error': 'Cancelled'}
-                
-                line = line.strip()
-                if not line:
-                    continue
-
-                # 메타데이터 파싱 (GDM_FIX)
-                if 'GDM_FIX:' in line:
-                    try:
-                        if 'GDM_FIX:title:' in line:
-                            title = line.split('GDM_FIX:title:', 1)[1].strip()
-                            if info_callback:
-                                info_callback({'title': title})
-                        elif 'GDM_FIX:thumb:' in line:
-                            thumb = line.split('GDM_FIX:thumb:', 1)[1].strip()
-                            if info_callback:
-                                info_callback({'thumbnail': thumb})
-                    except:
-                        pass
-                
-                # 진행률 파싱 - GDM_PROGRESS 템플릿 (우선)
-                # 형식: GDM_PROGRESS:XX.X%:SPEED:ETA
-                if 'GDM_PROGRESS:' in line:
-                    try:
-                        parts = line.split('GDM_PROGRESS:', 1)[1].split(':')
-                        if len(parts) >= 1:
-                            pct_str = parts[0].strip().replace('%', '').strip()
-                            progress = int(float(pct_str)) if pct_str and pct_str != 'N/A' else 0
-                            speed = parts[1].strip() if len(parts) > 1 else ''
-                            eta = parts[2].strip() if len(parts) > 2 else ''
-                            if speed == 'N/A': speed = ''
-                            if eta == 'N/A': eta = ''
-                            if progress_callback and progress > 0:
-                                progress_callback(progress, speed, eta)
-                            continue
-                    except:
-                        pass
-                
-                # 진행률 파싱 (yt-dlp default)
-                progress_match = re.search(r'\[download\]\s+(\d+\.?\d*)%', line)
-                
-                should_log = True
-                if progress_match:
-                    pct = float(progress_match.group(1))
-                    if int(pct) >= last_logged_pct + 5 or pct >= 99.9:
-                        last_logged_pct = int(pct)
-                    else:
-                        should_log = False
-                
-                if should_log:
-                    logger.info(f'[GDM][yt-dlp] {line}')
-                
-                if not progress_match:
-                    aria2_match = re.search(r'\(\s*([\d.]+)%\)', line)
-                    if aria2_match and (('DL:' in line) or ('CN:' in line)):
-                        try:
-                            progress = int(float(aria2_match.group(1)))
-                            speed_match = re.search(r'DL:(\S+)', line)
-                            speed = speed_match.group(1) if speed_match else ''
-                            eta_match = re.search(r'ETA:(\S+)', line)
-                            eta = eta_match.group(1) if eta_match else ''
-                            if progress_callback:
-                                 progress_callback(progress, speed, eta)
-                            continue
-                        except Exception as e:
-                            logger.error(f'Parsing Error: {e}')
-
-                if progress_match and progress_callback:
-                    progress = int(float(progress_match.group(1)))
-                    speed = ''
-                    speed_match = re.search(r'at\s+([\d.]+\s*[KMG]?i?B/s)', line)
-                    if speed_match:
-                        speed = speed_match.group(1)
-                    eta = ''
-                    eta_match = re.search(r'ETA\s+([\d:]+)', line)
-                    if eta_match:
-                        eta = eta_match.group(1)
-                    progress_callback(progress, speed, eta)
-                
-                if any(x in line for x in ['[Merger]', '[VideoConvertor]', 'Destination:']):
-                    path_match = re.search(r'(?:Destination:|into|to)\s+["\']?(.+?)(?:["\']|$)', line)
-                    if path_match:
-                        potential_path = path_match.group(1).strip('"\'')
-                        if '.' in os.path.basename(potential_path):
-                            final_filepath = potential_path
+            # 상주 워커가 비어 있으면 사용, 아니면 (풀 비활성/모두 사용 중) CLI 실행
+            pool = YtdlpWorkerPool.shared()
+            worker = pool.acquire(timeout=0)
+            if worker is not None:
+                result = self._download_pooled(pool, worker, args, progress_callback, info_callback)
+            else:
+                result = self._download_subprocess(args, progress_callback, info_callback)
             
-            self._process.wait()
+            if info_json and not result.get('success'):
+                # 캐시 정보가 만료(403 등)됐을 수 있으므로 재시도 때는 새로 추출
+                info_cache.invalidate(url)
             
-            if self._process.returncode == 0:
-                if progress_callback:
-                    progress_callback(100, '', '')
-                
+            if result.get('success'):
                 # 자막 다운로드 처리
                 vtt_url = options.get('subtitles')
+                final_filepath = result.get('filepath')
                 if vtt_url and final_filepath:
                     try:
                         self._download_subtitle(vtt_url, final_filepath, headers=options.get('headers'))
                     except Exception as e:
                         logger.error(f'[GDM] Subtitle download error: {e}')
-                
-                return {'success': True, 'filepath': final_filepath}
-            else:
-                return {'success': False, 'error': f'Exit code: {self._process.returncode}'}
+            return result
                 
         except Exception as e:
             logger.error(f'YtdlpAria2 download error: {e}')
             logger.error(traceback.format_exc())
             return {'success': False, 'error': str(e)}
+        finally:
+            if self._throttle:
+                self._throttle.stop()
+            if self._rpc_tag:
+                Aria2Daemon.shared().unwatch(self._rpc_tag)
+    
+    def _start_throttle(self, process: Any) -> None:
+        """프로세스 그룹 정지/듀티 사이클 (RPC 데몬 사용 시 속도는 데몬이 제한하므로 일시정지만)"""
+        self._throttle = ProcessThrottle(
+            lambda: self._downloaded_bytes,
+            rate_bps=0 if self._rpc_tag else self._rate_limit_bps,
+            group=True,
+        )
+        if self._paused:
+            self._throttle.set_paused(True)
+        self._throttle.start(process)
     
+    def _download_subprocess(
+        self,
+        args: List[str],
+        progress_callback: Optional[Callable] = None,
+        info_callback: Optional[Callable] = None,
+    ) -> Dict[str, Any]:
+        """yt-dlp CLI 를 새 프로세스로 실행하고 출력 파싱"""
+        cmd = [
+            'yt-dlp',
+            '--newline',  # 진행률 파싱용
+            # 제목/썸네일 업데이트용 출력 추가 (GDM_FIX)
+            '--print', 'before_dl:GDM_FIX:title:%(title)s',
+            '--print', 'before_dl:GDM_FIX:thumb:%(thumbnail)s',
+            # 진행률 템플릿 추가 (yt-dlp native downloader)
+            # 형식: GDM_PROGRESS:PERCENT:SPEED:BYTES:ETA (ETA는 ':'를 포함할 수 있으므로 마지막)
+            '--progress-template', 'download:GDM_PROGRESS:%(progress._percent_str)s:%(progress._speed_str)s:%(progress.downloaded_bytes)s:%(progress._eta_str)s',
+        ] + args
+        logger.info(f'[GDM] yt-dlp command: {" ".join(cmd)}')
+        
+        # 프로세스 실행 (aria2c 자식까지 함께 정지/종료할 수 있도록 별도 세션)
+        self._process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+            start_new_session=ProcessThrottle.supported,
+        )
+        self._start_throttle(self._process)
+        
+        final_filepath = ''
+        last_logged_pct = -1
+        last_error = ''  # 실패 원인 분류용 마지막 ERROR 줄
+        
+        # 출력 파싱
+        for line in self._process.stdout:
+            if self._cancelled:
+                self._process.terminate()
+                return {'success': False, 'error': 'Cancelled'}
+            
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith('ERROR:'):
+                last_error = line
+
+            # 메타데이터 파싱 (GDM_FIX)
+            if 'GDM_FIX:' in line:
+                try:
+                    if 'GDM_FIX:title:' in line:
+                        title = line.split('GDM_FIX:title:', 1)[1].strip()
+                        if info_callback:
+                            info_callback({'title': title})
+                    elif 'GDM_FIX:thumb:' in line:
+                        thumb = line.split('GDM_FIX:thumb:', 1)[1].strip()
+                        if info_callback:
+                            info_callback({'thumbnail': thumb})
+                except:
+                    pass
+            
+            # 진행률 파싱 - GDM_PROGRESS 템플릿 (우선)
+            # 형식: GDM_PROGRESS:XX.X%:SPEED:BYTES:ETA
+            if 'GDM_PROGRESS:' in line:
+                try:
+                    parts = line.split('GDM_PROGRESS:', 1)[1].split(':', 3)
+                    if len(parts) >= 1:
+                        pct_str = parts[0].strip().replace('%', '').strip()
+                        progress = int(float(pct_str)) if pct_str and pct_str != 'N/A' else 0
+                        speed = parts[1].strip() if len(parts) > 1 else ''
+                        bytes_str = parts[2].strip() if len(parts) > 2 else ''
+                        eta = parts[3].strip() if len(parts) > 3 else ''
+                        if speed == 'N/A': speed = ''
+                        if eta == 'N/A': eta = ''
+                        if bytes_str.isdigit():
+                            self._downloaded_bytes = int(bytes_str)
+                        if progress_callback and progress > 0:
+                            progress_callback(progress, speed, eta)
+                        continue
+                except:
+                    pass
+            
+            # 진행률 파싱 (yt-dlp default)
+            progress_match = re.search(r'\[download\]\s+(\d+\.?\d*)%', line)
+            
+            should_log = True
+            if progress_match:
+                pct = float(progress_match.group(1))
+                if int(pct) >= last_logged_pct + 5 or pct >= 99.9:
+                    last_logged_pct = int(pct)
+                else:
+                    should_log = False
+            
+            if should_log:
+                logger.info(f'[GDM][yt-dlp] {line}')
+            
+            if not progress_match:
+                aria2_progress = self._parse_aria2_line(line)
+                if aria2_progress:
+                    if progress_callback:
+                        progress_callback(*aria2_progress)
+                    continue
+
+            if progress_match and progress_callback:
+                progress = int(float(progress_match.group(1)))
+                speed = ''
+                speed_match = re.search(r'at\s+([\d.]+\s*[KMG]?i?B/s)', line)
+                if speed_match:
+                    speed = speed_match.group(1)
+                eta = ''
+                eta_match = re.search(r'ETA\s+([\d:]+)', line)
+                if eta_match:
+                    eta = eta_match.group(1)
+                progress_callback(progress, speed, eta)
+            
+            if any(x in line for x in ['[Merger]', '[VideoConvertor]', 'Destination:']):
+                path_match = re.search(r'(?:Destination:|into|to)\s+["\']?(.+?)(?:["\']|$)', line)
+                if path_match:
+                    potential_path = path_match.group(1).strip('"\'')
+                    if '.' in os.path.basename(potential_path):
+                        final_filepath = potential_path
+        
+        self._process.wait()
+        
+        if self._process.returncode == 0:
+            if progress_callback:
+                progress_callback(100, '', '')
+            return {'success': True, 'filepath': final_filepath}
+        else:
+            error = f'Exit code: {self._process.returncode}'
+            if last_error:
+                error = f'{error}: {last_error}'
+            return {'success': False, 'error': error}
+
+    def _download_pooled(
+        self,
+        pool: YtdlpWorkerPool,
+        worker: YtdlpWorker,
+        args: List[str],
+        progress_callback: Optional[Callable] = None,
+        info_callback: Optional[Callable] = None,
+    ) -> Dict[str, Any]:
+        """상주 워커에서 실행 (진행률은 progress hook 이벤트, aria2c 사용 시 그 출력도 함께 파싱)"""
+        logger.info(f'[GDM] yt-dlp (worker pid={worker.process.pid}) args: {" ".join(args)}')
+        self._worker = worker
+        self._start_throttle(worker.process)
+        last_error = ''
+
+        def on_event(event: Dict[str, Any]):
+            if event.get('event') == 'info':
+                if info_callback and event.get('title'):
+                    info_callback({'title': event['title']})
+                if info_callback and event.get('thumbnail'):
+                    info_callback({'thumbnail': event['thumbnail']})
+            elif event.get('event') == 'progress' and not self._rpc_files:
+                # aria2c RPC 데몬으로 받는 중이면 진행률은 RPC 폴러가 보고
+                downloaded = int(event.get('downloaded') or 0)
+                total = int(event.get('total') or 0)
+                self._downloaded_bytes = downloaded
+                progress = int(downloaded * 100 / total) if total > 0 else 0
+                if progress_callback and progress > 0:
+                    progress_callback(min(progress, 99), self._format_speed(event.get('speed')),
+                                      self._format_eta(event.get('eta')))
+
+        def on_line(line: str):
+            nonlocal last_error
+            if line.startswith('ERROR:'):
+                last_error = line
+                return
+            aria2_progress = self._parse_aria2_line(line)
+            if aria2_progress and progress_callback:
+                progress_callback(*aria2_progress)
+
+        result: Dict[str, Any] = {}
+        try:
+            result = worker.run(args, on_event, on_line)
+        finally:
+            self._throttle.stop()
+            self._worker = None
+            pool.release(worker, healthy=not result.get('worker_lost'))
+
+        if self._cancelled:
+            return {'success': False, 'error': 'Cancelled'}
+        if result.get('event') == 'done':
+            if progress_callback:
+                progress_callback(100, '', '')
+            return {'success': True, 'filepath': result.get('filepath') or ''}
+        error = result.get('error') or 'Unknown error'
+        if last_error and last_error not in error:
+            error = f'{error}: {last_error}'
+        return {'success': False, 'error': error}
+
+    def _parse_aria2_line(self, line: str) -> Optional[Tuple[int, str, str]]:
+        """aria2c 요약 줄 (예: [#1 12MiB/40MiB(30%) CN:16 DL:5.1MiB ETA:5s]) → (progress, speed, eta)"""
+        aria2_match = re.search(r'\(\s*([\d.]+)%\)', line)
+        if not aria2_match or not (('DL:' in line) or ('CN:' in line)):
+            return None
+        try:
+            progress = int(float(aria2_match.group(1)))
+            speed_match = re.search(r'DL:(\S+)', line)
+            speed = speed_match.group(1) if speed_match else ''
+            eta_match = re.search(r'ETA:(\S+)', line)
+            eta = eta_match.group(1).rstrip(']') if eta_match else ''
+            size_match = re.search(r'\s(\S+)/\S+\(', line)
+            if size_match:
+                self._downloaded_bytes = self._size_to_bytes(size_match.group(1))
+                self._meter.sample(self._downloaded_bytes, self._rate_limit_bps > 0)
+            return progress, speed, eta
+        except Exception as e:
+            logger.error(f'Parsing Error: {e}')
+            return None
+
+    @staticmethod
+    def _format_speed(bps: Any) -> str:
+        try:
+            bps = float(bps or 0)
+        except (TypeError, ValueError):
+            return ''
+        if bps <= 0:
+            return ''
+        for unit in ('B', 'KiB', 'MiB', 'GiB'):
+            if bps < 1024 or unit == 'GiB':
+                return f'{bps:.2f}{unit}/s'
+            bps /= 1024
+        return ''
+
+    @staticmethod
+    def _format_eta(seconds: Any) -> str:
+        try:
+            seconds = int(seconds)
+        except (TypeError, ValueError):
+            return ''
+        hours, rest = divmod(max(0, seconds), 3600)
+        minutes, secs = divmod(rest, 60)
+        return f'{hours}:{minutes:02d}:{secs:02d}' if hours else f'{minutes:02d}:{secs:02d}'
+
     def get_info(self, url: str) -> Dict[str, Any]:
         """URL 정보 추출"""
         try:
-            import yt_dlp
-            
-            ydl_opts = {
-                'quiet': True,
-                'no_warnings': True,
-                'extract_flat': False,
+            info = InfoCache.shared().get(url)
+            return {
+                'title': info.get('title', ''),
+                'thumbnail': info.get('thumbnail', ''),
+                'duration': info.get('duration', 0),
+                'formats': info.get('formats', []),
+                'uploader': info.get('uploader', ''),
+                'view_count': info.get('view_count', 0),
             }
-            
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-                return {
-                    'title': info.get('title', ''),
-                    'thumbnail': info.get('thumbnail', ''),
-                    'duration': info.get('duration', 0),
-                    'formats': info.get('formats', []),
-                    'uploader': info.get('uploader', ''),
-                    'view_count': info.get('view_count', 0),
-                }
         except Exception as e:
             logger.error(f'get_info error: {e}')
             return {}
     
+    def pause(self):
+        """다운로드 일시정지 (프로세스 그룹 정지 + 데몬 GID 일시정지)"""
+        super().pause()
+        if self._throttle:
+            self._throttle.set_paused(True)
+        if self._rpc_tag:
+            self._rpc_sync(Aria2Daemon.shared().tagged(self._rpc_tag))
+    
+    def resume(self):
+        """다운로드 재개"""
+        super().resume()
+        if self._rpc_tag:
+            self._rpc_sync(Aria2Daemon.shared().tagged(self._rpc_tag))
+        if self._throttle:
+            self._throttle.set_paused(False)
+    
     def cancel(self):
         """다운로드 취소"""
         super().cancel()
+        if self._throttle:
+            self._throttle.stop()
+        if self._rpc_tag:
+            # 데몬에 남은 이 태스크 GID 제거 (부분 파일/컨트롤 파일은 이어받기용으로 유지)
+            daemon = Aria2Daemon.shared()
+            daemon.unwatch(self._rpc_tag)
+            daemon.apply('aria2.forceRemove', [s['gid'] for s in daemon.tagged(self._rpc_tag)])
+        worker = self._worker
+        if worker:
+            # 워커는 유지하고 작업만 중단 (응답이 없으면 워커 종료)
+            worker.cancel()
         if self._process:
             try:
                 # [FIX] 파이프 명시적으로 닫기
                 if self._process.stdout: self._process.stdout.close()
                 if self._process.stderr: self._process.stderr.close()
                 
+                if ProcessThrottle.supported:
+                    # yt-dlp가 띄운 aria2c까지 함께 종료
+                    try: os.killpg(self._process.pid, signal.SIGTERM)
+                    except Exception: pass
                 self._process.terminate()
                 # 짧은 대기 후 여전히 살아있으면 kill
                 try: self._process.wait(timeout=1)
                 except: self._process.kill()
             except: pass
     
+    def transfer_stats(self) -> Optional[Dict[str, Any]]:
+        """aria2c 로 받은 경우 실측 전송량 {connections, bytes, seconds, limited}, 아니면 None"""
+        if not self._connections:
+            return None
+        return {
+            'connections': self._connections,
+            'bytes': self._meter.bytes,
+            'seconds': self._meter.seconds,
+            'limited': self._meter.limited,
+        }
+
     def _check_aria2c(self, aria2c_path: str) -> bool:
-        """aria2c 설치 확인"""
+        """aria2c 설치 확인 (경로별로 한 번만 실행)"""
+        cached = self._aria2c_checked.get(aria2c_path)
+        if cached is not None:
+            return cached
         try:
             result = subprocess.run(
                 [aria2c_path, '--version'],
                 capture_output=True,
                 timeout=5
             )
-            return result.returncode == 0
+            available = result.returncode == 0
         except:
-            return False
+            available = False
+        self._aria2c_checked[aria2c_path] = available
+        return available
+
+    def _on_rpc_status(self, items: List[Dict[str, Any]]) -> None:
+        """RPC 폴러 콜백: 이 태스크 GID 상태로 진행률/받은 바이트 갱신 후 속도/일시정지 적용"""
+        with self._rpc_lock:
+            current = set()
+            for item in items:
+                gid = item.get('gid', '')
+                current.add(gid)
+                self._rpc_files[gid] = (int(item.get('completedLength') or 0), int(item.get('totalLength') or 0))
+            # 목록에서 빠진 GID 는 끝난 것 (오류면 yt-dlp 가 실패로 보고)
+            for gid, (done, total) in list(self._rpc_files.items()):
+                if gid not in current and total and done < total:
+                    self._rpc_files[gid] = (total, total)
+            self._downloaded_bytes = sum(done for done, _ in self._rpc_files.values())
+            self._meter.sample(self._downloaded_bytes, self._rate_limit_bps > 0)
+        self._rpc_sync(items)
+
+        # 단일 파일(비디오/오디오 각각)일 때만 퍼센트 계산, 조각 목록은 yt-dlp 진행률 사용
+        if not self._rpc_progress or len(items) != 1:
+            return
+        done, total = self._rpc_files[items[0]['gid']]
+        speed = int(items[0].get('downloadSpeed') or 0)
+        if total > 0 and done > 0:
+            eta = (total - done) / speed if speed > 0 else None
+            self._rpc_progress(min(int(done * 100 / total), 99), self._format_speed(speed), self._format_eta(eta))
+
+    def _rpc_sync(self, items: List[Dict[str, Any]]) -> None:
+        """태스크 상태(일시정지/속도 몫)를 데몬 GID 에 맞춤 (새로 추가된 GID 포함)"""
+        daemon = Aria2Daemon.shared()
+        rate = int(self._rate_limit_bps)
+        with self._rpc_lock:
+            to_pause, to_unpause, to_rate = [], [], []
+            for item in items:
+                gid, status = item.get('gid', ''), item.get('status')
+                if self._paused and status in ('active', 'waiting') and gid not in self._rpc_paused:
+                    to_pause.append(gid)
+                    self._rpc_paused.add(gid)
+                elif not self._paused and gid in self._rpc_paused:
+                    to_unpause.append(gid)
+                    self._rpc_paused.discard(gid)
+                if self._rpc_rates.get(gid) != rate:
+                    to_rate.append(gid)
+                    self._rpc_rates[gid] = rate
+        daemon.apply('aria2.forcePause', to_pause)
+        daemon.apply('aria2.unpause', to_unpause)
+        daemon.apply('aria2.changeOption', to_rate, {'max-download-limit': str(rate)})
 
     def _download_subtitle(self, vtt_url: str, output_path: str, headers: Optional[dict] = None):
         """자막 다운로드 및 SRT 변환"""
@@ -0,0 +1,277 @@
+"""
+yt-dlp 상주 워커 풀
+- 워커 프로세스(ytdlp_worker.py)는 yt_dlp import / 추출기 적재를 한 번만 하고 여러 작업을 처리
+- 한 워커는 한 번에 한 작업만 실행 (일시정지/속도 제한은 워커 프로세스 그룹 단위 신호로 처리)
+- 취소는 워커에 cancel 명령 → 진행 훅에서 중단, 응답이 없으면 워커를 종료하고 새로 띄움
+- 워커 시작 실패(yt_dlp 미설치 등) 시 일정 시간 풀을 쓰지 않고 CLI subprocess 모드로 대체
+"""
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+from ..bandwidth import ProcessThrottle
+
+try:
+    from ..setup import P
+    logger = P.logger
+except:
+    import logging
+    logger = logging.getLogger(__name__)
+
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ytdlp_worker.py')
+
+
+class YtdlpWorker:
+    """워커 프로세스 하나 (stdin 명령 / stdout 이벤트 / stderr 로그)"""
+
+    READY_TIMEOUT = 60
+    CANCEL_GRACE_SEC = 5
+
+    def __init__(self, python: Optional[str] = None):
+        self.process = subprocess.Popen(
+            [python or sys.executable, '-u', WORKER_SCRIPT],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            bufsize=1,
+            start_new_session=ProcessThrottle.supported,
+        )
+        self.jobs_done = 0
+        self.job: Optional[str] = None
+        self.version = ''
+        self._line_handler: Optional[Callable[[str], None]] = None
+        self._write_lock = threading.Lock()
+        threading.Thread(target=self._drain_stderr, name='gdm-ytdlp-stderr', daemon=True).start()
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def wait_ready(self) -> bool:
+        """ready 이벤트까지 대기 (import 실패/시간 초과면 False)"""
+        timer = threading.Timer(self.READY_TIMEOUT, self.kill)
+        timer.daemon = True
+        timer.start()
+        try:
+            event = self._read_event()
+        finally:
+            timer.cancel()
+        if not event or event.get('event') != 'ready':
+            logger.error(f"[GDM] yt-dlp worker failed to start: {(event or {}).get('error', 'no response')}")
+            self.kill()
+            return False
+        self.version = event.get('version') or ''
+        return True
+
+    def run(self, args: List[str], on_event: Callable[[Dict[str, Any]], None],
+            on_line: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """작업 하나 실행 (호출 스레드에서 이벤트를 읽으며 대기), 마지막 done/error 이벤트 반환"""
+        self.job = uuid.uuid4().hex
+        self._line_handler = on_line
+        try:
+            self._send({'op': 'download', 'job': self.job, 'args': args})
+            while True:
+                event = self._read_event()
+                if event is None:
+                    return {'event': 'error', 'error': f'yt-dlp worker exited ({self.process.poll()})', 'worker_lost': True}
+                if event.get('job') != self.job:
+                    continue
+                if event.get('event') in ('done', 'error'):
+                    self.jobs_done += 1
+                    return event
+                on_event(event)
+        finally:
+            self._line_handler = None
+            self.job = None
+
+    def cancel(self) -> None:
+        """실행 중 작업 취소 요청, 유예 시간 안에 끝나지 않으면 워커 종료"""
+        job = self.job
+        if job is None:
+            return
+        try:
+            self._send({'op': 'cancel', 'job': job})
+        except Exception:
+            self.kill()
+            return
+
+        def _force():
+            if self.job == job:
+                logger.warning('[GDM] yt-dlp worker did not stop in time, killing it')
+                self.kill()
+        timer = threading.Timer(self.CANCEL_GRACE_SEC, _force)
+        timer.daemon = True
+        timer.start()
+
+    def close(self) -> None:
+        try:
+            self._send({'op': 'exit'})
+            self.process.wait(timeout=3)
+        except Exception:
+            self.kill()
+
+    def kill(self) -> None:
+        if not self.alive:
+            return
+        try:
+            if ProcessThrottle.supported:
+                # 작업 중 띄운 aria2c / ffmpeg 까지 함께 종료
+                import signal
+                os.killpg(self.process.pid, signal.SIGKILL)
+            else:
+                self.process.kill()
+        except Exception:
+            pass
+
+    def _send(self, msg: Dict[str, Any]) -> None:
+        with self._write_lock:
+            self.process.stdin.write(json.dumps(msg, ensure_ascii=False) + '\n')
+            self.process.stdin.flush()
+
+    def _read_event(self) -> Optional[Dict[str, Any]]:
+        while True:
+            line = self.process.stdout.readline()
+            if not line:
+                return None
+            try:
+                return json.loads(line)
+            except ValueError:
+                continue
+
+    def _drain_stderr(self) -> None:
+        # 파이프가 차서 워커가 멈추지 않도록 항상 읽고, 작업 중이면 다운로더에 전달 (aria2c 진행률, ERROR 줄)
+        for line in self.process.stderr:
+            handler = self._line_handler
+            if handler is not None:
+                try:
+                    handler(line.rstrip())
+                except Exception:
+                    pass
+
+
+class YtdlpWorkerPool:
+    """상주 워커 풀 (size=0 이면 비활성, 다운로더는 CLI subprocess 모드 사용)"""
+
+    MAX_JOBS_PER_WORKER = 50  # 장시간 메모리 누적 방지용 재시작 주기
+    RETRY_AFTER_FAILURE_SEC = 300
+
+    _shared: Optional['YtdlpWorkerPool'] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, size: int = 0, python: Optional[str] = None):
+        self.size = max(0, int(size))
+        self.python = python
+        self._cond = threading.Condition()
+        self._idle: List[YtdlpWorker] = []
+        self._total = 0  # 실행 중 + 유휴 + 시작 중
+        self._failed_at = 0.0
+
+    @classmethod
+    def shared(cls) -> 'YtdlpWorkerPool':
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    @property
+    def enabled(self) -> bool:
+        if self.size <= 0:
+            return False
+        return not self._failed_at or time.monotonic() - self._failed_at >= self.RETRY_AFTER_FAILURE_SEC
+
+    def resize(self, size: int) -> None:
+        """워커 수 변경 (줄이면 남는 유휴 워커 종료, 실행 중인 워커는 작업이 끝난 뒤 정리)"""
+        with self._cond:
+            self.size = max(0, int(size))
+            surplus = []
+            while self._idle and self._total > self.size:
+                surplus.append(self._idle.pop())
+                self._total -= 1
+            self._cond.notify_all()
+        for worker in surplus:
+            worker.close()
+
+    def warm(self) -> None:
+        """빈 자리만큼 워커를 미리 띄움 (백그라운드)"""
+        def _spawn_all():
+            while True:
+                with self._cond:
+                    if not self.enabled or self._total >= self.size:
+                        return
+                    self._total += 1
+                worker = self._spawn()
+                if worker is None:
+                    return
+                self.release(worker)
+        threading.Thread(target=_spawn_all, name='gdm-ytdlp-warm', daemon=True).start()
+
+    def acquire(self, timeout: Optional[float] = None) -> Optional[YtdlpWorker]:
+        """유휴 워커 반환 (없으면 한도 안에서 새로 띄움), 풀 비활성/시작 실패/시간 초과면 None"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                if not self.enabled:
+                    return None
+                while self._idle:
+                    worker = self._idle.pop()
+                    if worker.alive:
+                        return worker
+                    self._total -= 1
+                if self._total < self.size:
+                    self._total += 1
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+        return self._spawn()
+
+    def release(self, worker: YtdlpWorker, healthy: bool = True) -> None:
+        """작업이 끝난 워커 반납 (비정상/재시작 주기/한도 초과면 종료)"""
+        keep = healthy and worker.alive and worker.jobs_done < self.MAX_JOBS_PER_WORKER
+        with self._cond:
+            keep = keep and self._total <= self.size
+            if keep:
+                self._idle.append(worker)
+            else:
+                self._total -= 1
+            self._cond.notify()
+        if not keep:
+            threading.Thread(target=worker.close, name='gdm-ytdlp-close', daemon=True).start()
+
+    def shutdown(self) -> None:
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._total -= len(idle)
+            self.size = 0
+            self._cond.notify_all()
+        for worker in idle:
+            worker.close()
+
+    def _spawn(self) -> Optional[YtdlpWorker]:
+        """자리를 예약한 상태(_total 증가)에서 호출, 실패하면 자리 반환"""
+        worker = None
+        try:
+            worker = YtdlpWorker(self.python)
+            if worker.wait_ready():
+                logger.info(f'[GDM] yt-dlp worker started (pid={worker.process.pid}, yt-dlp {worker.version})')
+                return worker
+        except Exception as e:
+            logger.error(f'[GDM] yt-dlp worker spawn error: {e}')
+        with self._cond:
+            self._total -= 1
+            self._failed_at = time.monotonic()
+            self._cond.notify_all()
+        if worker is not None:
+            worker.kill()
+        logger.warning(f'[GDM] yt-dlp worker pool disabled for {self.RETRY_AFTER_FAILURE_SEC}s, using subprocess mode')
+        return None
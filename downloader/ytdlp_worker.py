@@ -0,0 +1,130 @@
+"""
+yt-dlp 상주 워커 프로세스 (ytdlp_pool.YtdlpWorkerPool 이 띄움, 패키지 import 없이 단독 실행)
+- yt_dlp 를 한 번만 import 해 추출기 상태를 유지하고 stdin 으로 받은 작업을 차례로 실행
+- CLI 와 같은 인자를 yt_dlp.parse_options 로 해석하므로 subprocess 모드와 옵션 동작이 같음
+- 진행 상황은 JSON 한 줄 이벤트로 전송, yt-dlp / aria2c / ffmpeg 출력은 모두 stderr 로
+
+프로토콜 (한 줄에 JSON 하나)
+  → {"op": "download", "job": id, "args": [...]}   ← {"event": "info" | "progress" | "done" | "error", "job": id, ...}
+  → {"op": "cancel", "job": id}
+  → {"op": "exit"}                                   ← 시작 시 {"event": "ready", "version": ...}
+"""
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+PROGRESS_INTERVAL = 0.25
+
+# 프로토콜 채널은 원래 stdout 복제본, fd 1 은 stderr 로 돌려 자식 프로세스 출력이 섞이지 않게 함
+_out = os.fdopen(os.dup(1), 'w', buffering=1, encoding='utf-8')
+os.dup2(2, 1)
+sys.stdout = sys.stderr
+_write_lock = threading.Lock()
+
+
+def send(**event):
+    line = json.dumps(event, ensure_ascii=False, default=str)
+    with _write_lock:
+        _out.write(line + '\n')
+        _out.flush()
+
+
+def read_commands(jobs, cancelled):
+    for line in sys.stdin:
+        try:
+            msg = json.loads(line)
+        except ValueError:
+            continue
+        op = msg.get('op')
+        if op == 'download':
+            jobs.put(msg)
+        elif op == 'cancel':
+            cancelled.add(msg.get('job'))
+        elif op == 'exit':
+            break
+    jobs.put(None)
+
+
+def run_job(yt_dlp, msg, cancelled):
+    job = msg.get('job')
+    cancel_error = getattr(yt_dlp.utils, 'DownloadCancelled', KeyboardInterrupt)
+    parsed = yt_dlp.parse_options(msg.get('args') or [])
+    state = {'info_sent': False, 'filepath': '', 'last': 0.0}
+
+    def progress_hook(d):
+        if job in cancelled:
+            raise cancel_error('Cancelled')
+        info = d.get('info_dict') or {}
+        if not state['info_sent'] and info.get('title'):
+            state['info_sent'] = True
+            send(event='info', job=job, title=info.get('title') or '', thumbnail=info.get('thumbnail') or '')
+        status = d.get('status')
+        if status == 'downloading':
+            now = time.monotonic()
+            if now - state['last'] < PROGRESS_INTERVAL:
+                return
+            state['last'] = now
+            send(
+                event='progress', job=job,
+                downloaded=d.get('downloaded_bytes') or 0,
+                total=d.get('total_bytes') or d.get('total_bytes_estimate') or 0,
+                speed=d.get('speed') or 0,
+                eta=d.get('eta'),
+            )
+        elif status == 'finished':
+            state['filepath'] = d.get('filename') or state['filepath']
+
+    def post_hook(filepath):
+        # 병합/변환 후 최종 파일
+        state['filepath'] = filepath
+
+    opts = dict(parsed.ydl_opts)
+    opts['progress_hooks'] = list(opts.get('progress_hooks') or []) + [progress_hook]
+    opts['quiet'] = True
+    try:
+        with yt_dlp.YoutubeDL(opts) as ydl:
+            ydl.add_post_hook(post_hook)
+            # --load-info-json: 캐시된 추출 결과로 바로 다운로드 (CLI 와 동일)
+            load_info = getattr(parsed.options, 'load_info_filename', None)
+            if load_info:
+                retcode = ydl.download_with_info_file(os.path.expanduser(load_info))
+            else:
+                retcode = ydl.download(parsed.urls)
+    except (cancel_error, KeyboardInterrupt):
+        send(event='error', job=job, error='Cancelled')
+        return
+    except Exception as e:
+        send(event='error', job=job, error=f'ERROR: {e}')
+        return
+    finally:
+        cancelled.discard(job)
+    if retcode:
+        send(event='error', job=job, error=f'Exit code: {retcode}')
+    else:
+        send(event='done', job=job, filepath=state['filepath'])
+
+
+def main():
+    try:
+        import yt_dlp
+        # 추출기 목록을 미리 적재 (첫 작업의 import 지연 제거)
+        yt_dlp.extractor.gen_extractor_classes()
+    except Exception as e:
+        send(event='failed', error=str(e))
+        return
+    send(event='ready', version=getattr(getattr(yt_dlp, 'version', None), '__version__', ''))
+    jobs = queue.Queue()
+    cancelled = set()
+    threading.Thread(target=read_commands, args=(jobs, cancelled), daemon=True).start()
+    while True:
+        msg = jobs.get()
+        if msg is None:
+            break
+        run_job(yt_dlp, msg, cancelled)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,239 @@
+"""
+yt-dlp 메타데이터(extract_info) 공유 캐시
+- 키: YouTube 영상 id (재생목록 URL 등은 URL 자체)
+- TTL + LRU, 서명된 스트림 URL 의 expire 시각이 TTL 보다 빠르면 그 시각(여유분 제외)에 만료
+- 같은 키의 동시 조회는 추출 한 번으로 병합 (singleflight)
+- 다운로드는 아직 유효한 항목을 info JSON 파일로 받아 yt-dlp --load-info-json 으로 재사용
+"""
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+try:
+    from .setup import P
+    logger = P.logger
+except:
+    import logging
+    logger = logging.getLogger(__name__)
+
+
+_YOUTUBE_ID_RE = re.compile(r'(?:[?&]v=|youtu\.be/|/shorts/|/embed/|/live/)([0-9A-Za-z_-]{11})(?![0-9A-Za-z_-])')
+_EXPIRE_RE = re.compile(r'[?&/]expire[=/](\d{9,})')
+
+
+class _Entry:
+    __slots__ = ('info', 'expires_at', 'url_expires_at', 'json_path')
+
+    def __init__(self, info: Dict[str, Any], expires_at: float, url_expires_at: float):
+        self.info = info
+        self.expires_at = expires_at
+        self.url_expires_at = url_expires_at  # 스트림 URL 만료 (epoch, 0: 알 수 없음)
+        self.json_path: Optional[str] = None
+
+
+class _Flight:
+    __slots__ = ('event', 'info', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.info: Optional[Dict[str, Any]] = None
+        self.error: Optional[BaseException] = None
+
+
+class InfoCache:
+    """extract_info 결과 캐시 (공개 API / process_ajax / 다운로더 공용)"""
+
+    URL_EXPIRY_MARGIN_SEC = 600  # 다운로드 시작 후에도 서명 URL 이 유효해야 하는 최소 여유
+    WAIT_TIMEOUT_SEC = 120
+
+    _shared: Optional['InfoCache'] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, ttl_sec: float = 1800.0, max_entries: int = 64, json_dir: Optional[str] = None):
+        self.ttl_sec = ttl_sec
+        self.max_entries = max_entries
+        self.json_dir = json_dir or os.path.join(tempfile.gettempdir(), 'gdm_info_cache')
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, _Entry]' = OrderedDict()
+        self._inflight: Dict[str, _Flight] = {}
+
+    @classmethod
+    def shared(cls) -> 'InfoCache':
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def configure(self, ttl_sec: Optional[float] = None, max_entries: Optional[int] = None) -> None:
+        with self._lock:
+            if ttl_sec is not None:
+                self.ttl_sec = max(0.0, float(ttl_sec))
+            if max_entries is not None:
+                self.max_entries = max(0, int(max_entries))
+            dropped = self._trim()
+        self._remove_files(dropped)
+
+    @staticmethod
+    def cache_key(url: str) -> str:
+        """YouTube 단일 영상이면 'youtube:<id>', 그 외(재생목록 포함)는 URL"""
+        url = (url or '').strip()
+        match = _YOUTUBE_ID_RE.search(url)
+        if match and ('youtube.com' in url or 'youtu.be' in url) and 'list=' not in url:
+            return f'youtube:{match.group(1)}'
+        return url
+
+    def get(self, url: str, extract: Optional[Callable[[str], Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """캐시된 info 반환, 없거나 만료면 추출 (같은 키를 추출 중이면 그 결과를 기다림)"""
+        key = self.cache_key(url)
+        with self._lock:
+            entry = self._fresh(key)
+            if entry is not None:
+                return entry.info
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+        if not leader:
+            if not flight.event.wait(self.WAIT_TIMEOUT_SEC):
+                raise TimeoutError(f'info extraction timed out: {url}')
+            if flight.error is not None:
+                raise flight.error
+            return flight.info
+
+        try:
+            info = (extract or self.extract)(url)
+            flight.info = info
+            self.put(url, info)
+            return info
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+
+    def peek(self, url: str) -> Optional[Dict[str, Any]]:
+        """추출 없이 유효한 캐시만 조회"""
+        with self._lock:
+            entry = self._fresh(self.cache_key(url))
+            return entry.info if entry is not None else None
+
+    def put(self, url: str, info: Dict[str, Any]) -> None:
+        if not info or self.max_entries <= 0 or self.ttl_sec <= 0:
+            return
+        now = time.time()
+        url_expires_at = self._url_expiry(info)
+        expires_at = now + self.ttl_sec
+        if url_expires_at:
+            expires_at = min(expires_at, url_expires_at - self.URL_EXPIRY_MARGIN_SEC)
+        if expires_at <= now:
+            return
+        key = self.cache_key(url)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            self._entries[key] = _Entry(info, expires_at, url_expires_at)
+            dropped = self._trim()
+        if old is not None:
+            dropped.append(old)
+        self._remove_files(dropped)
+
+    def invalidate(self, url: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(self.cache_key(url), None)
+        if entry is not None:
+            self._remove_files([entry])
+
+    def info_json_path(self, url: str) -> Optional[str]:
+        """
+        다운로드에 재사용할 info JSON 파일 경로 (yt-dlp --load-info-json)
+        단일 영상이고 서명 URL 이 충분히 남은 경우만, 아니면 None (다운로더가 새로 추출)
+        """
+        key = self.cache_key(url)
+        with self._lock:
+            entry = self._fresh(key)
+            if entry is None or entry.info.get('_type', 'video') != 'video':
+                return None
+            if entry.json_path and os.path.exists(entry.json_path):
+                return entry.json_path
+            info = entry.info
+        try:
+            os.makedirs(self.json_dir, exist_ok=True)
+            path = os.path.join(self.json_dir, re.sub(r'[^0-9A-Za-z_.-]', '_', key)[-120:] + '.info.json')
+            tmp = path + '.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(info, f, ensure_ascii=False, default=str)
+            os.replace(tmp, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f'[GDM] info cache json write failed: {e}')
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.info is not info:
+                return None
+            entry.json_path = path
+        return path
+
+    @staticmethod
+    def extract(url: str) -> Dict[str, Any]:
+        """yt-dlp extract_info (JSON 직렬화 가능한 형태로 정리)"""
+        import yt_dlp
+        ydl_opts = {
+            'quiet': True,
+            'no_warnings': True,
+            'extract_flat': False,
+        }
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info = ydl.extract_info(url, download=False)
+            return ydl.sanitize_info(info)
+
+    def _fresh(self, key: str) -> Optional[_Entry]:
+        """(lock 보유 상태) 유효 항목 반환 + LRU 갱신, 만료 항목은 제거"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.time():
+            del self._entries[key]
+            self._remove_files([entry], background=True)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _trim(self) -> list:
+        dropped = []
+        while len(self._entries) > self.max_entries:
+            dropped.append(self._entries.popitem(last=False)[1])
+        return dropped
+
+    @staticmethod
+    def _url_expiry(info: Dict[str, Any]) -> float:
+        """선택 가능한 스트림 URL 중 가장 이른 expire (epoch)"""
+        earliest = 0.0
+        for fmt in info.get('formats') or [info]:
+            match = _EXPIRE_RE.search(fmt.get('url') or '')
+            if match:
+                value = float(match.group(1))
+                earliest = value if not earliest else min(earliest, value)
+        return earliest
+
+    @staticmethod
+    def _remove_files(entries, background: bool = False) -> None:
+        paths = [e.json_path for e in entries if e is not None and e.json_path]
+        if not paths:
+            return
+
+        def _remove():
+            for path in paths:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        if background:
+            threading.Thread(target=_remove, daemon=True).start()
+        else:
+            _remove()
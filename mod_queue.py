@@ -2,12 +2,15 @@
 gommi_download_manager - 다운로드 큐 관리 모듈
 """
 import os
+import shutil
 import time
 import threading
 import traceback
 import re
 from datetime import datetime
-from typing import Optional, Dict, Any, List, Callable
+from collections import deque
+from urllib.parse import urlparse
+from typing import Optional, Dict, Any, List, Callable, Deque, Tuple
 from enum import Enum
 
 from flask import render_template, jsonify
@@ -27,29 +30,162 @@ class DownloadStatus(str, Enum):
     CANCELLED = "cancelled"
 
 
+class StatusBroadcaster:
+    """
+    Socket.IO 상태 전송 병합기
+    - 진행률 갱신은 태스크를 dirty로 표시만 하고, flush 주기마다 변경된 필드만 모아
+      download_status_batch 한 프레임으로 전송
+    - 상태 전이(downloading → completed/error 등)는 병합하지 않고 download_status로 즉시 전송
+    """
+
+    NAMESPACE = '/gommi_downloader_manager'
+
+    def __init__(self, interval_ms: int = 500):
+        self.interval = max(50, int(interval_ms)) / 1000.0
+        self._lock = threading.Lock()
+        self._dirty: Dict[str, 'DownloadTask'] = {}
+        self._last_sent: Dict[str, Dict[str, Any]] = {}
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def set_interval(self, interval_ms: int) -> None:
+        self.interval = max(50, int(interval_ms)) / 1000.0
+        self._wakeup.set()
+
+    def publish(self, task: 'DownloadTask') -> None:
+        """상태가 바뀌었으면 즉시, 아니면 다음 flush 때 전송"""
+        last = self._last_sent.get(task.id)
+        if last is None or last.get('status') != task.status:
+            self.emit_now(task)
+            return
+        with self._lock:
+            self._dirty[task.id] = task
+        self._ensure_thread()
+
+    def emit_now(self, task: 'DownloadTask') -> None:
+        status = task.get_status()
+        with self._lock:
+            self._dirty.pop(task.id, None)
+            self._last_sent[task.id] = status
+        self._emit('download_status', status)
+
+    def forget(self, task_id: str) -> None:
+        with self._lock:
+            self._dirty.pop(task_id, None)
+            self._last_sent.pop(task_id, None)
+
+    def flush(self) -> None:
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+        items = []
+        for task_id, task in dirty.items():
+            status = task.get_status()
+            with self._lock:
+                last = self._last_sent.get(task_id, {})
+                changed = {k: v for k, v in status.items() if last.get(k) != v}
+                self._last_sent[task_id] = status
+            if changed:
+                changed['id'] = task_id
+                items.append(changed)
+        if items:
+            self._emit('download_status_batch', {'items': items})
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._loop, name='gdm-status-flush', daemon=True)
+                    self._thread.start()
+
+    def _loop(self) -> None:
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                pass
+
+    def _emit(self, event: str, data: Dict[str, Any]) -> None:
+        try:
+            socketio.emit(event, data, namespace=self.NAMESPACE)
+        except:
+            pass
+
+
 from plugin import PluginModuleBase
+from .scheduler import DownloadScheduler
+from .bandwidth import BandwidthManager
+from .db_writer import DbWriter
+from .completed_cache import CompletedCache
+from .retry import ERROR_UNKNOWN, UNKNOWN_MAX_RETRY, CircuitBreakers, backoff_delay, classify_error
+from .registry import TaskRegistry
+from .info_cache import InfoCache
+from .tuning import ConnectionTuner
 
 class ModuleQueue(PluginModuleBase):
     """다운로드 큐 관리 모듈"""
     
     db_default = {
         'aria2c_path': 'aria2c',
-        'aria2c_connections': '16',  # 동시 연결 수
+        'aria2c_connections': '16',  # 동시 연결 수 (HTTP 직접 다운로드의 Range 분할 연결 수로도 사용)
+        'aria2_rpc': 'True',  # aria2c 상주 RPC 데몬 사용 (False: 다운로드마다 aria2c 실행)
+        'adaptive_connections': 'True',  # 호스트별 실측 처리량으로 aria2c 연결 수 선택 (aria2c_connections 는 초기값)
+        'connection_explore_pct': '15',  # 이웃 연결 수를 시험하는 비율 (%)
         'ffmpeg_path': 'ffmpeg',
+        'hls_window': '6',  # HLS 세그먼트 동시 수신 수 (1: 순차)
+        'hls_remux': 'True',  # HLS 세그먼트 수신 후 ffmpeg 로 mp4 변환 (False: TS/fMP4 그대로 저장)
+        'hls_hedge': 'False',  # HLS 세그먼트가 호스트 p95 지연을 넘기면 다른 미러(없으면 같은 호스트)로 중복 요청
+        'hls_max_skip_segments': '1',  # 재시도 후에도 실패한 HLS 세그먼트를 이 개수까지 건너뛰고 완료
         'yt_dlp_path': '',  # 비어있으면 python module 사용
+        'ytdlp_workers': '0',  # yt-dlp 상주 워커 수 (0: 다운로드마다 CLI 실행)
+        'info_cache_ttl_sec': '1800',  # 추출 정보 캐시 유지 시간 (0: 사용 안 함, 서명 URL 만료가 더 빠르면 그때까지)
+        'info_cache_size': '64',  # 추출 정보 캐시 최대 항목 수
         'save_path': '{PATH_DATA}/download',
         'temp_path': '{PATH_DATA}/download_tmp',
         'max_concurrent': '3',  # 동시 다운로드 수
         'max_download_rate': '0',  # 최대 다운로드 속도 (0: 무제한, 5M, 10M...)
         'auto_retry': 'true',
         'max_retry': '3',
+        'retry_base_sec': '5',  # 재시도 백오프 기본 대기 (지터 포함 지수 증가)
+        'retry_max_sec': '300',  # 재시도 백오프 최대 대기
+        'breaker_threshold': '5',  # 호스트별 연속 실패 N회면 차단 (0: 사용 안 함)
+        'breaker_cooldown_sec': '120',  # 차단 유지 시간 (시험 요청 실패 시 두 배)
+        'queue_weights': 'chrome_extension=4',  # 호출자별 공정 큐잉 가중치 (name=weight, 쉼표/줄바꿈 구분)
+        'priority_aging_sec': '60',  # 대기 N초마다 유효 우선순위 +1 (0: 에이징 없음)
+        'source_limits': '',  # source_type별 동시 실행 수 (예: ohli24=2, anilife=1)
+        'host_limits': '',  # 호스트별 동시 실행 수 (예: cdn.example.com=2, 상위 도메인 포함)
+        'max_per_host': '0',  # 호스트별 기본 동시 실행 수 (0: 제한 없음)
+        'status_flush_ms': '500',  # 진행률 Socket.IO 병합 전송 주기 (ms)
+        'completed_cache': 'True',  # 완료 파일 재사용 (같은 URL/포맷 재요청 시 링크/복사로 즉시 완료)
+        'completed_cache_hash': 'False',  # 완료 파일 sha256 기록 (검증 패스에서 내용 확인)
+        'finished_grace_sec': '300',  # 끝난 태스크를 메모리에 유지하는 시간 (이후 DB 내역으로만 표시)
+        'finished_max_tasks': '200',  # 메모리에 유지할 끝난 태스크 최대 개수 (오래 안 쓰인 것부터 제외)
     }
     
-    # 진행 중인 다운로드 인스턴스들
-    _downloads: Dict[str, 'DownloadTask'] = {}
+    # 진행 중인 다운로드 인스턴스들 (끝난 태스크는 유예 시간/개수 한도 안에서만 유지)
+    _downloads = TaskRegistry(
+        finished_statuses=(DownloadStatus.COMPLETED, DownloadStatus.CANCELLED, DownloadStatus.ERROR),
+        on_evict=lambda tasks: ModuleQueue._on_tasks_evicted(tasks),
+    )
     _queue_lock = threading.Lock()
-    _concurrency_sem: Optional[threading.Semaphore] = None
-    _concurrency_limit: int = 0
+    _scheduler: Optional[DownloadScheduler] = None
+    _bandwidth = BandwidthManager()
+    _broadcaster = StatusBroadcaster()
+    _tuner = ConnectionTuner()
+    # 상태/정보/진행률 DB 기록은 전용 writer 스레드에서 병합 커밋
+    _db_writer = DbWriter()
+    _shutting_down = False
+    # 진행 중 다운로드 (정규화 URL + 포맷 + 대상 경로) → 태스크, 중복 요청 병합용
+    _inflight: Dict[str, 'DownloadTask'] = {}
+    # 호스트별 서킷 브레이커 (CDN 장애 시 요청 중단)
+    _breakers = CircuitBreakers()
+    
+    # list 델타 커서 (단조 증가 변경 카운터 + 삭제 기록)
+    _change_seq = 0
+    _change_lock = threading.Lock()
+    _tombstones: Deque[Tuple[int, str]] = deque(maxlen=2000)
+    _full_reset_seq = 0
     
     # 업데이트 체크 캐싱
     _last_update_check = 0
@@ -61,30 +197,71 @@ class ModuleQueue(PluginModuleBase):
         default_route_socketio_module(self, attach='/queue')
         self._ensure_concurrency_limit()
 
-    @classmethod
-    def _ensure_concurrency_limit(cls):
-        """max_concurrent 설정 기반 동시 실행 슬롯 보장"""
+    @staticmethod
+    def _configured_max_concurrent() -> int:
         try:
             from .setup import P
             configured = int(P.ModelSetting.get('max_concurrent') or 3)
         except Exception:
             configured = 3
-        configured = max(1, configured)
+        return max(1, configured)
 
-        if cls._concurrency_sem is None:
-            cls._concurrency_sem = threading.Semaphore(configured)
-            cls._concurrency_limit = configured
-            return
+    @classmethod
+    def _ensure_concurrency_limit(cls) -> DownloadScheduler:
+        """max_concurrent 설정 기반 워커 풀 보장 (전역 상한, 풀별 제한은 그 아래에서 적용)"""
+        if cls._scheduler is None:
+            cls._scheduler = DownloadScheduler(max_workers=cls._configured_max_concurrent())
+            cls._configure_scheduler()
+        return cls._scheduler
 
-        if cls._concurrency_limit != configured:
-            # 실행 중 태스크가 없을 때만 세마포어 재생성
-            active = any(
-                t.status == DownloadStatus.DOWNLOADING and not t._cancelled
-                for t in cls._downloads.values()
+    @classmethod
+    def _apply_concurrency_limit(cls):
+        """max_concurrent 변경을 큐를 비우지 않고 즉시 반영"""
+        scheduler = cls._ensure_concurrency_limit()
+        configured = cls._configured_max_concurrent()
+        if scheduler.limit != configured:
+            from .setup import P
+            P.logger.info(
+                f'[GDM] max_concurrent {scheduler.limit} -> {configured} '
+                f'(running={scheduler.running_count}, waiting={scheduler.waiting_count})'
             )
-            if not active:
-                cls._concurrency_sem = threading.Semaphore(configured)
-                cls._concurrency_limit = configured
+            scheduler.resize(configured)
+
+    @staticmethod
+    def _parse_weight_map(raw: Any) -> Dict[str, float]:
+        """'chrome_extension=4, anime_downloader=1' 형태를 dict로 변환"""
+        result: Dict[str, float] = {}
+        for token in re.split(r'[,\n]', str(raw or '')):
+            if '=' not in token:
+                continue
+            name, value = token.split('=', 1)
+            try:
+                result[name.strip()] = float(value.strip())
+            except ValueError:
+                continue
+        return result
+
+    @classmethod
+    def _configure_scheduler(cls):
+        """공정 큐잉(가중치/에이징) 및 source/호스트 풀 제한을 스케줄러에 반영"""
+        if cls._scheduler is None:
+            return
+        try:
+            from .setup import P
+            weights = cls._parse_weight_map(P.ModelSetting.get('queue_weights'))
+            aging_sec = float(P.ModelSetting.get('priority_aging_sec') or 60)
+            source_limits = {k: int(v) for k, v in cls._parse_weight_map(P.ModelSetting.get('source_limits')).items()}
+            host_limits = {k: int(v) for k, v in cls._parse_weight_map(P.ModelSetting.get('host_limits')).items()}
+            max_per_host = int(P.ModelSetting.get('max_per_host') or 0)
+        except Exception:
+            weights, aging_sec, source_limits, host_limits, max_per_host = {}, 60.0, {}, {}, 0
+        cls._scheduler.configure(
+            weights=weights,
+            aging_sec=aging_sec,
+            source_limits=source_limits,
+            host_limits=host_limits,
+            default_host_limit=max_per_host,
+        )
 
     
     def process_menu(self, page_name: str, req: Any) -> Any:
@@ -95,6 +272,8 @@ class ModuleQueue(PluginModuleBase):
             arg['module_name'] = self.name
             arg['package_name'] = self.P.package_name  # 명시적 추가
             arg['path_data'] = F.config['path_data']
+            if page_name == 'setting':
+                arg['connection_table'] = self._tuner.table()
             return render_template(f'{self.P.package_name}_{self.name}_{page_name}.html', arg=arg)
         except Exception as e:
             self.P.logger.error(f'Exception:{str(e)}')
@@ -112,60 +291,77 @@ class ModuleQueue(PluginModuleBase):
                 url = req.form['url']
                 save_path = req.form.get('save_path') or ToolUtil.make_path(self.P.ModelSetting.get('save_path'))
                 filename = req.form.get('filename')
+                priority = int(req.form.get('priority') or 0)
                 
-                item = self.add_download(url, save_path, filename)
+                item = self.add_download(url, save_path, filename, priority=priority)
                 ret['data'] = item.as_dict() if item else None
                 
-            elif command == 'list':
-                # 진행 중인 다운로드 목록 + 최근 DB 내역 (영속성 강화)
-                active_items = [d.get_status() for d in self._downloads.values()]
-                active_ids = [i['id'] for i in active_items if 'id' in i]
+            elif command == 'add_bulk':
+                # 여러 다운로드 일괄 추가 (JSON: {"items": [{url, save_path?, filename?, ...}, ...]})
+                from .setup import P, ToolUtil
+                data = req.get_json(silent=True) or {}
+                items = data.get('items')
+                if items is None:
+                    import json
+                    items = json.loads(req.form.get('items') or '[]')
+                default_path = None
+                for spec in items:
+                    if isinstance(spec, dict) and not spec.get('save_path'):
+                        default_path = default_path or ToolUtil.make_path(self.P.ModelSetting.get('save_path'))
+                        spec['save_path'] = default_path
+                try:
+                    ret['ids'] = self.add_downloads(items)
+                    ret['msg'] = f'{len(ret["ids"])}개 다운로드가 추가되었습니다.'
+                except ValueError as e:
+                    ret['ret'] = 'error'
+                    ret['msg'] = str(e)
                 
-                # DB에서 최근 50개 가져와서 합치기
-                from .model import ModelDownloadItem
-                with F.app.app_context():
-                    db_items = F.db.session.query(ModelDownloadItem).order_by(ModelDownloadItem.id.desc()).limit(50).all()
-                    for db_item in db_items:
-                        # 이미 active에 있으면 스킵
-                        is_active = False
-                        for ai in active_items:
-                            if ai.get('db_id') == db_item.id:
-                                is_active = True
-                                break
-                        if not is_active:
-                            item_dict = db_item.as_dict()
-                            item_dict['id'] = f"db_{db_item.id}"
-                            # completed 상태면 진행률 100%로 표시
-                            if item_dict.get('status') == 'completed':
-                                item_dict['progress'] = 100
-                            active_items.append(item_dict)
+            elif command == 'cache_verify':
+                # 완료 캐시 검증 (없어진 파일 색인 제거)
+                ret['data'] = self.verify_completed_cache()
+                ret['msg'] = f"완료 캐시 검증: 유지 {ret['data']['kept']}개, 제거 {ret['data']['dropped']}개"
                 
-                ret['data'] = active_items
+            elif command == 'connection_reset':
+                # 연결 수 학습 표 초기화 (host 지정 시 해당 호스트만)
+                self.reset_throughput_table(req.form.get('host') or None)
+                ret['msg'] = '연결 수 학습 표를 초기화했습니다.'
+                
+            elif command == 'list':
+                # 진행 중인 다운로드 목록 + DB 내역 (since 커서 기반 델타 / before_id 키셋 페이지)
+                since = int(req.form.get('since') or 0)
+                before_id = int(req.form.get('before_id') or 0)
+                limit = max(1, min(int(req.form.get('limit') or 50), 500))
+                result = self._list_items(since=since, before_id=before_id, limit=limit)
+                ret['data'] = result.pop('items')
+                ret.update(result)
                 
             elif command == 'cancel':
                 # 다운로드 취소
-                download_id = req.form['id']
-                if download_id in self._downloads:
-                    self._downloads[download_id].cancel()
+                task = self._downloads.resolve(req.form['id'])
+                if task is not None:
+                    task.cancel()
                     ret['msg'] = '다운로드가 취소되었습니다.'
                     
             elif command == 'pause':
-                download_id = req.form['id']
-                if download_id in self._downloads:
-                    self._downloads[download_id].pause()
+                task = self._downloads.resolve(req.form['id'])
+                if task is not None:
+                    task.pause()
                     
             elif command == 'resume':
-                download_id = req.form['id']
-                if download_id in self._downloads:
-                    self._downloads[download_id].resume()
+                task = self._downloads.resolve(req.form['id'])
+                if task is not None:
+                    task.resume()
 
             elif command == 'reset':
                 # 전체 목록 초기화 (진행중인건 취소)
                 for task in list(self._downloads.values()):
                     task.cancel()
+                    self._broadcaster.forget(task.id)
                 self._downloads.clear()
+                self._invalidate_list_cursors()
                 
-                # DB에서도 삭제
+                # DB에서도 삭제 (대기 중인 INSERT 먼저 반영)
+                self._db_writer.flush()
                 try:
                     with F.app.app_context():
                         from .model import ModelDownloadItem
@@ -181,13 +377,18 @@ class ModuleQueue(PluginModuleBase):
                 download_id = req.form.get('id', '')
                 db_id_to_delete = None
                 
-                # 1. DB ID 추출 및 메모리 정리
-                if download_id in self._downloads:
-                    task = self._downloads[download_id]
-                    if hasattr(task, 'db_id'):
-                        db_id_to_delete = task.db_id
+                # 1. DB ID 추출 및 메모리 정리 (db_ id 로 와도 메모리 태스크를 찾아 함께 정리)
+                task = self._downloads.resolve(download_id)
+                if task is not None:
                     task.cancel()
-                    del self._downloads[download_id]
+                    # 대기 중인 쓰기를 버리고 진행 중인 배치가 끝난 뒤 db_id 확인
+                    self._db_writer.discard(task.id)
+                    self._db_writer.flush()
+                    db_id_to_delete = task.db_id
+                    self._downloads.pop(task.id)
+                    self._broadcaster.forget(task.id)
+                    self._record_removal(task.id)
+                self._record_removal(download_id)
                 
                 # 2. DB에서 삭제 처리
                 if download_id.startswith('db_'):
@@ -209,16 +410,14 @@ class ModuleQueue(PluginModuleBase):
                 # 완료된 항목 일괄 삭제 (메모리 + DB)
                 removed_memory = 0
                 with self._queue_lock:
-                    remove_ids = [
-                        task_id
-                        for task_id, task in self._downloads.items()
-                        if task.status == DownloadStatus.COMPLETED
-                    ]
+                    remove_ids = [task.id for task in self._downloads.by_status(DownloadStatus.COMPLETED)]
                     for task_id in remove_ids:
                         del self._downloads[task_id]
+                        self._broadcaster.forget(task_id)
                     removed_memory = len(remove_ids)
 
                 removed_db = 0
+                self._db_writer.flush()
                 try:
                     from .model import ModelDownloadItem
                     with F.app.app_context():
@@ -229,6 +428,7 @@ class ModuleQueue(PluginModuleBase):
                 except Exception as e:
                     self.P.logger.error(f'DB Delete Completed Error: {e}')
 
+                self._invalidate_list_cursors()
                 ret['msg'] = f'완료 항목 삭제: 메모리 {removed_memory}개, DB {removed_db}개'
                 ret['data'] = {'memory': removed_memory, 'db': removed_db}
             
@@ -286,60 +486,52 @@ class ModuleQueue(PluginModuleBase):
                     return jsonify(ret)
                 
                 try:
-                    import yt_dlp
+                    # 공개 API / 다운로더와 같은 캐시 사용 (같은 영상 재조회 및 다운로드 시 재추출 생략)
+                    info = InfoCache.shared().get(url)
                     
-                    ydl_opts = {
-                        'quiet': True,
-                        'no_warnings': True,
-                        'extract_flat': False,
-                    }
+                    ret['title'] = info.get('title', '')
+                    ret['thumbnail'] = info.get('thumbnail', '')
+                    ret['duration'] = info.get('duration', 0)
+                    
+                    # 품질 목록 생성
+                    formats = []
+                    
+                    # 미리 정의된 품질 옵션들
+                    formats.append({'id': 'bestvideo+bestaudio/best', 'label': '최고 품질', 'note': '자동 선택'})
+                    
+                    # 실제 포맷에서 해상도 추출
+                    available_heights = set()
+                    for f in info.get('formats', []):
+                        height = f.get('height')
+                        if height and f.get('vcodec') != 'none':
+                            available_heights.add(height)
+                    
+                    # 해상도별 옵션 추가
+                    for height in sorted(available_heights, reverse=True):
+                        if height >= 2160:
+                            formats.append({'id': f'bestvideo[height<=2160]+bestaudio/best', 'label': '4K (2160p)', 'note': '고용량'})
+                        elif height >= 1440:
+                            formats.append({'id': f'bestvideo[height<=1440]+bestaudio/best', 'label': '2K (1440p)', 'note': ''})
+                        elif height >= 1080:
+                            formats.append({'id': f'bestvideo[height<=1080]+bestaudio/best', 'label': 'FHD (1080p)', 'note': '권장'})
+                        elif height >= 720:
+                            formats.append({'id': f'bestvideo[height<=720]+bestaudio/best', 'label': 'HD (720p)', 'note': ''})
+                        elif height >= 480:
+                            formats.append({'id': f'bestvideo[height<=480]+bestaudio/best', 'label': 'SD (480p)', 'note': '저용량'})
+                    
+                    # 오디오 전용 옵션
+                    formats.append({'id': 'bestaudio/best', 'label': '오디오만', 'note': 'MP3 변환'})
+                    
+                    # 중복 제거
+                    seen = set()
+                    unique_formats = []
+                    for f in formats:
+                        if f['id'] not in seen:
+                            seen.add(f['id'])
+                            unique_formats.append(f)
+                    
+                    ret['formats'] = unique_formats
                     
-                    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                        info = ydl.extract_info(url, download=False)
-                        
-                        ret['title'] = info.get('title', '')
-                        ret['thumbnail'] = info.get('thumbnail', '')
-                        ret['duration'] = info.get('duration', 0)
-                        
-                        # 품질 목록 생성
-                        formats = []
-                        
-                        # 미리 정의된 품질 옵션들
-                        formats.append({'id': 'bestvideo+bestaudio/best', 'label': '최고 품질', 'note': '자동 선택'})
-                        
-                        # 실제 포맷에서 해상도 추출
-                        available_heights = set()
-                        for f in info.get('formats', []):
-                            height = f.get('height')
-                            if height and f.get('vcodec') != 'none':
-                                available_heights.add(height)
-                        
-                        # 해상도별 옵션 추가
-                        for height in sorted(available_heights, reverse=True):
-                            if height >= 2160:
-                                formats.append({'id': f'bestvideo[height<=2160]+bestaudio/best', 'label': '4K (2160p)', 'note': '고용량'})
-                            elif height >= 1440:
-                                formats.append({'id': f'bestvideo[height<=1440]+bestaudio/best', 'label': '2K (1440p)', 'note': ''})
-                            elif height >= 1080:
-                                formats.append({'id': f'bestvideo[height<=1080]+bestaudio/best', 'label': 'FHD (1080p)', 'note': '권장'})
-                            elif height >= 720:
-                                formats.append({'id': f'bestvideo[height<=720]+bestaudio/best', 'label': 'HD (720p)', 'note': ''})
-                            elif height >= 480:
-                                formats.append({'id': f'bestvideo[height<=480]+bestaudio/best', 'label': 'SD (480p)', 'note': '저용량'})
-                        
-                        # 오디오 전용 옵션
-                        formats.append({'id': 'bestaudio/best', 'label': '오디오만', 'note': 'MP3 변환'})
-                        
-                        # 중복 제거
-                        seen = set()
-                        unique_formats = []
-                        for f in formats:
-                            if f['id'] not in seen:
-                                seen.add(f['id'])
-                                unique_formats.append(f)
-                        
-                        ret['formats'] = unique_formats
-                        
                 except Exception as e:
                     self.P.logger.error(f'YouTube format extraction error: {e}')
                     ret['ret'] = 'error'
@@ -386,6 +578,70 @@ class ModuleQueue(PluginModuleBase):
             
         return jsonify(ret)
     
+    @classmethod
+    def _next_change_seq(cls) -> int:
+        """단조 증가 변경 카운터 (list 델타 커서)"""
+        with cls._change_lock:
+            cls._change_seq += 1
+            return cls._change_seq
+
+    @classmethod
+    def _record_removal(cls, item_id: str) -> None:
+        cls._tombstones.append((cls._next_change_seq(), item_id))
+
+    @classmethod
+    def _invalidate_list_cursors(cls) -> None:
+        """일괄 삭제 등 개별 삭제 기록이 없는 변경 → 이전 커서는 전체 재조회"""
+        cls._full_reset_seq = cls._next_change_seq()
+
+    @classmethod
+    def _list_items(cls, since: int = 0, before_id: int = 0, limit: int = 50) -> Dict[str, Any]:
+        """
+        list API 본체
+        - since > 0: since 이후 바뀐 메모리 태스크와 삭제된 id만 반환 (DB 조회 없음)
+        - since = 0: 메모리 태스크 전체 + DB 내역 한 페이지 (id < before_id, 최신순)
+        """
+        cls._downloads.evict()
+        cursor = cls._change_seq
+        tombstone_floor = cls._tombstones[0][0] if len(cls._tombstones) == cls._tombstones.maxlen else 0
+        if since > 0 and since >= cls._full_reset_seq and since >= tombstone_floor:
+            if since >= cursor:
+                # 유휴 상태 폴링: 바로 반환
+                return {'items': [], 'removed': [], 'cursor': cursor, 'full': False, 'breakers': cls._breakers.snapshot()}
+            changed = [t.get_status() for t in cls._downloads.changed_since(since)]
+            removed = [item_id for seq, item_id in list(cls._tombstones) if seq > since]
+            return {'items': changed, 'removed': removed, 'cursor': cursor, 'full': False, 'breakers': cls._breakers.snapshot()}
+
+        items: List[Dict[str, Any]] = []
+        active_db_ids = set(cls._downloads.db_ids())
+        if not before_id:
+            items = [task.get_status() for task in cls._downloads.values()]
+
+        next_before_id = None
+        from .model import ModelDownloadItem
+        with F.app.app_context():
+            query = F.db.session.query(ModelDownloadItem)
+            if before_id:
+                query = query.filter(ModelDownloadItem.id < before_id)
+            db_items = query.order_by(ModelDownloadItem.id.desc()).limit(limit).all()
+            for db_item in db_items:
+                # 이미 메모리에 있으면 스킵
+                if db_item.id in active_db_ids:
+                    continue
+                item_dict = db_item.as_dict()
+                item_dict['id'] = f"db_{db_item.id}"
+                # completed 상태면 진행률 100%로 표시
+                if item_dict.get('status') == 'completed':
+                    item_dict['progress'] = 100
+                items.append(item_dict)
+            if len(db_items) == limit:
+                next_before_id = db_items[-1].id
+
+        return {
+            'items': items, 'removed': [], 'cursor': cursor, 'full': True,
+            'next_before_id': next_before_id, 'breakers': cls._breakers.snapshot(),
+        }
+
     # ===== 외부 플러그인용 API =====
     
     @classmethod
@@ -403,21 +659,15 @@ class ModuleQueue(PluginModuleBase):
         title: Optional[str] = None,
         thumbnail: Optional[str] = None,
         meta: Optional[Dict[str, Any]] = None,
+        priority: int = 0,
         **options
     ) -> Optional['DownloadTask']:
-        """다운로드를 큐에 추가 (외부 플러그인에서 호출)"""
+        """다운로드를 큐에 추가 (외부 플러그인에서 호출)
+
+        priority: 클수록 먼저 디스패치 (기본 0). 같은 우선순위에서는 호출자별 가중 공정 큐잉.
+        """
         try:
-            # 옵션 평탄화 (Nesting 방지)
-            if 'options' in options and isinstance(options['options'], dict):
-                inner_options = options.pop('options')
-                options.update(inner_options)
-            
-            # 소스 타입 자동 감지
-            if not source_type or source_type == 'auto':
-                source_type = cls._detect_source_type(url, caller_plugin, meta)
-            
-            # DownloadTask 생성
-            task = DownloadTask(
+            task = cls._build_task(
                 url=url,
                 save_path=save_path,
                 filename=filename,
@@ -430,37 +680,36 @@ class ModuleQueue(PluginModuleBase):
                 title=title,
                 thumbnail=thumbnail,
                 meta=meta,
+                priority=priority,
                 **options
             )
             
             with cls._queue_lock:
-                cls._downloads[task.id] = task
+                existing = cls._claim_inflight(task)
+                if existing is None:
+                    cls._downloads[task.id] = task
+            if existing is not None:
+                # 같은 다운로드가 이미 진행 중이면 새로 받지 않고 구독자로 합류
+                from .setup import P
+                P.logger.info(f'[GDM] duplicate request joined in-flight task {existing.id}: {url}')
+                return existing
+            
+            # 이미 받은 파일이 있으면 하드링크/reflink 로 즉시 완료 (복사가 필요하면 워커에서 처리)
+            if task._complete_from_cache(allow_copy=False):
+                cls._db_writer.insert(task, **cls._row_values(task))
+                task._update_db_status()
+                cls._release_inflight(task)
+                task._emit_status()
+                threading.Thread(target=task._notify_complete, name='gdm-cache-notify', daemon=True).start()
+                return task
             
+            # DB 저장 예약 (writer 스레드가 배치 INSERT 후 task.db_id 설정)
+            # 시작 전에 넣어야 워커의 빠른 상태 갱신이 INSERT 와 같은 행으로 병합됨
+            cls._db_writer.insert(task, **cls._row_values(task))
             
             # 비동기 시작
             task.start()
             
-            # DB 저장
-            import json
-            from .model import ModelDownloadItem
-            db_item = ModelDownloadItem()
-            db_item.created_time = datetime.now()
-            db_item.url = url
-            db_item.save_path = save_path
-            db_item.filename = filename
-            db_item.source_type = source_type
-            db_item.status = DownloadStatus.PENDING
-            db_item.caller_plugin = caller_plugin
-            db_item.callback_id = callback_id
-            db_item.title = title or task.title
-            db_item.thumbnail = thumbnail or task.thumbnail
-            if meta:
-                db_item.meta = json.dumps(meta, ensure_ascii=False)
-            db_item.save()
-            
-            task.db_id = db_item.id
-
-            
             return task
             
         except Exception as e:
@@ -468,16 +717,320 @@ class ModuleQueue(PluginModuleBase):
             P.logger.error(f'add_download error: {e}')
             P.logger.error(traceback.format_exc())
             return None
+
+    @classmethod
+    def add_downloads(cls, specs: List[Dict[str, Any]]) -> List[str]:
+        """
+        여러 다운로드를 한 번에 큐에 추가 (외부 플러그인에서 호출)
+        
+        specs: add_download 인자와 같은 키를 가진 dict 목록 (url, save_path 필수)
+        전체를 먼저 검증해 하나라도 잘못되면 ValueError (아무것도 추가되지 않음),
+        DB 행은 한 트랜잭션으로 INSERT 하고 스케줄러에는 한 번에 넘김.
+        반환: 입력 순서대로의 태스크 id 목록
+        """
+        errors = []
+        for index, spec in enumerate(specs):
+            if not isinstance(spec, dict):
+                errors.append(f'#{index}: spec must be a dict')
+            elif not spec.get('url'):
+                errors.append(f'#{index}: url is required')
+            elif not spec.get('save_path'):
+                errors.append(f'#{index}: save_path is required')
+        if errors:
+            raise ValueError('invalid download specs: ' + ', '.join(errors))
+        if not specs:
+            return []
+        
+        built = [cls._build_task(**dict(spec)) for spec in specs]
+        
+        # 진행 중(또는 같은 배치 안의 앞선) 동일 다운로드는 구독자로 합류
+        resolved: List['DownloadTask'] = []
+        tasks: List['DownloadTask'] = []
+        with cls._queue_lock:
+            for task in built:
+                existing = cls._claim_inflight(task, subscribe=False)
+                resolved.append(existing or task)
+                if existing is None:
+                    tasks.append(task)
+        
+        from .model import ModelDownloadItem
+        try:
+            with F.app.app_context():
+                rows = []
+                for task in tasks:
+                    row = ModelDownloadItem()
+                    for key, value in cls._row_values(task).items():
+                        setattr(row, key, value)
+                    rows.append(row)
+                try:
+                    F.db.session.add_all(rows)
+                    F.db.session.commit()
+                except Exception:
+                    F.db.session.rollback()
+                    raise
+                for task, row in zip(tasks, rows):
+                    task.db_id = row.id
+        except Exception:
+            for task in tasks:
+                cls._release_inflight(task)
+            raise
+        
+        for task, target in zip(built, resolved):
+            if target is not task:
+                target.add_subscriber(task.caller_plugin, task.callback_id,
+                                      task._on_progress, task._on_complete, task._on_error)
+        with cls._queue_lock:
+            for task in tasks:
+                cls._downloads[task.id] = task
+        for task in tasks:
+            task.status = DownloadStatus.WAITING
+            task._emit_status()
+        cls._ensure_concurrency_limit().submit_many(tasks)
+        
+        return [task.id for task in resolved]
+
+    @staticmethod
+    def _normalize_url(url: str) -> str:
+        """소문자 scheme/host, 기본 포트·fragment 제거, 쿼리 정렬"""
+        from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+        try:
+            parts = urlsplit(url.strip())
+            netloc = parts.netloc.lower()
+            if (parts.scheme.lower(), netloc.rsplit(':', 1)[-1]) in (('http', '80'), ('https', '443')):
+                netloc = netloc.rsplit(':', 1)[0]
+            query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+            return urlunsplit((parts.scheme.lower(), netloc, parts.path or '/', query, ''))
+        except Exception:
+            return url
+
+    @classmethod
+    def _dedup_key(cls, task: 'DownloadTask') -> str:
+        """중복 판정 키: 정규화 URL + 포맷 + 대상 경로"""
+        fmt = str(task.options.get('format') or '')
+        target = os.path.normpath(os.path.join(
+            task.save_path or '', task.options.get('outtmpl') or task.filename or ''
+        ))
+        return f'{cls._normalize_url(task.url)}|{fmt}|{target}'
+
+    @classmethod
+    def _cache_key(cls, task: 'DownloadTask') -> str:
+        """완료 캐시 키: 정규화 URL + 포맷 (저장 위치 무관)"""
+        return CompletedCache.cache_key(cls._normalize_url(task.url), task.options.get('format'))
+
+    @classmethod
+    def _completed_cache_enabled(cls) -> bool:
+        try:
+            from .setup import P
+            return P.ModelSetting.get_bool('completed_cache')
+        except Exception:
+            return False
+
+    @classmethod
+    def _record_completed(cls, task: 'DownloadTask') -> None:
+        """완료 파일 색인 기록 (해시 계산이 길 수 있으므로 별도 스레드)"""
+        if not cls._completed_cache_enabled() or not task.filepath:
+            return
+        if task.skipped_segments:
+            # 세그먼트가 빠진 파일은 같은 URL 의 다음 요청에 재사용하지 않음
+            return
+        from .setup import P
+        with_hash = P.ModelSetting.get_bool('completed_cache_hash')
+        key = cls._cache_key(task)
+        fmt = task.options.get('format')
+
+        def run():
+            try:
+                CompletedCache.record(key, task.url, fmt, task.filepath, with_hash=with_hash)
+            except Exception as e:
+                P.logger.error(f'[GDM] completed cache record failed: {e}')
+        threading.Thread(target=run, name='gdm-cache-record', daemon=True).start()
+
+    @classmethod
+    def _choose_connections(cls, task: 'DownloadTask', default: int) -> int:
+        """호스트별 학습 표에서 aria2c 연결 수 선택 (적응 제어 꺼짐/기록 없음이면 기본값)"""
+        return cls._tuner.choose(task.host, default)
+
+    @classmethod
+    def _record_throughput(cls, task: 'DownloadTask') -> None:
+        """완료 태스크의 실측 처리량을 학습 표에 반영하고 DB 저장 (속도 제한 중 받은 경우 제외)"""
+        stats_fn = getattr(task._downloader, 'transfer_stats', None)
+        stats = stats_fn() if stats_fn else None
+        if not stats or stats['limited'] or not cls._tuner.enabled:
+            return
+        recorded = cls._tuner.record(task.host, stats['connections'], stats['bytes'], stats['seconds'])
+        if recorded is None:
+            return
+        host, connections = task.host, stats['connections']
+
+        def run():
+            from .setup import P
+            try:
+                from .model import ModelHostThroughput
+                with F.app.app_context():
+                    row = F.db.session.query(ModelHostThroughput) \
+                        .filter_by(host=host, connections=connections).first()
+                    if row is None:
+                        row = ModelHostThroughput(host=host, connections=connections)
+                        F.db.session.add(row)
+                    row.bps, row.samples, row.updated = recorded[0], recorded[1], time.time()
+                    F.db.session.commit()
+            except Exception as e:
+                P.logger.error(f'[GDM] throughput record failed: {e}')
+        threading.Thread(target=run, name='gdm-throughput-record', daemon=True).start()
+
+    @classmethod
+    def _load_throughput_table(cls) -> None:
+        from .setup import P
+        try:
+            from .model import ModelHostThroughput
+            with F.app.app_context():
+                rows = F.db.session.query(ModelHostThroughput).all()
+                cls._tuner.load((r.host, r.connections, r.bps or 0, r.samples or 0, r.updated) for r in rows)
+        except Exception as e:
+            P.logger.error(f'[GDM] throughput table load failed: {e}')
+
+    @classmethod
+    def reset_throughput_table(cls, host: Optional[str] = None) -> None:
+        """연결 수 학습 표 초기화"""
+        cls._tuner.reset(host)
+        from .model import ModelHostThroughput
+        with F.app.app_context():
+            query = F.db.session.query(ModelHostThroughput)
+            if host:
+                query = query.filter_by(host=host)
+            query.delete()
+            F.db.session.commit()
+
+    @classmethod
+    def _apply_tuner_settings(cls):
+        try:
+            from .setup import P
+            cls._tuner.configure(
+                enabled=P.ModelSetting.get_bool('adaptive_connections'),
+                explore=float(P.ModelSetting.get('connection_explore_pct') or 0) / 100,
+            )
+        except Exception:
+            pass
+
+    @classmethod
+    def verify_completed_cache(cls) -> Dict[str, int]:
+        """완료 캐시 검증 (없어진/바뀐 파일 색인 제거)"""
+        return CompletedCache.verify()
+
+    @classmethod
+    def _claim_inflight(cls, task: 'DownloadTask', subscribe: bool = True) -> Optional['DownloadTask']:
+        """
+        _queue_lock 보유 상태에서 호출
+        같은 키의 진행 중 태스크가 있으면 그 태스크를 반환 (subscribe=True 면 구독자로 등록),
+        없으면 task 를 진행 중으로 등록하고 None
+        """
+        key = cls._dedup_key(task)
+        existing = cls._inflight.get(key)
+        if existing is not None and existing is not task:
+            if subscribe:
+                existing.add_subscriber(task.caller_plugin, task.callback_id,
+                                        task._on_progress, task._on_complete, task._on_error)
+            return existing
+        task.dedup_key = key
+        cls._inflight[key] = task
+        return None
+
+    @classmethod
+    def _release_inflight(cls, task: 'DownloadTask') -> None:
+        """종료/취소된 태스크를 중복 판정 대상에서 제외"""
+        with cls._queue_lock:
+            if task.dedup_key and cls._inflight.get(task.dedup_key) is task:
+                del cls._inflight[task.dedup_key]
+
+    @classmethod
+    def _build_task(
+        cls,
+        url: str,
+        save_path: str,
+        source_type: Optional[str] = None,
+        caller_plugin: Optional[str] = None,
+        meta: Optional[Dict[str, Any]] = None,
+        **kwargs
+    ) -> 'DownloadTask':
+        """옵션 평탄화 + 소스 타입 감지 후 DownloadTask 생성"""
+        # 옵션 평탄화 (Nesting 방지)
+        if 'options' in kwargs and isinstance(kwargs['options'], dict):
+            inner_options = kwargs.pop('options')
+            kwargs.update(inner_options)
+        
+        # 소스 타입 자동 감지
+        if not source_type or source_type == 'auto':
+            source_type = cls._detect_source_type(url, caller_plugin, meta)
+        
+        return DownloadTask(
+            url=url,
+            save_path=save_path,
+            source_type=source_type,
+            caller_plugin=caller_plugin,
+            meta=meta,
+            **kwargs
+        )
+
+    @classmethod
+    def _row_values(cls, task: 'DownloadTask') -> Dict[str, Any]:
+        """신규 ModelDownloadItem 컬럼 값"""
+        import json
+        return {
+            'created_time': datetime.now(),
+            'url': task.url,
+            'save_path': task.save_path,
+            'filename': task.filename,
+            'source_type': task.source_type,
+            'status': DownloadStatus.PENDING,
+            'caller_plugin': task.caller_plugin,
+            'callback_id': task.callback_id,
+            'title': task.title,
+            'thumbnail': task.thumbnail,
+            'meta': json.dumps(task.meta, ensure_ascii=False) if task.meta else None,
+            'options': json.dumps(cls._persistable_options(task.options), ensure_ascii=False),
+            'priority': task.priority,
+        }
     
+    @staticmethod
+    def _persistable_options(options: Dict[str, Any]) -> Dict[str, Any]:
+        """재시작 복원용으로 저장 가능한(JSON 직렬화 가능한) 옵션만 추림"""
+        import json
+        ret = {}
+        for key, value in (options or {}).items():
+            try:
+                json.dumps(value)
+            except (TypeError, ValueError):
+                continue
+            ret[key] = value
+        return ret
+
     @classmethod
     def get_download(cls, download_id: str) -> Optional['DownloadTask']:
-        """다운로드 태스크 조회"""
-        return cls._downloads.get(download_id)
+        """다운로드 태스크 조회 (태스크 id 또는 목록의 'db_<n>' id)"""
+        task = cls._downloads.resolve(download_id)
+        if task is not None:
+            cls._downloads.touch(task.id)
+        return task
     
     @classmethod
     def get_all_downloads(cls) -> List['DownloadTask']:
         """모든 다운로드 태스크 조회"""
-        return list(cls._downloads.values())
+        return cls._downloads.values()
+
+    @classmethod
+    def get_download_by_db_id(cls, db_id: int) -> Optional['DownloadTask']:
+        """DB 내역 id 로 메모리 태스크 조회 (목록의 'db_<n>' 항목)"""
+        return cls._downloads.by_db_id(db_id)
+
+    @classmethod
+    def find_downloads(cls, caller_plugin: Optional[str] = None, callback_id: Optional[str] = None) -> List['DownloadTask']:
+        """호출 플러그인 / 콜백 id 로 태스크 조회 (색인 사용)"""
+        return cls._downloads.find(caller_plugin=caller_plugin, callback_id=callback_id)
+
+    @classmethod
+    def count_downloads(cls, *statuses: DownloadStatus) -> int:
+        """상태별 태스크 수 (인자가 없으면 전체)"""
+        return cls._downloads.count(*statuses)
     
     @classmethod
     def _detect_source_type(cls, url: str, caller_plugin: Optional[str] = None, meta: Optional[Dict] = None) -> str:
@@ -513,10 +1066,149 @@ class ModuleQueue(PluginModuleBase):
         else:
             return 'http'
     
+    @classmethod
+    def _apply_bandwidth_limit(cls):
+        """max_download_rate 총량을 대역폭 관리자에 반영 (실행 중 태스크 몫 즉시 재계산)"""
+        try:
+            from .setup import P
+            total_bps = DownloadTask._rate_to_bps(P.ModelSetting.get('max_download_rate'))
+        except Exception:
+            total_bps = 0.0
+        cls._bandwidth.set_total(total_bps)
+
+    @classmethod
+    def _apply_retry_settings(cls):
+        """서킷 브레이커 임계치/차단 시간 반영"""
+        try:
+            from .setup import P
+            cls._breakers.configure(
+                threshold=int(P.ModelSetting.get('breaker_threshold') or 0),
+                cooldown_sec=float(P.ModelSetting.get('breaker_cooldown_sec') or 120),
+            )
+        except Exception:
+            pass
+
+    @classmethod
+    def _retry_policy(cls) -> Tuple[bool, int, float, float]:
+        """(auto_retry, max_retry, base_sec, max_sec)"""
+        try:
+            from .setup import P
+            return (
+                P.ModelSetting.get_bool('auto_retry'),
+                int(P.ModelSetting.get('max_retry') or 0),
+                float(P.ModelSetting.get('retry_base_sec') or 5),
+                float(P.ModelSetting.get('retry_max_sec') or 300),
+            )
+        except Exception:
+            return False, 0, 5.0, 300.0
+
+    @classmethod
+    def _apply_registry_settings(cls):
+        """끝난 태스크 유지 시간/개수 반영 (초과분은 즉시 정리)"""
+        try:
+            from .setup import P
+            cls._downloads.configure(
+                grace_sec=float(P.ModelSetting.get('finished_grace_sec') or 300),
+                max_finished=int(P.ModelSetting.get('finished_max_tasks') or 200),
+            )
+        except Exception:
+            pass
+
+    @classmethod
+    def _on_tasks_evicted(cls, tasks: List['DownloadTask']) -> None:
+        """레지스트리에서 내보낸 태스크 정리 (목록은 DB 내역으로 다시 받도록 커서 무효화)"""
+        for task in tasks:
+            cls._broadcaster.forget(task.id)
+            task._release_resources()
+        cls._invalidate_list_cursors()
+
+    @classmethod
+    def _apply_ytdlp_pool(cls):
+        """yt-dlp 상주 워커 수 반영 (늘어난 만큼 미리 띄움)"""
+        from .setup import P
+        try:
+            from .downloader.ytdlp_pool import YtdlpWorkerPool
+            pool = YtdlpWorkerPool.shared()
+            pool.resize(int(P.ModelSetting.get('ytdlp_workers') or 0))
+            pool.warm()
+        except Exception as e:
+            P.logger.error(f'[GDM] yt-dlp worker pool setup failed: {e}')
+
+    @classmethod
+    def _apply_aria2_daemon(cls):
+        """aria2c RPC 데몬 설정 반영 (전역 속도 상한, 다운로드당 연결 수, 동시 GID 수)"""
+        from .setup import P
+        try:
+            from .downloader.aria2_rpc import Aria2Daemon
+            max_concurrent = int(P.ModelSetting.get('max_concurrent') or 3)
+            Aria2Daemon.shared().configure(
+                enabled=P.ModelSetting.get_bool('aria2_rpc'),
+                aria2c_path=P.ModelSetting.get('aria2c_path') or 'aria2c',
+                max_connections=int(P.ModelSetting.get('aria2c_connections') or 16),
+                # 조각(fragment) 목록은 조각마다 GID 하나라 태스크당 16개까지 허용
+                max_downloads=max(1, max_concurrent) * 16,
+                max_overall_bps=DownloadTask._rate_to_bps(P.ModelSetting.get('max_download_rate')),
+            )
+        except Exception as e:
+            P.logger.error(f'[GDM] aria2c daemon setup failed: {e}')
+
+    @classmethod
+    def _apply_info_cache_settings(cls):
+        try:
+            from .setup import P
+            InfoCache.shared().configure(
+                ttl_sec=float(P.ModelSetting.get('info_cache_ttl_sec') or 0),
+                max_entries=int(P.ModelSetting.get('info_cache_size') or 64),
+            )
+        except Exception:
+            pass
+
+    @classmethod
+    def _apply_status_flush_interval(cls):
+        try:
+            from .setup import P
+            cls._broadcaster.set_interval(int(P.ModelSetting.get('status_flush_ms') or 500))
+        except Exception:
+            pass
+
+    def setting_save_after(self, change_list: List[str]) -> None:
+        """설정 저장 후 스케줄러/대역폭 관리자/상태 전송기에 즉시 반영"""
+        if 'status_flush_ms' in change_list:
+            self._apply_status_flush_interval()
+        if 'max_download_rate' in change_list:
+            self._apply_bandwidth_limit()
+        if 'max_concurrent' in change_list:
+            self._apply_concurrency_limit()
+        scheduler_keys = ('queue_weights', 'priority_aging_sec', 'source_limits', 'host_limits', 'max_per_host')
+        if any(key in change_list for key in scheduler_keys):
+            self._configure_scheduler()
+        if 'breaker_threshold' in change_list or 'breaker_cooldown_sec' in change_list:
+            self._apply_retry_settings()
+        if 'finished_grace_sec' in change_list or 'finished_max_tasks' in change_list:
+            self._apply_registry_settings()
+        if 'ytdlp_workers' in change_list:
+            self._apply_ytdlp_pool()
+        aria2_keys = ('aria2_rpc', 'aria2c_path', 'aria2c_connections', 'max_concurrent', 'max_download_rate')
+        if any(key in change_list for key in aria2_keys):
+            self._apply_aria2_daemon()
+        if 'adaptive_connections' in change_list or 'connection_explore_pct' in change_list:
+            self._apply_tuner_settings()
+        if 'info_cache_ttl_sec' in change_list or 'info_cache_size' in change_list:
+            self._apply_info_cache_settings()
+
     def plugin_load(self) -> None:
         """플러그인 로드 시 초기화"""
         self.P.logger.info('gommi_downloader 플러그인 로드')
-        self._ensure_concurrency_limit()
+        self._apply_concurrency_limit()
+        self._apply_bandwidth_limit()
+        self._apply_status_flush_interval()
+        self._apply_retry_settings()
+        self._apply_registry_settings()
+        self._apply_ytdlp_pool()
+        self._apply_info_cache_settings()
+        self._apply_aria2_daemon()
+        self._apply_tuner_settings()
+        self._load_throughput_table()
         try:
             # DB에서 진행 중인 작업 로드
             with F.app.app_context():
@@ -534,8 +1226,11 @@ class ModuleQueue(PluginModuleBase):
                     ])
                 ).all()
                 
+                ModuleQueue._shutting_down = False
                 for item in items:
-                    # DownloadTask 복원
+                    options = item.get_options()
+                    subscribers = options.pop('subscribers', None) or []
+                    # DownloadTask 복원 (원래 호출 옵션 + 이어받기 상태 포함)
                     task = DownloadTask(
                         url=item.url,
                         save_path=item.save_path,
@@ -545,11 +1240,19 @@ class ModuleQueue(PluginModuleBase):
                         callback_id=item.callback_id,
                         title=item.title,
                         thumbnail=item.thumbnail,
-                        meta=item.as_dict().get('meta')
+                        meta=item.as_dict().get('meta'),
+                        priority=item.priority or 0,
+                        **options
                     )
                     task.status = DownloadStatus(item.status)
                     task.db_id = item.id
                     task.title = item.title or ''
+                    task.progress = item.progress or 0
+                    task.retry_count = item.retry_count or 0
+                    task.resume_state = item.get_resume_state()
+                    task._subscribers = [dict(sub) for sub in subscribers if isinstance(sub, dict)]
+                    with ModuleQueue._queue_lock:
+                        ModuleQueue._claim_inflight(task)
                     
                     # 상태가 downloading/extracting이었다면 pending으로 되돌려서 재시작하거나,
                     # 바로 시작
@@ -561,15 +1264,35 @@ class ModuleQueue(PluginModuleBase):
                     
                 self.P.logger.info(f'{len(items)}개의 중단된 다운로드 작업 복원됨')
             
+            # 완료 캐시 검증 (백그라운드)
+            if self._completed_cache_enabled():
+                threading.Thread(target=self.verify_completed_cache, name='gdm-cache-verify', daemon=True).start()
+            
         except Exception as e:
             self.P.logger.error(f'plugin_load error: {e}')
             self.P.logger.error(traceback.format_exc())
     
     def plugin_unload(self) -> None:
         """플러그인 언로드 시 정리"""
-        # 모든 다운로드 중지
-        for task in self._downloads.values():
+        # 모든 다운로드 중지 (DB 상태는 그대로 두어 다음 로드 때 이어받기)
+        ModuleQueue._shutting_down = True
+        for task in list(self._downloads.values()):
             task.cancel()
+        if ModuleQueue._scheduler is not None:
+            ModuleQueue._scheduler.shutdown()
+            ModuleQueue._scheduler = None
+        try:
+            from .downloader.ytdlp_pool import YtdlpWorkerPool
+            YtdlpWorkerPool.shared().shutdown()
+        except Exception:
+            pass
+        try:
+            from .downloader.aria2_rpc import Aria2Daemon
+            Aria2Daemon.shared().shutdown()
+        except Exception:
+            pass
+        # 대기 중인 DB 변경 모두 커밋
+        ModuleQueue._db_writer.stop()
 
     def get_update_info(self, force=False):
         """GitHub에서 최신 버전 정보 가져오기 (캐싱 활용)"""
@@ -665,6 +1388,17 @@ class ModuleQueue(PluginModuleBase):
 class DownloadTask:
     """개별 다운로드 태스크"""
     
+    # 태스크가 수만 개 쌓여도 인스턴스 dict 없이 고정 크기로 유지
+    __slots__ = (
+        'id', 'url', 'save_path', 'filename', 'source_type', 'caller_plugin', 'callback_id',
+        'title', 'thumbnail', 'meta', 'priority', 'options',
+        '_on_progress', '_on_complete', '_on_error', '_subscribers', 'dedup_key',
+        '_status', 'progress', 'speed', 'eta', 'error_message', 'filepath', 'duration', 'filesize',
+        'downloaded_bytes', 'total_bytes', 'speed_bps', 'eta_sec', 'segments_done', 'segments_total',
+        '_downloader', '_cancelled', '_db_id', '_version', 'resume_state',
+        'retry_count', 'retry_at', 'error_kind', 'start_time', 'end_time', 'created_time',
+    )
+    
     _counter = 0
     _counter_lock = threading.Lock()
     
@@ -682,6 +1416,7 @@ class DownloadTask:
         title: Optional[str] = None,
         thumbnail: Optional[str] = None,
         meta: Optional[Dict[str, Any]] = None,
+        priority: int = 0,
         **options
     ):
         with self._counter_lock:
@@ -697,15 +1432,18 @@ class DownloadTask:
         self.title = title or ''
         self.thumbnail = thumbnail or ''
         self.meta = meta or {}
+        self.priority = int(priority or 0)
         self.options = options
         
         # 콜백
         self._on_progress = on_progress
         self._on_complete = on_complete
         self._on_error = on_error
+        self._subscribers: List[Dict[str, Any]] = []  # 같은 다운로드를 중복 요청한 호출자들
+        self.dedup_key: Optional[str] = None
         
         # 상태
-        self.status = DownloadStatus.PENDING
+        self._status = DownloadStatus.PENDING
         self.progress = 0
         self.speed = ''
         self.eta = ''
@@ -715,20 +1453,56 @@ class DownloadTask:
         # 메타데이터 (이미 __init__ 상단에서 인자로 받은 title, thumbnail을 self.title, self.thumbnail에 할당함)
         self.duration = 0
         self.filesize = 0
+        # 다운로더가 보고하는 진행 상세 (HLS: 세그먼트 수 / 받은 바이트, 전체 바이트는 추정치일 수 있음)
+        self.downloaded_bytes = 0
+        self.total_bytes = 0
+        self.speed_bps = 0  # 평활 처리량 (speed 문자열의 숫자판)
+        self.eta_sec = 0
+        self.segments_done = 0
+        self.segments_total = 0
         
         # 내부
-        self._thread: Optional[threading.Thread] = None
         self._downloader = None
         self._cancelled = False
-        self.db_id: Optional[int] = None
+        self._db_id: Optional[int] = None
+        self._version = 0  # 마지막 변경 시점의 ModuleQueue._change_seq
+        self.resume_state: Dict[str, Any] = {}  # 다운로더가 보고한 이어받기 상태 (DB 저장)
+        self.retry_count = 0
+        self.retry_at: Optional[float] = None  # 재시도 예정 시각 (epoch), 대기 중일 때만
+        self.error_kind = ''
         self.start_time: Optional[str] = None
         self.end_time: Optional[str] = None
         self.created_time: str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     
+    @property
+    def status(self) -> DownloadStatus:
+        return self._status
+
+    @status.setter
+    def status(self, value: DownloadStatus) -> None:
+        old = self._status
+        self._status = value
+        if old != value:
+            # 상태 색인 / 끝난 태스크 추적 등 레지스트리 갱신은 이 한 곳에서만
+            ModuleQueue._downloads.status_changed(self, old)
+
+    @property
+    def db_id(self) -> Optional[int]:
+        return self._db_id
+
+    @db_id.setter
+    def db_id(self, value: Optional[int]) -> None:
+        old = self._db_id
+        self._db_id = value
+        if old != value:
+            ModuleQueue._downloads.db_id_changed(self, old)
+
     def start(self):
-        """다운로드 시작 (비동기)"""
-        self._thread = threading.Thread(target=self._run, daemon=True)
-        self._thread.start()
+        """다운로드 시작 (스케줄러 준비 큐에 등록, 슬롯이 나면 워커가 실행)"""
+        self.status = DownloadStatus.WAITING
+        # 준비 큐에 넣은 뒤 상태 전송 (대기 순번 조회가 큐에 없는 태스크로 재계산을 일으키지 않도록)
+        ModuleQueue._ensure_concurrency_limit().submit(self)
+        self._emit_status()
 
     @staticmethod
     def _rate_to_bps(rate_value: Any) -> float:
@@ -746,18 +1520,25 @@ class DownloadTask:
         mul = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}[unit]
         return num * mul
 
-    @staticmethod
-    def _bps_to_rate(bps: float) -> str:
-        """bytes/sec를 yt-dlp/aria2 형식 문자열로 변환"""
-        if bps <= 0:
-            return '0'
-        if bps >= 1024 ** 2:
-            return f'{max(0.1, bps / (1024 ** 2)):.2f}M'
-        return f'{max(1.0, bps / 1024):.2f}K'
-    
     def _run(self):
-        """다운로드 실행"""
-        slot_acquired = False
+        """다운로드 실행 (스케줄러 워커 스레드에서 호출, 슬롯 확보 상태)"""
+        if self._cancelled:
+            return
+        self.retry_at = None
+        # 캐시 적중은 호스트에 요청하지 않으므로 서킷 확인 전에 처리 (half-open 시험 슬롯을 잡지 않도록)
+        if self._complete_from_cache(allow_copy=True):
+            self._update_db_status()
+            ModuleQueue._release_inflight(self)
+            self._notify_complete()
+            self._emit_status()
+            return
+        # 호스트 서킷이 열려 있으면 슬롯을 돌려주고 차단이 풀릴 때까지 지연 큐에서 대기
+        allowed, wait = ModuleQueue._breakers.allow(self.host)
+        if not allowed:
+            from .setup import P
+            P.logger.info(f'[GDM] circuit open for {self.host}, deferring {self.id} for {wait:.0f}s')
+            self._defer(wait)
+            return
         try:
             self.status = DownloadStatus.EXTRACTING
             if not self.start_time:
@@ -770,21 +1551,6 @@ class DownloadTask:
             
             if not self._downloader:
                 raise Exception(f"지원하지 않는 소스 타입: {self.source_type}")
-
-            # 동시 다운로드 제한 슬롯 획득
-            ModuleQueue._ensure_concurrency_limit()
-            sem = ModuleQueue._concurrency_sem
-            if sem is not None:
-                self.status = DownloadStatus.WAITING
-                self._emit_status()
-                while not self._cancelled:
-                    if sem.acquire(timeout=0.5):
-                        slot_acquired = True
-                        break
-                if not slot_acquired:
-                    self.status = DownloadStatus.CANCELLED
-                    self._emit_status()
-                    return
             
             self.status = DownloadStatus.DOWNLOADING
             self._emit_status()
@@ -796,33 +1562,28 @@ class DownloadTask:
                 runtime_options['aria2c_path'] = P.ModelSetting.get('aria2c_path')
             if not runtime_options.get('connections'):
                 try:
-                    runtime_options['connections'] = int(P.ModelSetting.get('aria2c_connections') or 16)
+                    default_connections = int(P.ModelSetting.get('aria2c_connections') or 16)
                 except Exception:
-                    runtime_options['connections'] = 16
+                    default_connections = 16
+                runtime_options['connections'] = ModuleQueue._choose_connections(self, default_connections)
             if not runtime_options.get('ffmpeg_path'):
                 runtime_options['ffmpeg_path'] = P.ModelSetting.get('ffmpeg_path')
             if not runtime_options.get('max_download_rate'):
                 runtime_options['max_download_rate'] = P.ModelSetting.get('max_download_rate')
+            if not runtime_options.get('hls_window'):
+                runtime_options['hls_window'] = P.ModelSetting.get('hls_window')
+            if not runtime_options.get('hls_max_skip_segments'):
+                runtime_options['hls_max_skip_segments'] = P.ModelSetting.get('hls_max_skip_segments')
+            if 'hls_hedge' not in runtime_options:
+                runtime_options['hls_hedge'] = P.ModelSetting.get_bool('hls_hedge')
+            if 'hls_remux' not in runtime_options:
+                runtime_options['hls_remux'] = P.ModelSetting.get_bool('hls_remux')
+            # 이전 실행의 부분 파일에서 이어받기
+            runtime_options['resume_state'] = dict(self.resume_state)
+            runtime_options['state_callback'] = self._state_callback
 
-            # 전체 속도 제한을 활성 다운로드 수에 따라 분배 (합산 속도 상한)
-            raw_global_rate = runtime_options.get('max_download_rate')
-            global_bps = self._rate_to_bps(raw_global_rate)
-            if global_bps > 0:
-                with ModuleQueue._queue_lock:
-                    active_count = sum(
-                        1
-                        for t in ModuleQueue._downloads.values()
-                        if t.status == DownloadStatus.DOWNLOADING and not t._cancelled
-                    )
-                active_count = max(1, active_count)
-                effective_bps = global_bps / active_count
-                runtime_options['effective_max_download_rate'] = self._bps_to_rate(effective_bps)
-                runtime_options['is_global_rate_split'] = active_count > 1
-                if active_count > 1:
-                    P.logger.info(
-                        f'[GDM] Global speed split: total={raw_global_rate}/s, '
-                        f'active={active_count}, per-task={runtime_options["effective_max_download_rate"]}/s'
-                    )
+            # 전역 대역폭 관리자에 등록 → 실행 중 전체 태스크의 몫 재계산 후 즉시 반영
+            ModuleQueue._bandwidth.register(self.id, self._downloader)
             
             # 다운로드 실행
             result = self._downloader.download(
@@ -836,6 +1597,7 @@ class DownloadTask:
             
             if self._cancelled:
                 self.status = DownloadStatus.CANCELLED
+                ModuleQueue._breakers.release_trial(self.host)
             elif result.get('success'):
                 self.status = DownloadStatus.COMPLETED
                 self.filepath = result.get('filepath', '')
@@ -843,71 +1605,233 @@ class DownloadTask:
                 self.end_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
                 if self.filepath and os.path.exists(self.filepath):
                     self.filesize = os.path.getsize(self.filepath)
+                skipped = result.get('skipped_segments') or []
+                if skipped:
+                    # 복구 못 한 HLS 세그먼트를 건너뛴 (중간이 빈) 파일: meta 에 남겨 상태/화면에 표시
+                    import json
+                    self.meta = dict(self.meta or {}, hls_skipped_segments=skipped)
+                    ModuleQueue._db_writer.update(self, meta=json.dumps(self.meta, ensure_ascii=False))
                 
-                # DB 업데이트
-                self._update_db_status()
+                ModuleQueue._breakers.record_success(self.host)
+                ModuleQueue._record_throughput(self)
                 
-                # 실시간 콜백 처리
-                if self._on_complete:
-                    try: self._on_complete(self.filepath)
-                    except: pass
+                # DB 업데이트 + 완료 캐시 색인
+                self._update_db_status()
+                ModuleQueue._record_completed(self)
                 
-                # 플러그인 간 영구적 콜백 처리
-                if self.caller_plugin and self.callback_id:
-                    self._invoke_plugin_callback()
+                # 더 이상 중복 요청을 받지 않도록 먼저 해제 후 모든 구독자에게 통지
+                ModuleQueue._release_inflight(self)
+                self._notify_complete()
             else:
-                self.status = DownloadStatus.ERROR
                 self.error_message = result.get('error', 'Unknown error')
+                if self._schedule_retry():
+                    return
+                self.status = DownloadStatus.ERROR
                 self._update_db_status()
-                if self._on_error:
-                    self._on_error(self.error_message)
+                ModuleQueue._release_inflight(self)
+                self._notify_error()
                     
         except Exception as e:
             from .setup import P
             P.logger.error(f'Download error: {e}')
             P.logger.error(traceback.format_exc())
-            self.status = DownloadStatus.ERROR
             self.error_message = str(e)
-            if self._on_error:
-                self._on_error(self.error_message)
+            if self._schedule_retry():
+                return
+            self.status = DownloadStatus.ERROR
+            ModuleQueue._release_inflight(self)
+            self._notify_error()
             
             # 0바이트 파일 정리 (실패 시)
             self._cleanup_if_empty()
         
         finally:
-            if slot_acquired and ModuleQueue._concurrency_sem is not None:
-                try:
-                    ModuleQueue._concurrency_sem.release()
-                except Exception:
-                    pass
+            # 종료/취소/에러 시 남은 태스크에게 대역폭 재분배
+            ModuleQueue._bandwidth.unregister(self.id)
+            if self.status != DownloadStatus.WAITING:
+                ModuleQueue._release_inflight(self)
             self._emit_status()
+            if self.status in (DownloadStatus.COMPLETED, DownloadStatus.ERROR, DownloadStatus.CANCELLED):
+                self._release_resources()
     
-    def _progress_callback(self, progress: int, speed: str = '', eta: str = ''):
-        """진행률 콜백"""
+    @property
+    def host(self) -> str:
+        try:
+            return (urlparse(self.url).hostname or '').lower()
+        except ValueError:
+            return ''
+
+    def _schedule_retry(self) -> bool:
+        """
+        실패 분류 후 재시도 예약 (True면 재시도 대기, False면 최종 실패)
+        네트워크/일시적 HTTP 오류만 지터 지수 백오프로 재시도, 403/410/파싱/콘텐츠 없음/로컬 오류는 즉시 실패
+        분류 못 한 오류는 한 번까지만 재시도
+        """
+        from .setup import P
+        kind, retryable, host_failure = classify_error(self.error_message)
+        self.error_kind = kind
+        if host_failure:
+            ModuleQueue._breakers.record_failure(self.host)
+        else:
+            ModuleQueue._breakers.release_trial(self.host)
+        enabled, max_retry, base, cap = ModuleQueue._retry_policy()
+        if kind == ERROR_UNKNOWN:
+            max_retry = min(max_retry, UNKNOWN_MAX_RETRY)
+        if self._cancelled or not enabled or not retryable or self.retry_count >= max_retry:
+            return False
+        self.retry_count += 1
+        delay = backoff_delay(self.retry_count, base, cap)
+        # 호스트 차단 중이면 차단이 풀린 뒤로 (조회만, half-open 시험 슬롯은 실제 실행 시 _run 에서 잡음)
+        if host_failure:
+            delay = max(delay, ModuleQueue._breakers.remaining(self.host))
+        P.logger.warning(
+            f'[GDM] retry {self.retry_count}/{max_retry} in {delay:.1f}s ({kind}): {self.id} - {self.error_message}'
+        )
+        ModuleQueue._db_writer.update(self, retry_count=self.retry_count, error_message=self.error_message)
+        self._defer(delay)
+        return True
+
+    def _defer(self, delay: float):
+        """WAITING 상태로 지연 큐에 다시 넣음 (대기 중 슬롯 미점유)"""
+        delay = max(1.0, delay)
+        self.status = DownloadStatus.WAITING
+        self.retry_at = time.time() + delay
+        self.speed = ''
+        self.eta = ''
+        self._emit_status()
+        ModuleQueue._ensure_concurrency_limit().submit_after(self, delay)
+
+    def _progress_callback(self, progress: int, speed: str = '', eta: str = '', **detail):
+        """진행률 콜백 (detail: downloaded_bytes, total_bytes, speed_bps, eta_sec, segments_done, segments_total)"""
         self.progress = progress
         self.speed = speed
         self.eta = eta
+        for key in ('downloaded_bytes', 'total_bytes', 'speed_bps', 'eta_sec', 'segments_done', 'segments_total'):
+            if key in detail:
+                setattr(self, key, int(detail[key] or 0))
         
         if self._on_progress:
             self._on_progress(progress, speed, eta)
+        for sub in self._subscribers:
+            if sub.get('on_progress'):
+                try: sub['on_progress'](progress, speed, eta)
+                except: pass
         
+        # 진행률도 DB에 기록 (같은 행의 연속 갱신은 writer에서 마지막 값으로 병합)
+        ModuleQueue._db_writer.update(self, progress=progress, speed=speed, eta=eta)
         self._emit_status()
     
-    def _emit_status(self):
-        """Socket.IO로 상태 전송"""
+    def add_subscriber(
+        self,
+        caller_plugin: Optional[str] = None,
+        callback_id: Optional[str] = None,
+        on_progress: Optional[Callable] = None,
+        on_complete: Optional[Callable] = None,
+        on_error: Optional[Callable] = None,
+    ) -> None:
+        """같은 다운로드를 요청한 다른 호출자 등록 (완료/실패 시 함께 통지)"""
+        if (caller_plugin, callback_id) == (self.caller_plugin, self.callback_id) \
+                and not (on_progress or on_complete or on_error):
+            return
+        self._subscribers.append({
+            'caller_plugin': caller_plugin,
+            'callback_id': callback_id,
+            'on_progress': on_progress,
+            'on_complete': on_complete,
+            'on_error': on_error,
+        })
+        if caller_plugin and callback_id:
+            # 플러그인 콜백 구독자는 재시작 후에도 통지되도록 옵션과 함께 저장
+            import json
+            options = ModuleQueue._persistable_options(self.options)
+            options['subscribers'] = self.persistent_subscribers
+            ModuleQueue._db_writer.update(self, options=json.dumps(options, ensure_ascii=False))
+
+    @property
+    def persistent_subscribers(self) -> List[Dict[str, str]]:
+        return [
+            {'caller_plugin': sub['caller_plugin'], 'callback_id': sub['callback_id']}
+            for sub in self._subscribers
+            if sub.get('caller_plugin') and sub.get('callback_id')
+        ]
+
+    def _notify_complete(self):
+        """요청자 + 중복 요청 구독자 전원에게 완료 통지"""
+        for sub in [self._owner_subscriber()] + self._subscribers:
+            # 실시간 콜백 처리
+            if sub.get('on_complete'):
+                try: sub['on_complete'](self.filepath)
+                except: pass
+            # 플러그인 간 영구적 콜백 처리
+            if sub.get('caller_plugin') and sub.get('callback_id'):
+                self._invoke_plugin_callback(sub['caller_plugin'], sub['callback_id'])
+
+    def _notify_error(self):
+        for sub in [self._owner_subscriber()] + self._subscribers:
+            if sub.get('on_error'):
+                try: sub['on_error'](self.error_message)
+                except: pass
+
+    def _owner_subscriber(self) -> Dict[str, Any]:
+        return {
+            'caller_plugin': self.caller_plugin,
+            'callback_id': self.callback_id,
+            'on_complete': self._on_complete,
+            'on_error': self._on_error,
+        }
+
+    def _complete_from_cache(self, allow_copy: bool) -> bool:
+        """완료 캐시에 같은 URL/포맷 파일이 있으면 save_path 에 만들고 COMPLETED 처리"""
+        if not ModuleQueue._completed_cache_enabled():
+            return False
+        from .setup import P
         try:
-            socketio.emit(
-                'download_status',
-                self.get_status(),
-                namespace=f'/gommi_downloader_manager'
-            )
-        except:
-            pass
+            src = CompletedCache.lookup(ModuleQueue._cache_key(self))
+            if not src:
+                return False
+            name = self.options.get('outtmpl') or self.filename
+            if not name or '%(' in name:
+                name = os.path.basename(src)
+            dst = os.path.normpath(os.path.abspath(os.path.join(self.save_path, name)))
+            method = CompletedCache.materialize(src, dst, allow_copy=allow_copy)
+        except Exception as e:
+            P.logger.error(f'[GDM] completed cache lookup failed: {e}')
+            return False
+        if not method:
+            return False
+        self.filepath = dst
+        self.filesize = os.path.getsize(dst)
+        self.progress = 100
+        self.status = DownloadStatus.COMPLETED
+        self.end_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        P.logger.info(f'[GDM] completed cache hit ({method}): {src} -> {dst}')
+        return True
+
+    def _state_callback(self, state: Dict[str, Any]):
+        """다운로더 이어받기 상태 갱신 (재시작 시 복원, write-behind 로 병합 저장)"""
+        import json
+        self.resume_state.update(state)
+        ModuleQueue._db_writer.update(self, resume_state=json.dumps(self.resume_state, ensure_ascii=False))
+
+    def _emit_status(self):
+        """Socket.IO로 상태 전송 (상태 전이는 즉시, 진행률은 병합 전송)"""
+        ModuleQueue._downloads.mark_changed(self, ModuleQueue._next_change_seq)
+        ModuleQueue._broadcaster.publish(self)
+        # 유예 시간이 지난 끝난 태스크 정리 (대상이 없으면 맨 앞 하나만 확인)
+        ModuleQueue._downloads.evict()
     
 
     def _info_update_callback(self, info_dict):
         """다운로더로부터 메타데이터 업데이트 수신"""
         try:
+            if info_dict.get('duration'):
+                self.duration = info_dict['duration']
+            if info_dict.get('meta'):
+                # 다운로더 통계 (예: HLS 호스트별 지연/오류율) 를 호출자 meta 에 병합
+                import json
+                self.meta = dict(self.meta or {}, **info_dict['meta'])
+                ModuleQueue._db_writer.update(self, meta=json.dumps(self.meta, ensure_ascii=False))
+                self._emit_status()
             if 'title' in info_dict and info_dict['title']:
                 self.title = info_dict['title']
                 if 'thumbnail' in info_dict and info_dict['thumbnail']:
@@ -922,33 +1846,52 @@ class DownloadTask:
             pass
 
     def _update_db_info(self):
-        """DB의 제목/썸네일 정보 동기화"""
-        try:
-            if self.db_id:
-                from .model import ModelDownloadItem
-                with F.app.app_context():
-                    item = F.db.session.query(ModelDownloadItem).filter_by(id=self.db_id).first()
-                    if item:
-                        item.title = self.title
-                        item.thumbnail = self.thumbnail
-                        F.db.session.commit()
-        except:
-            pass
+        """DB의 제목/썸네일 정보 동기화 (write-behind)"""
+        ModuleQueue._db_writer.update(self, title=self.title, thumbnail=self.thumbnail)
 
     def cancel(self):
         """다운로드 취소"""
         self._cancelled = True
+        ModuleQueue._bandwidth.unregister(self.id)
+        # 아직 슬롯을 받지 못한 태스크는 준비 큐에서 바로 제거
+        if ModuleQueue._scheduler is not None:
+            ModuleQueue._scheduler.remove(self)
+        ModuleQueue._release_inflight(self)
         if self._downloader:
             self._downloader.cancel()
         self.status = DownloadStatus.CANCELLED
         self._cleanup_if_empty()
+        if not ModuleQueue._shutting_down:
+            # 사용자 취소: 재시작 때 복원되지 않도록 상태 기록 + 이어받기용 임시 파일 정리
+            self._update_db_status()
+            self._discard_partial_files()
         self._emit_status()
+
+    def _release_resources(self):
+        """끝난 태스크가 잡고 있는 다운로더(프로세스 핸들)와 호출자 콜백 해제"""
+        self._downloader = None
+        self._on_progress = None
+        self._on_complete = None
+        self._on_error = None
+        self._subscribers = []
+
+    def _discard_partial_files(self):
+        for path in self.resume_state.get('partial_files') or []:
+            try:
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                elif os.path.exists(path):
+                    os.remove(path)
+            except Exception as e:
+                from .setup import P
+                P.logger.error(f"Cleanup error: {e}")
     
     def pause(self):
         """다운로드 일시정지"""
         if self._downloader and hasattr(self._downloader, 'pause'):
             self._downloader.pause()
         self.status = DownloadStatus.PAUSED
+        ModuleQueue._bandwidth.set_paused(self.id, True)
         self._emit_status()
     
     def resume(self):
@@ -956,6 +1899,7 @@ class DownloadTask:
         if self._downloader and hasattr(self._downloader, 'resume'):
             self._downloader.resume()
         self.status = DownloadStatus.DOWNLOADING
+        ModuleQueue._bandwidth.set_paused(self.id, False)
         self._emit_status()
 
     def _cleanup_if_empty(self):
@@ -971,43 +1915,36 @@ class DownloadTask:
             P.logger.error(f"Cleanup error: {e}")
 
     def _update_db_status(self):
-        """DB의 상태 정보를 동기화"""
-        try:
-            if self.db_id:
-                from .model import ModelDownloadItem
-                with F.app.app_context():
-                    item = F.db.session.query(ModelDownloadItem).filter_by(id=self.db_id).first()
-                    if item:
-                        item.status = self.status
-                        if self.status == DownloadStatus.COMPLETED:
-                            item.completed_time = datetime.now()
-                            item.filesize = self.filesize
-                        if self.error_message:
-                            item.error_message = self.error_message
-                        F.db.session.add(item)
-                        F.db.session.commit()
-        except Exception as e:
-            from .setup import P
-            P.logger.error(f"Failed to update DB status: {e}")
+        """DB의 상태 정보를 동기화 (write-behind)"""
+        fields = {'status': self.status, 'progress': self.progress}
+        if self.status == DownloadStatus.COMPLETED:
+            fields['completed_time'] = datetime.now()
+            fields['filesize'] = self.filesize
+            fields['resume_state'] = None
+        if self.error_message:
+            fields['error_message'] = self.error_message
+        ModuleQueue._db_writer.update(self, **fields)
 
-    def _invoke_plugin_callback(self):
-        """호출한 플러그인의 콜백 메서드 호출"""
+    def _invoke_plugin_callback(self, caller_plugin: Optional[str] = None, callback_id: Optional[str] = None):
+        """호출한 플러그인의 콜백 메서드 호출 (기본: 태스크 요청자, 구독자는 인자로 지정)"""
+        caller_plugin = caller_plugin or self.caller_plugin
+        callback_id = callback_id or self.callback_id
         try:
             from .setup import P
-            P.logger.info(f"Invoking callback for plugin: {self.caller_plugin}, id: {self.callback_id}")
+            P.logger.info(f"Invoking callback for plugin: {caller_plugin}, id: {callback_id}")
             
             # 플러그인 인스턴스 찾기 (PluginManager 사용)
             from framework import F
             target_P = None
             
             # caller_plugin은 "anime_downloader_ohli24" 형식이므로 패키지명 추출
-            parts = self.caller_plugin.split('_')
-            package_name = parts[0] if parts else self.caller_plugin
+            parts = caller_plugin.split('_')
+            package_name = parts[0] if parts else caller_plugin
             
             # 패키지 이름으로 여러 조합 시도
             possible_names = [
-                self.caller_plugin,  # anime_downloader_ohli24
-                '_'.join(parts[:2]) if len(parts) > 1 else self.caller_plugin,  # anime_downloader
+                caller_plugin,  # anime_downloader_ohli24
+                '_'.join(parts[:2]) if len(parts) > 1 else caller_plugin,  # anime_downloader
                 package_name  # anime
             ]
             
@@ -1044,7 +1981,7 @@ class DownloadTask:
                         
                     if hasattr(module_instance, 'plugin_callback'):
                         callback_data = {
-                            'callback_id': self.callback_id,
+                            'callback_id': callback_id,
                             'status': self.status,
                             'filepath': self.filepath,
                             'filename': os.path.basename(self.filepath) if self.filepath else '',
@@ -1058,13 +1995,25 @@ class DownloadTask:
                             break
                 
                 if not callback_invoked:
-                    P.logger.debug(f"No plugin_callback method found in {self.caller_plugin}")
+                    P.logger.debug(f"No plugin_callback method found in {caller_plugin}")
             else:
-                P.logger.debug(f"Plugin {self.caller_plugin} not found in PluginManager")
+                P.logger.debug(f"Plugin {caller_plugin} not found in PluginManager")
         except Exception as e:
             P.logger.error(f"Error invoking plugin callback: {e}")
             P.logger.error(traceback.format_exc())
     
+    @property
+    def skipped_segments(self) -> int:
+        """완료했지만 복구 못 해 건너뛴 HLS 세그먼트 수 (meta 에 기록)"""
+        return len((self.meta or {}).get('hls_skipped_segments') or [])
+
+    @property
+    def queue_position(self) -> Optional[int]:
+        """대기 중일 때 스케줄러 기준 유효 대기 순번 (1 = 다음 차례)"""
+        if self.status != DownloadStatus.WAITING or ModuleQueue._scheduler is None:
+            return None
+        return ModuleQueue._scheduler.position(self)
+
     def get_status(self) -> Dict[str, Any]:
         """현재 상태 반환"""
         return {
@@ -1089,6 +2038,19 @@ class DownloadTask:
             'end_time': self.end_time,
             'created_time': self.created_time,
             'file_size': self.filesize,
+            'duration': self.duration,
+            'downloaded_bytes': self.downloaded_bytes,
+            'total_bytes': self.total_bytes,
+            'speed_bps': self.speed_bps,
+            'eta_sec': self.eta_sec,
+            'segments_done': self.segments_done,
+            'segments_total': self.segments_total,
+            'skipped_segments': self.skipped_segments,
+            'priority': self.priority,
+            'queue_position': self.queue_position,
+            'retry_count': self.retry_count,
+            'retry_at': self.retry_at,
+            'error_kind': self.error_kind,
         }
     
     def as_dict(self) -> Dict[str, Any]:
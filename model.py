@@ -46,6 +46,11 @@ class ModelDownloadItem(ModelBase):
     
     # 추가 메타데이터 (JSON 형태의 텍스트 저장)
     meta: str = db.Column(db.Text)
+    
+    # 재시작 복원용 (JSON): 호출 옵션, 다운로더별 이어받기 상태
+    options: str = db.Column(db.Text)
+    resume_state: str = db.Column(db.Text)
+    priority: int = db.Column(db.Integer, default=0)
 
     def as_dict(self):
         ret = super(ModelDownloadItem, self).as_dict()
@@ -61,8 +66,27 @@ class ModelDownloadItem(ModelBase):
             ret['created_time'] = self.created_time.strftime('%Y-%m-%d %H:%M:%S')
         # JS UI expects file_size (with underscore)
         ret['file_size'] = self.filesize or 0
+        # 헤더/쿠키 등이 포함될 수 있으므로 UI로 보내지 않음
+        ret.pop('options', None)
+        ret.pop('resume_state', None)
         return ret
 
+    def _load_json(self, value):
+        import json
+        if not value:
+            return {}
+        try:
+            data = json.loads(value)
+            return data if isinstance(data, dict) else {}
+        except:
+            return {}
+
+    def get_options(self):
+        return self._load_json(self.options)
+
+    def get_resume_state(self):
+        return self._load_json(self.resume_state)
+
     @classmethod
     def check_migration(cls):
         """DB 컬럼 누락 체크 및 추가"""
@@ -83,9 +107,18 @@ class ModelDownloadItem(ModelBase):
             cursor.execute(f"PRAGMA table_info({cls.__tablename__})")
             columns = [info[1] for info in cursor.fetchall()]
             
-            if 'meta' not in columns:
-                P.logger.info(f"Adding 'meta' column to {cls.__tablename__}")
-                cursor.execute(f"ALTER TABLE {cls.__tablename__} ADD COLUMN meta TEXT")
+            added = False
+            for column, column_type in (
+                ('meta', 'TEXT'),
+                ('options', 'TEXT'),
+                ('resume_state', 'TEXT'),
+                ('priority', 'INTEGER DEFAULT 0'),
+            ):
+                if column not in columns:
+                    P.logger.info(f"Adding '{column}' column to {cls.__tablename__}")
+                    cursor.execute(f"ALTER TABLE {cls.__tablename__} ADD COLUMN {column} {column_type}")
+                    added = True
+            if added:
                 conn.commit()
             
             conn.close()
@@ -95,3 +128,34 @@ class ModelDownloadItem(ModelBase):
             import traceback
             P.logger.error(traceback.format_exc())
 
+
+
+class ModelCompletedFile(ModelBase):
+    """완료된 다운로드 결과 색인 (같은 URL/포맷 재요청 시 로컬 파일 재사용)"""
+    __tablename__ = f'{package_name}_completed_file'
+    __table_args__ = {'mysql_collate': 'utf8_general_ci'}
+    __bind_key__ = package_name
+
+    id: int = db.Column(db.Integer, primary_key=True)
+    created_time: datetime = db.Column(db.DateTime)
+    cache_key: str = db.Column(db.String, index=True)  # 정규화 URL + 포맷
+    url: str = db.Column(db.String)
+    format: str = db.Column(db.String)
+    filepath: str = db.Column(db.String)
+    filesize: int = db.Column(db.Integer)
+    mtime: float = db.Column(db.Float)
+    content_hash: str = db.Column(db.String, index=True)  # sha256 (옵션)
+
+
+class ModelHostThroughput(ModelBase):
+    """호스트/aria2c 연결 수별 실측 처리량 (연결 수 적응 제어 학습 표)"""
+    __tablename__ = f'{package_name}_host_throughput'
+    __table_args__ = {'mysql_collate': 'utf8_general_ci'}
+    __bind_key__ = package_name
+
+    id: int = db.Column(db.Integer, primary_key=True)
+    host: str = db.Column(db.String, index=True)
+    connections: int = db.Column(db.Integer)
+    bps: float = db.Column(db.Float)  # EWMA bytes/sec
+    samples: int = db.Column(db.Integer, default=0)
+    updated: float = db.Column(db.Float)  # epoch
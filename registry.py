@@ -0,0 +1,269 @@
+"""
+다운로드 태스크 레지스트리 (ModuleQueue._downloads)
+- id → 태스크, dict 와 같은 인터페이스
+- 끝난 태스크(완료/취소/오류)는 마지막 사용 순서(LRU)로 따로 추적
+- 유예 시간이 지났거나 보관 개수를 넘은 끝난 태스크는 레지스트리에서 내보냄
+  (내역은 DB 에 남아 목록에서 db_ 항목으로 보임)
+- 상태 / db_id / caller_plugin / callback_id 보조 색인과 변경 순서 목록을 함께 유지해
+  개수·조회·델타 목록이 전체 태스크 수와 무관하게 동작
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+try:
+    from .setup import P
+    logger = P.logger
+except:
+    import logging
+    logger = logging.getLogger(__name__)
+
+
+class TaskRegistry:
+    """진행 중 + 최근에 끝난 태스크 보관소"""
+
+    def __init__(self, finished_statuses: Iterable[Any], grace_sec: float = 300.0, max_finished: int = 200,
+                 on_evict: Optional[Callable[[List[Any]], None]] = None):
+        self._lock = threading.RLock()
+        self._tasks: Dict[str, Any] = {}
+        # 끝난 태스크 id → 마지막 사용 시각 (monotonic), 오래된 것이 앞
+        self._finished: 'OrderedDict[str, float]' = OrderedDict()
+        self._finished_statuses = frozenset(finished_statuses)
+        # 보조 색인 (값은 id → 태스크, 삽입 순서 유지)
+        self._by_status: Dict[Any, Dict[str, Any]] = {}
+        self._by_db_id: Dict[int, Any] = {}
+        self._by_caller: Dict[str, Dict[str, Any]] = {}
+        self._by_callback: Dict[str, Dict[str, Any]] = {}
+        # 마지막 변경 순서 (오래된 것이 앞), 델타 목록용
+        self._changes: 'OrderedDict[str, None]' = OrderedDict()
+        self.grace_sec = grace_sec
+        self.max_finished = max_finished
+        self.on_evict = on_evict
+
+    def configure(self, grace_sec: Optional[float] = None, max_finished: Optional[int] = None) -> None:
+        if grace_sec is not None:
+            self.grace_sec = max(0.0, float(grace_sec))
+        if max_finished is not None:
+            self.max_finished = max(0, int(max_finished))
+        self.evict()
+
+    # ===== dict 인터페이스 =====
+
+    def __setitem__(self, task_id: str, task: Any) -> None:
+        with self._lock:
+            previous = self._tasks.get(task_id)
+            if previous is not None and previous is not task:
+                self._unindex(previous)
+            self._tasks[task_id] = task
+            self._index(task)
+            if task.status in self._finished_statuses:
+                self._finished[task_id] = time.monotonic()
+                self._finished.move_to_end(task_id)
+            else:
+                self._finished.pop(task_id, None)
+
+    def __getitem__(self, task_id: str) -> Any:
+        return self._tasks[task_id]
+
+    def __delitem__(self, task_id: str) -> None:
+        with self._lock:
+            task = self._tasks.pop(task_id)
+            self._unindex(task)
+
+    def __contains__(self, task_id: object) -> bool:
+        return task_id in self._tasks
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._tasks))
+
+    def get(self, task_id: str, default: Any = None) -> Any:
+        return self._tasks.get(task_id, default)
+
+    def pop(self, task_id: str, default: Any = None) -> Any:
+        with self._lock:
+            task = self._tasks.pop(task_id, None)
+            if task is None:
+                return default
+            self._unindex(task)
+            return task
+
+    def keys(self) -> List[str]:
+        return list(self._tasks.keys())
+
+    def values(self) -> List[Any]:
+        return list(self._tasks.values())
+
+    def items(self) -> List[Any]:
+        return list(self._tasks.items())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tasks.clear()
+            self._finished.clear()
+            self._by_status.clear()
+            self._by_db_id.clear()
+            self._by_caller.clear()
+            self._by_callback.clear()
+            self._changes.clear()
+
+    # ===== 색인 조회 =====
+
+    def resolve(self, item_id: str) -> Any:
+        """목록 id 로 태스크 조회 (태스크 id 또는 DB 내역 id 'db_<n>')"""
+        if item_id and item_id.startswith('db_'):
+            try:
+                return self._by_db_id.get(int(item_id[3:]))
+            except ValueError:
+                return None
+        return self._tasks.get(item_id)
+
+    def by_db_id(self, db_id: int) -> Any:
+        return self._by_db_id.get(db_id)
+
+    def db_ids(self) -> List[int]:
+        return list(self._by_db_id.keys())
+
+    def by_status(self, *statuses: Any) -> List[Any]:
+        with self._lock:
+            return [task for status in statuses for task in self._by_status.get(status, {}).values()]
+
+    def count(self, *statuses: Any) -> int:
+        """상태별 개수 (인자가 없으면 전체)"""
+        if not statuses:
+            return len(self._tasks)
+        return sum(len(self._by_status.get(status, ())) for status in statuses)
+
+    def status_counts(self) -> Dict[Any, int]:
+        with self._lock:
+            return {status: len(tasks) for status, tasks in self._by_status.items() if tasks}
+
+    def find(self, caller_plugin: Optional[str] = None, callback_id: Optional[str] = None) -> List[Any]:
+        """호출 플러그인 / 콜백 id 로 태스크 조회 (둘 다 주면 교집합)"""
+        with self._lock:
+            if callback_id is not None:
+                tasks = list(self._by_callback.get(callback_id, {}).values())
+                if caller_plugin is not None:
+                    tasks = [task for task in tasks if task.caller_plugin == caller_plugin]
+                return tasks
+            if caller_plugin is not None:
+                return list(self._by_caller.get(caller_plugin, {}).values())
+            return list(self._tasks.values())
+
+    def changed_since(self, version: int) -> List[Any]:
+        """_version 이 version 보다 큰 태스크 (최근 변경분만 역순으로 훑음)"""
+        with self._lock:
+            ret = []
+            for task_id in reversed(self._changes):
+                task = self._tasks[task_id]
+                if task._version <= version:
+                    break
+                ret.append(task)
+            ret.reverse()
+            return ret
+
+    # ===== 상태 전이 / 변경 기록 (DownloadTask 에서만 호출) =====
+
+    def mark_changed(self, task: Any, next_version: Callable[[], int]) -> None:
+        """변경 번호 발급과 변경 순서 갱신을 한 번에 (순서가 번호와 어긋나지 않도록)"""
+        with self._lock:
+            task._version = next_version()
+            if self._tasks.get(task.id) is task:
+                self._changes[task.id] = None
+                self._changes.move_to_end(task.id)
+
+    def db_id_changed(self, task: Any, old_db_id: Optional[int]) -> None:
+        with self._lock:
+            if self._tasks.get(task.id) is not task:
+                return
+            if old_db_id is not None and self._by_db_id.get(old_db_id) is task:
+                del self._by_db_id[old_db_id]
+            if task.db_id is not None:
+                self._by_db_id[task.db_id] = task
+
+    # ===== 끝난 태스크 관리 =====
+
+    @property
+    def finished_count(self) -> int:
+        return len(self._finished)
+
+    def status_changed(self, task: Any, old_status: Any) -> None:
+        """태스크 상태 전이 통지 (DownloadTask.status setter 에서 호출)"""
+        with self._lock:
+            if self._tasks.get(task.id) is not task:
+                return
+            self._bucket_remove(self._by_status, old_status, task)
+            self._bucket_add(self._by_status, task.status, task)
+            if task.status in self._finished_statuses:
+                self._finished[task.id] = time.monotonic()
+                self._finished.move_to_end(task.id)
+            elif old_status in self._finished_statuses:
+                self._finished.pop(task.id, None)
+
+    def touch(self, task_id: str) -> None:
+        """외부 조회된 끝난 태스크는 LRU 뒤로 (유예 시간도 다시 계산)"""
+        with self._lock:
+            if task_id in self._finished:
+                self._finished[task_id] = time.monotonic()
+                self._finished.move_to_end(task_id)
+
+    def evict(self, now: Optional[float] = None) -> List[Any]:
+        """
+        유예 시간이 지났거나 max_finished 를 넘는 끝난 태스크를 오래된 순으로 내보냄
+        내보낼 것이 없으면 맨 앞 항목 하나만 확인하고 반환
+        """
+        now = time.monotonic() if now is None else now
+        evicted: List[Any] = []
+        with self._lock:
+            while self._finished:
+                task_id, last_used = next(iter(self._finished.items()))
+                if len(self._finished) <= self.max_finished and now - last_used < self.grace_sec:
+                    break
+                self._finished.popitem(last=False)
+                task = self._tasks.pop(task_id, None)
+                if task is not None:
+                    self._unindex(task)
+                    evicted.append(task)
+        if evicted and self.on_evict is not None:
+            try:
+                self.on_evict(evicted)
+            except Exception as e:
+                logger.error(f'[GDM] registry evict callback failed: {e}')
+        return evicted
+
+    # ===== 내부 =====
+
+    def _index(self, task: Any) -> None:
+        self._bucket_add(self._by_status, task.status, task)
+        if task.db_id is not None:
+            self._by_db_id[task.db_id] = task
+        if task.caller_plugin:
+            self._bucket_add(self._by_caller, task.caller_plugin, task)
+        if task.callback_id:
+            self._bucket_add(self._by_callback, task.callback_id, task)
+
+    def _unindex(self, task: Any) -> None:
+        self._finished.pop(task.id, None)
+        self._changes.pop(task.id, None)
+        self._bucket_remove(self._by_status, task.status, task)
+        if task.db_id is not None and self._by_db_id.get(task.db_id) is task:
+            del self._by_db_id[task.db_id]
+        if task.caller_plugin:
+            self._bucket_remove(self._by_caller, task.caller_plugin, task)
+        if task.callback_id:
+            self._bucket_remove(self._by_callback, task.callback_id, task)
+
+    @staticmethod
+    def _bucket_add(index: Dict[Any, Dict[str, Any]], key: Any, task: Any) -> None:
+        index.setdefault(key, {})[task.id] = task
+
+    @staticmethod
+    def _bucket_remove(index: Dict[Any, Dict[str, Any]], key: Any, task: Any) -> None:
+        bucket = index.get(key)
+        if bucket is not None and bucket.get(task.id) is task:
+            del bucket[task.id]
+            if not bucket:
+                del index[key]
@@ -0,0 +1,209 @@
+"""
+재시도 정책
+- classify_error: 다운로더 결과/예외 메시지를 네트워크 / HTTP(일시·영구) / 콘텐츠 없음 / 로컬 / 파싱 / 취소로 분류
+- backoff_delay: 지터를 섞은 지수 백오프 (full jitter)
+- CircuitBreakers: 호스트별 연속 실패가 임계치를 넘으면 일정 시간 요청 차단, 이후 한 건만 시험 허용
+"""
+import random
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from .setup import P
+    logger = P.logger
+except:
+    import logging
+    logger = logging.getLogger(__name__)
+
+
+# 분류 결과: (종류, 재시도 가능 여부, 호스트 장애로 볼지 여부)
+ERROR_CANCELLED = 'cancelled'
+ERROR_NETWORK = 'network'
+ERROR_HTTP_TRANSIENT = 'http_transient'
+ERROR_HTTP_FATAL = 'http_fatal'
+ERROR_PARSE = 'parse'
+ERROR_UNAVAILABLE = 'unavailable'  # 비공개/삭제/연령·로그인 제한 등 다시 받아도 같은 결과
+ERROR_LOCAL = 'local'  # 디스크 공간/권한 등 이쪽 환경 문제
+ERROR_UNKNOWN = 'unknown'
+
+UNKNOWN_MAX_RETRY = 1  # 분류 못 한 오류는 최대 한 번만 재시도 (호스트 장애로 세지 않음)
+
+# HTTP 문맥이 있는 상태 코드만 (메시지 끝의 아무 숫자나 상태 코드로 보지 않도록)
+_HTTP_STATUS_RE = re.compile(
+    r'(?:HTTP(?:\s+Error)?\s*|Server returned\s+|status(?:\s+code)?\s*[:=]?\s*)([45]\d\d)\b'
+    r'|\b([45]\d\d)\s+(?:Client|Server) Error',  # requests raise_for_status 형식
+    re.IGNORECASE,
+)
+_HTTP_FATAL = {400, 401, 403, 404, 405, 410, 451}
+
+_NETWORK_PATTERNS = (
+    'timed out', 'timeout', 'connection reset', 'connection refused', 'connection aborted',
+    'connectionerror', 'temporary failure in name resolution', 'name or service not known',
+    'network is unreachable', 'no route to host', 'remote end closed', 'broken pipe',
+    'incompleteread', 'eof occurred', 'ssl', 'max retries exceeded', 'chunkedencodingerror',
+    'end of file', 'i/o error', 'input/output error',
+)
+_PARSE_PATTERNS = (
+    'unsupported url', 'unable to extract', 'failed to extract', 'no video formats',
+    'invalid data found', 'jsondecodeerror', 'not a valid', 'is not a valid url',
+    'requested format is not available', 'unable to download webpage: http error 404',
+    '지원하지 않는 소스 타입', 'failed to extract stream url',
+)
+_UNAVAILABLE_PATTERNS = (
+    'video unavailable', 'private video', 'sign in to confirm', 'this video is not available',
+    'this video has been removed', 'video has been removed', 'members-only', 'join this channel',
+    'not available in your country', 'geo restricted', 'account associated with this video has been terminated',
+    'copyright claim', 'this live event will begin', 'premieres in', 'requested content is not available',
+)
+_LOCAL_PATTERNS = (
+    'no space left on device', 'disk quota exceeded', 'permission denied', 'read-only file system',
+    'file name too long', 'errno 28', 'errno 13', 'errno 30', 'errno 36',
+)
+
+
+def classify_error(message: Optional[str]) -> Tuple[str, bool, bool]:
+    """(kind, retryable, host_failure)"""
+    text = (message or '').strip()
+    lower = text.lower()
+    if lower == 'cancelled':
+        return ERROR_CANCELLED, False, False
+    if 'server returned 5xx' in lower:
+        return ERROR_HTTP_TRANSIENT, True, True
+    if 'server returned 4xx' in lower:
+        return ERROR_HTTP_FATAL, False, False
+    if any(p in lower for p in _LOCAL_PATTERNS):
+        return ERROR_LOCAL, False, False
+    if any(p in lower for p in _UNAVAILABLE_PATTERNS):
+        return ERROR_UNAVAILABLE, False, False
+    match = _HTTP_STATUS_RE.search(text)
+    if match:
+        status = int(match.group(1) or match.group(2))
+        if status in _HTTP_FATAL:
+            return ERROR_HTTP_FATAL, False, False
+        return ERROR_HTTP_TRANSIENT, True, True
+    if any(p in lower for p in _PARSE_PATTERNS):
+        return ERROR_PARSE, False, False
+    if any(p in lower for p in _NETWORK_PATTERNS):
+        return ERROR_NETWORK, True, True
+    # 재시도는 UNKNOWN_MAX_RETRY 회까지만 (호출 측)
+    return ERROR_UNKNOWN, True, False
+
+
+def backoff_delay(attempt: int, base: float = 5.0, cap: float = 300.0) -> float:
+    """attempt(1부터)번째 재시도 대기 시간: uniform(base/2, min(cap, base * 2^(attempt-1)))"""
+    ceiling = min(cap, base * (2 ** max(0, attempt - 1)))
+    return random.uniform(min(base / 2, ceiling), ceiling)
+
+
+class _Breaker:
+    __slots__ = ('host', 'failures', 'opened_at', 'open_until', 'cooldown', 'trial')
+
+    def __init__(self, host: str):
+        self.host = host
+        self.failures = 0
+        self.opened_at = 0.0
+        self.open_until = 0.0
+        self.cooldown = 0.0
+        self.trial = False  # half-open 시험 요청 진행 중
+
+
+class CircuitBreakers:
+    """호스트별 서킷 브레이커 (closed → open → half-open → closed/open)"""
+
+    def __init__(self, threshold: int = 5, cooldown_sec: float = 120.0, max_cooldown_sec: float = 1800.0):
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, _Breaker] = {}
+        self.threshold = threshold
+        self.cooldown_sec = cooldown_sec
+        self.max_cooldown_sec = max_cooldown_sec
+
+    def configure(self, threshold: Optional[int] = None, cooldown_sec: Optional[float] = None) -> None:
+        with self._lock:
+            if threshold is not None:
+                self.threshold = max(0, int(threshold))
+            if cooldown_sec is not None:
+                self.cooldown_sec = max(1.0, float(cooldown_sec))
+
+    def allow(self, host: str) -> Tuple[bool, float]:
+        """
+        요청 허용 여부와 거절 시 다시 시도할 때까지의 대기(초)
+        open 기간이 끝나면 첫 요청 하나만 시험으로 허용 (half-open)
+        """
+        if not host or self.threshold <= 0:
+            return True, 0.0
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None or breaker.open_until == 0.0:
+                return True, 0.0
+            now = time.monotonic()
+            if now < breaker.open_until:
+                return False, breaker.open_until - now
+            if breaker.trial:
+                return False, min(10.0, self.cooldown_sec)
+            breaker.trial = True
+            return True, 0.0
+
+    def remaining(self, host: str) -> float:
+        """open 상태가 끝날 때까지 남은 시간(초), 닫혀 있거나 끝났으면 0 (상태 변경 없음)"""
+        if not host or self.threshold <= 0:
+            return 0.0
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None or breaker.open_until == 0.0:
+                return 0.0
+            return max(0.0, breaker.open_until - time.monotonic())
+
+    def record_success(self, host: str) -> None:
+        if not host:
+            return
+        with self._lock:
+            breaker = self._breakers.pop(host, None)
+        if breaker is not None and breaker.open_until:
+            logger.info(f'[GDM] circuit closed: {host}')
+
+    def record_failure(self, host: str) -> None:
+        if not host or self.threshold <= 0:
+            return
+        with self._lock:
+            breaker = self._breakers.setdefault(host, _Breaker(host))
+            breaker.failures += 1
+            now = time.monotonic()
+            if breaker.trial or (breaker.open_until == 0.0 and breaker.failures >= self.threshold):
+                # 시험 요청 실패면 대기 시간을 두 배로
+                breaker.cooldown = min(self.max_cooldown_sec, breaker.cooldown * 2) if breaker.trial else self.cooldown_sec
+                breaker.opened_at = now
+                breaker.open_until = now + breaker.cooldown
+                breaker.trial = False
+                logger.warning(
+                    f'[GDM] circuit open: {host} ({breaker.failures} consecutive failures, '
+                    f'retry in {breaker.cooldown:.0f}s)'
+                )
+
+    def release_trial(self, host: str) -> None:
+        """시험 요청이 성공/실패 판정 없이 끝난 경우 (취소, 영구 오류 등)"""
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is not None:
+                breaker.trial = False
+
+    def snapshot(self) -> List[Dict[str, object]]:
+        """UI 표시용: 실패가 누적됐거나 열린 브레이커"""
+        now = time.monotonic()
+        with self._lock:
+            ret = []
+            for breaker in self._breakers.values():
+                if breaker.open_until == 0.0:
+                    state = 'closed'
+                elif now < breaker.open_until:
+                    state = 'open'
+                else:
+                    state = 'half_open'
+                ret.append({
+                    'host': breaker.host,
+                    'state': state,
+                    'failures': breaker.failures,
+                    'retry_in': max(0, int(breaker.open_until - now)) if state == 'open' else 0,
+                })
+            return sorted(ret, key=lambda b: (b['state'] != 'open', b['host']))
@@ -0,0 +1,458 @@
+"""
+다운로드 스케줄러
+- 준비 큐(ready queue) + 고정 크기 워커 풀
+- 대기(WAITING) 태스크는 스레드를 점유하지 않음
+- 슬롯이 비거나 태스크가 들어오면 Condition으로 즉시 디스패치 (폴링 없음)
+- 우선순위 + 호출자(caller_plugin/source_type)별 가중 공정 큐잉, 대기 시간 에이징
+- 전역 상한 아래에 source_type별 / 호스트별 동시 실행 풀
+- 지연 큐: 재시도 백오프 대기 태스크는 실행 시각이 될 때까지 슬롯 없이 대기
+"""
+import heapq
+import itertools
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+try:
+    from .setup import P
+    logger = P.logger
+except:
+    import logging
+    logger = logging.getLogger(__name__)
+
+
+# (source_type, host) - 동시 실행 풀 판정 단위
+PoolKey = Tuple[str, str]
+# (priority, pool_key) - 흐름 내부 버킷 단위 (버킷 안에서는 FIFO)
+BucketKey = Tuple[int, PoolKey]
+
+
+class _Flow:
+    """호출자별 큐 (우선순위·풀 버킷별 FIFO)"""
+    __slots__ = ('key', 'weight', 'served', 'buckets', 'size')
+
+    def __init__(self, key: str, weight: float, served: float):
+        self.key = key
+        self.weight = weight
+        self.served = served
+        self.buckets: Dict[BucketKey, Deque[Tuple[int, float, Any]]] = {}
+        self.size = 0
+
+
+class FairReadyQueue:
+    """
+    가중 공정 준비 큐
+    - 유효 우선순위 = priority + 대기시간 // aging_sec (낮은 우선순위도 결국 앞으로 옴)
+    - 유효 우선순위가 같으면 served/weight 가 가장 작은 흐름(flow)부터
+    - 같은 흐름·우선순위·풀 안에서는 FIFO
+    """
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None, aging_sec: float = 60.0):
+        self._flows: Dict[str, _Flow] = {}
+        self._where: Dict[Any, Tuple[str, BucketKey]] = {}
+        self._seq = itertools.count()
+        self._size = 0
+        self.weights: Dict[str, float] = dict(weights or {})
+        self.aging_sec = aging_sec
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, task: Any) -> bool:
+        return task in self._where
+
+    def __iter__(self):
+        for flow in self._flows.values():
+            for bucket in flow.buckets.values():
+                for _, _, task in bucket:
+                    yield task
+
+    def weight_for(self, key: str) -> float:
+        """정확히 일치 → 접두사 일치(anime_downloader → anime_downloader_ohli24) → 1"""
+        if key in self.weights:
+            return self.weights[key]
+        for name, weight in self.weights.items():
+            if key.startswith(name):
+                return weight
+        return 1.0
+
+    def push(self, task: Any, flow_key: str, priority: int = 0, pool: PoolKey = ('', '')) -> None:
+        flow = self._flows.get(flow_key)
+        if flow is None:
+            # 새로 활성화된 흐름은 현재 최소 서비스량부터 시작 (쌓인 크레딧으로 독점 방지)
+            base = min((f.served for f in self._flows.values()), default=0.0)
+            flow = _Flow(flow_key, max(0.01, self.weight_for(flow_key)), base)
+            self._flows[flow_key] = flow
+        bucket_key = (priority, pool)
+        flow.buckets.setdefault(bucket_key, deque()).append((next(self._seq), time.monotonic(), task))
+        flow.size += 1
+        self._size += 1
+        self._where[task] = (flow_key, bucket_key)
+
+    def remove(self, task: Any) -> bool:
+        where = self._where.pop(task, None)
+        if where is None:
+            return False
+        flow = self._flows[where[0]]
+        bucket = flow.buckets[where[1]]
+        for entry in bucket:
+            if entry[2] is task:
+                bucket.remove(entry)
+                break
+        self._consumed(flow, where[1])
+        return True
+
+    def pop(self, eligible: Optional[Callable[[PoolKey], bool]] = None) -> Any:
+        """풀 여유가 있는(eligible) 버킷 중 최우선 태스크를 꺼냄. 없으면 None"""
+        best = self._select(time.monotonic(), eligible)
+        if best is None:
+            return None
+        flow, bucket_key = best
+        _, _, task = flow.buckets[bucket_key].popleft()
+        del self._where[task]
+        flow.served += 1.0 / flow.weight
+        self._consumed(flow, bucket_key)
+        return task
+
+    def clear(self) -> None:
+        self._flows.clear()
+        self._where.clear()
+        self._size = 0
+
+    def positions(self) -> Dict[Any, int]:
+        """현재 시점 기준 예상 디스패치 순서 (1부터). 풀 제한은 고려하지 않은 추정치"""
+        now = time.monotonic()
+        cursor = {
+            (flow.key, bucket_key): [flow, bucket_key, list(bucket), 0]
+            for flow in self._flows.values()
+            for bucket_key, bucket in flow.buckets.items()
+        }
+        served = {key: flow.served for key, flow in self._flows.items()}
+        order: Dict[Any, int] = {}
+        for position in range(1, self._size + 1):
+            best_rank, best_cur = None, None
+            for cur in cursor.values():
+                flow, bucket_key, items, idx = cur
+                if idx >= len(items):
+                    continue
+                rank = self._rank(now, bucket_key[0], items[idx], served[flow.key])
+                if best_rank is None or rank < best_rank:
+                    best_rank, best_cur = rank, cur
+            if best_cur is None:
+                break
+            flow, _, items, idx = best_cur
+            order[items[idx][2]] = position
+            best_cur[3] += 1
+            served[flow.key] += 1.0 / flow.weight
+        return order
+
+    def _rank(self, now: float, priority: int, entry: Tuple[int, float, Any], served: float):
+        seq, enqueued, _ = entry
+        effective = priority
+        if self.aging_sec > 0:
+            effective += int((now - enqueued) / self.aging_sec)
+        return (-effective, served, seq)
+
+    def _select(self, now: float, eligible: Optional[Callable[[PoolKey], bool]]) -> Optional[Tuple[_Flow, BucketKey]]:
+        best_rank, best = None, None
+        for flow in self._flows.values():
+            for bucket_key, bucket in flow.buckets.items():
+                if eligible is not None and not eligible(bucket_key[1]):
+                    continue
+                rank = self._rank(now, bucket_key[0], bucket[0], flow.served)
+                if best_rank is None or rank < best_rank:
+                    best_rank, best = rank, (flow, bucket_key)
+        return best
+
+    def _consumed(self, flow: _Flow, bucket_key: BucketKey) -> None:
+        flow.size -= 1
+        self._size -= 1
+        if not flow.buckets[bucket_key]:
+            del flow.buckets[bucket_key]
+        if flow.size == 0:
+            del self._flows[flow.key]
+
+
+class DownloadScheduler:
+    """고정 워커 풀 기반 이벤트 구동 스케줄러"""
+
+    # 대기 순번 스냅샷 재계산 최소 간격 (get_status 호출마다 시뮬레이션 방지)
+    POSITION_REFRESH_SEC = 1.0
+
+    def __init__(self, max_workers: int = 3, runner: Optional[Callable[[Any], None]] = None, name: str = 'gdm-worker'):
+        self._cond = threading.Condition()
+        self._ready = FairReadyQueue()
+        self._workers: List[threading.Thread] = []
+        self._limit = max(1, int(max_workers))
+        self._running = 0
+        self._stopped = False
+        self._name = name
+        self._runner = runner or (lambda task: task._run())
+        self._positions: Dict[Any, int] = {}
+        self._positions_at = 0.0
+        # 풀별 동시 실행 제한 (0 또는 미지정: 제한 없음, 전역 상한만 적용)
+        self._source_limits: Dict[str, int] = {}
+        self._host_limits: Dict[str, int] = {}
+        self._default_host_limit = 0
+        self._running_by_source: Dict[str, int] = {}
+        self._running_by_host: Dict[str, int] = {}
+        # 지연 큐 (재시도 백오프 등): (실행 시각 monotonic, seq, task), 대기 중 슬롯을 점유하지 않음
+        self._delayed: List[Tuple[float, int, Any]] = []
+        self._delay_seq = 0
+        self._spawn_workers()
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    @property
+    def running_count(self) -> int:
+        return self._running
+
+    @property
+    def waiting_count(self) -> int:
+        return len(self._ready)
+
+    @property
+    def delayed_count(self) -> int:
+        return len(self._delayed)
+
+    @property
+    def worker_count(self) -> int:
+        return len(self._workers)
+
+    def configure(
+        self,
+        weights: Optional[Dict[str, float]] = None,
+        aging_sec: Optional[float] = None,
+        source_limits: Optional[Dict[str, int]] = None,
+        host_limits: Optional[Dict[str, int]] = None,
+        default_host_limit: Optional[int] = None,
+    ) -> None:
+        """공정 큐잉 가중치/에이징 및 풀 제한 변경 (가중치는 새로 활성화되는 흐름부터 적용)"""
+        with self._cond:
+            if weights is not None:
+                self._ready.weights = dict(weights)
+            if aging_sec is not None:
+                self._ready.aging_sec = max(0.0, float(aging_sec))
+            if source_limits is not None:
+                self._source_limits = {k.lower(): int(v) for k, v in source_limits.items()}
+            if host_limits is not None:
+                self._host_limits = {k.lower(): int(v) for k, v in host_limits.items()}
+            if default_host_limit is not None:
+                self._default_host_limit = max(0, int(default_host_limit))
+            # 제한이 완화됐을 수 있으므로 대기 워커 모두 재평가
+            self._cond.notify_all()
+
+    def submit(self, task: Any) -> None:
+        """태스크를 준비 큐에 넣고 대기 중인 워커 하나를 깨움"""
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError('scheduler is stopped')
+            self._ready.push(
+                task,
+                self._flow_key(task),
+                int(getattr(task, 'priority', 0) or 0),
+                self._pool_key(task),
+            )
+            self._cond.notify()
+
+    def submit_many(self, tasks: List[Any]) -> None:
+        """여러 태스크를 한 번의 잠금으로 준비 큐에 넣음 (워커가 일부만 보는 중간 상태 없음)"""
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError('scheduler is stopped')
+            for task in tasks:
+                self._ready.push(
+                    task,
+                    self._flow_key(task),
+                    int(getattr(task, 'priority', 0) or 0),
+                    self._pool_key(task),
+                )
+            self._cond.notify_all()
+
+    def submit_after(self, task: Any, delay: float) -> None:
+        """delay 초 뒤 준비 큐에 넣음 (그 전까지 슬롯/워커를 점유하지 않음)"""
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError('scheduler is stopped')
+            self._delay_seq += 1
+            heapq.heappush(self._delayed, (time.monotonic() + max(0.0, delay), self._delay_seq, task))
+            # 가장 이른 실행 시각이 바뀌었을 수 있으므로 대기 워커가 타임아웃을 다시 계산
+            self._cond.notify_all()
+
+    def remove(self, task: Any) -> bool:
+        """아직 디스패치되지 않은 태스크를 준비 큐/지연 큐에서 제거"""
+        with self._cond:
+            removed = self._ready.remove(task)
+            if not removed:
+                kept = [entry for entry in self._delayed if entry[2] is not task]
+                if len(kept) != len(self._delayed):
+                    self._delayed = kept
+                    heapq.heapify(self._delayed)
+                    removed = True
+            return removed
+
+    def delayed(self) -> List[Tuple[Any, float]]:
+        """지연 큐 스냅샷: (task, 남은 초) 실행 시각 순"""
+        with self._cond:
+            now = time.monotonic()
+            return [(task, max(0.0, due - now)) for due, _, task in sorted(self._delayed, key=lambda e: (e[0], e[1]))]
+
+    def position(self, task: Any) -> Optional[int]:
+        """대기 중인 태스크의 유효 대기 순번 (1 = 다음 디스패치 대상)"""
+        with self._cond:
+            # 준비 큐에 없으면(지연 큐/제출 전) 시뮬레이션 없이 None
+            if task not in self._ready:
+                return None
+            # 스냅샷이 오래됐을 때만 재계산 (막 들어온 태스크는 다음 갱신까지 None)
+            now = time.monotonic()
+            if now - self._positions_at >= self.POSITION_REFRESH_SEC:
+                self._positions = self._ready.positions()
+                self._positions_at = now
+            return self._positions.get(task)
+
+    def pool_usage(self) -> Dict[str, Dict[str, int]]:
+        """풀별 실행 중 개수 스냅샷"""
+        with self._cond:
+            return {
+                'source': dict(self._running_by_source),
+                'host': dict(self._running_by_host),
+            }
+
+    def resize(self, max_workers: int) -> None:
+        """
+        실행 중에도 동시 실행 상한 변경
+        - 늘리면 워커를 추가해 대기 태스크를 즉시 디스패치
+        - 줄이면 실행 중 태스크는 끝까지 진행, 초과 워커는 현재 태스크를 마친 뒤 종료하므로
+          실행 수가 새 상한 아래로 내려갈 때까지 새 태스크를 받지 않음
+        """
+        with self._cond:
+            self._limit = max(1, int(max_workers))
+            self._spawn_workers()
+            # 유휴 초과 워커는 즉시 깨어나 종료, 새 워커는 대기 태스크를 가져감
+            self._cond.notify_all()
+
+    def shutdown(self, clear: bool = True) -> List[Any]:
+        """워커 종료. 디스패치되지 못한 태스크 목록 반환"""
+        with self._cond:
+            self._stopped = True
+            pending = list(self._ready) + [entry[2] for entry in self._delayed]
+            if clear:
+                self._ready.clear()
+                self._delayed = []
+            self._cond.notify_all()
+        return pending
+
+    @staticmethod
+    def _flow_key(task: Any) -> str:
+        return getattr(task, 'caller_plugin', None) or getattr(task, 'source_type', None) or 'default'
+
+    @staticmethod
+    def _pool_key(task: Any) -> PoolKey:
+        source = (getattr(task, 'source_type', None) or '').lower()
+        try:
+            host = (urlparse(getattr(task, 'url', '') or '').hostname or '').lower()
+        except ValueError:
+            host = ''
+        return (source, host)
+
+    def _host_limit(self, host: str) -> int:
+        """정확히 일치 → 상위 도메인 일치(example.com → cdn1.example.com) → 기본값"""
+        if host in self._host_limits:
+            return self._host_limits[host]
+        for name, limit in self._host_limits.items():
+            if host.endswith('.' + name):
+                return limit
+        return self._default_host_limit
+
+    def _has_capacity(self, pool: PoolKey) -> bool:
+        # _cond 보유 상태에서 호출
+        source, host = pool
+        source_limit = self._source_limits.get(source, 0)
+        if source_limit > 0 and self._running_by_source.get(source, 0) >= source_limit:
+            return False
+        if host:
+            host_limit = self._host_limit(host)
+            if host_limit > 0 and self._running_by_host.get(host, 0) >= host_limit:
+                return False
+        return True
+
+    def _acquire_pool(self, pool: PoolKey) -> None:
+        source, host = pool
+        self._running_by_source[source] = self._running_by_source.get(source, 0) + 1
+        if host:
+            self._running_by_host[host] = self._running_by_host.get(host, 0) + 1
+
+    def _release_pool(self, pool: PoolKey) -> None:
+        source, host = pool
+        self._decrement(self._running_by_source, source)
+        if host:
+            self._decrement(self._running_by_host, host)
+
+    @staticmethod
+    def _decrement(counter: Dict[str, int], key: str) -> None:
+        left = counter.get(key, 0) - 1
+        if left > 0:
+            counter[key] = left
+        else:
+            counter.pop(key, None)
+
+    def _promote_due(self) -> None:
+        # _cond 보유 상태에서 호출. 실행 시각이 된 지연 태스크를 준비 큐로 이동
+        now = time.monotonic()
+        while self._delayed and self._delayed[0][0] <= now:
+            _, _, task = heapq.heappop(self._delayed)
+            self._ready.push(
+                task,
+                self._flow_key(task),
+                int(getattr(task, 'priority', 0) or 0),
+                self._pool_key(task),
+            )
+
+    def _spawn_workers(self) -> None:
+        # _cond 보유 상태에서 호출. 종료 예정인 초과 워커도 목록에 남아 있으므로
+        # 줄였다가 바로 다시 늘려도 실행 수가 상한을 넘지 않음
+        self._workers = [w for w in self._workers if w.is_alive()]
+        while len(self._workers) < self._limit:
+            worker = threading.Thread(
+                target=self._worker_loop,
+                name=f'{self._name}-{len(self._workers) + 1}',
+                daemon=True,
+            )
+            self._workers.append(worker)
+            worker.start()
+
+    def _worker_loop(self) -> None:
+        me = threading.current_thread()
+        while True:
+            with self._cond:
+                while True:
+                    if self._stopped or len(self._workers) > self._limit:
+                        if me in self._workers:
+                            self._workers.remove(me)
+                        return
+                    self._promote_due()
+                    task = self._ready.pop(self._has_capacity) if self._ready else None
+                    if task is not None:
+                        break
+                    # 지연 큐가 있으면 가장 이른 실행 시각까지만 대기
+                    timeout = max(0.0, self._delayed[0][0] - time.monotonic()) if self._delayed else None
+                    self._cond.wait(timeout)
+                pool = self._pool_key(task)
+                self._acquire_pool(pool)
+                self._running += 1
+            try:
+                self._runner(task)
+            except Exception as e:
+                logger.error(f'[GDM] scheduler runner error: {e}')
+                logger.error(traceback.format_exc())
+            finally:
+                with self._cond:
+                    self._running -= 1
+                    self._release_pool(pool)
+                    # 풀 슬롯이 비었으므로 막혀 있던 대기 태스크를 다른 워커가 가져갈 수 있음
+                    self._cond.notify_all()
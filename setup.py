@@ -81,40 +81,38 @@ try:
             return jsonify({'ret': 'error', 'msg': 'URL이 필요합니다.'})
         
         try:
-            import yt_dlp
-            ydl_opts = {'quiet': True, 'no_warnings': True}
+            # 추출 결과는 공유 캐시에 남아 이어지는 다운로드가 재사용
+            from .info_cache import InfoCache
+            info = InfoCache.shared().get(url)
             
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-                
-                formats = [{'id': 'bestvideo+bestaudio/best', 'label': '최고 품질', 'note': ''}]
-                heights = set()
-                for f in info.get('formats', []):
-                    h = f.get('height')
-                    if h and f.get('vcodec') != 'none':
-                        heights.add(h)
-                
-                for h in sorted(heights, reverse=True):
-                    if h >= 2160: formats.append({'id': 'bestvideo[height<=2160]+bestaudio/best', 'label': '4K', 'note': ''})
-                    elif h >= 1080: formats.append({'id': 'bestvideo[height<=1080]+bestaudio/best', 'label': '1080p', 'note': '권장'})
-                    elif h >= 720: formats.append({'id': 'bestvideo[height<=720]+bestaudio/best', 'label': '720p', 'note': ''})
-                
-                formats.append({'id': 'bestaudio/best', 'label': '오디오만', 'note': ''})
-                
-                # 중복 제거
-                seen, unique = set(), []
-                for f in formats:
-                    if f['id'] not in seen:
-                        seen.add(f['id'])
-                        unique.append(f)
-                
-                return jsonify({
-                    'ret': 'success',
-                    'title': info.get('title', ''),
-                    'thumbnail': info.get('thumbnail', ''),
-                    'duration': info.get('duration', 0),
-                    'formats': unique
-                })
+            formats = [{'id': 'bestvideo+bestaudio/best', 'label': '최고 품질', 'note': ''}]
+            heights = set()
+            for f in info.get('formats', []):
+                h = f.get('height')
+                if h and f.get('vcodec') != 'none':
+                    heights.add(h)
+            
+            for h in sorted(heights, reverse=True):
+                if h >= 2160: formats.append({'id': 'bestvideo[height<=2160]+bestaudio/best', 'label': '4K', 'note': ''})
+                elif h >= 1080: formats.append({'id': 'bestvideo[height<=1080]+bestaudio/best', 'label': '1080p', 'note': '권장'})
+                elif h >= 720: formats.append({'id': 'bestvideo[height<=720]+bestaudio/best', 'label': '720p', 'note': ''})
+            
+            formats.append({'id': 'bestaudio/best', 'label': '오디오만', 'note': ''})
+            
+            # 중복 제거
+            seen, unique = set(), []
+            for f in formats:
+                if f['id'] not in seen:
+                    seen.add(f['id'])
+                    unique.append(f)
+            
+            return jsonify({
+                'ret': 'success',
+                'title': info.get('title', ''),
+                'thumbnail': info.get('thumbnail', ''),
+                'duration': info.get('duration', 0),
+                'formats': unique
+            })
         except Exception as e:
             return jsonify({'ret': 'error', 'msg': str(e)})
     
@@ -0,0 +1,137 @@
+"""
+aria2c 연결 수 적응 제어 (호스트별)
+- TransferMeter: 누적 수신 바이트 표본으로 실제 전송 중인 시간만 계산 (일시정지/추출/병합 시간 제외)
+- ConnectionTuner: 완료 태스크의 처리량을 (호스트, 연결 수)별 EWMA 로 기록하고
+  다음 다운로드에 가장 빠른 연결 수를 선택, 일정 확률로 사다리의 이웃 값(덜 시험한 쪽 우선)을 탐색
+- 속도 제한이 걸린 채 받은 태스크는 연결 수와 무관하게 상한에 묶이므로 기록하지 않음
+"""
+import random
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from .setup import P
+    logger = P.logger
+except:
+    import logging
+    logger = logging.getLogger(__name__)
+
+
+LADDER = (1, 2, 4, 6, 8, 12, 16)  # aria2c -x 최대 16
+
+
+class TransferMeter:
+    """누적 바이트 표본 → (전송 바이트, 전송 시간)"""
+
+    MAX_GAP_SEC = 3.0  # 표본 간격이 이보다 길면 멈춰 있던 구간으로 보고 제외
+
+    def __init__(self):
+        self.bytes = 0
+        self.seconds = 0.0
+        self.limited = False  # 속도 제한이 걸린 표본이 있었음
+        self._prev = 0
+        self._stamp: Optional[float] = None
+
+    def sample(self, total_bytes: int, rate_limited: bool = False) -> None:
+        now = time.monotonic()
+        total_bytes = int(total_bytes or 0)
+        # 파일 전환(비디오→오디오 등)으로 누적값이 줄면 새 기준점
+        delta = total_bytes - self._prev if total_bytes >= self._prev else total_bytes
+        self._prev = total_bytes
+        if delta <= 0:
+            self._stamp = now
+            return
+        if self._stamp is not None and now - self._stamp <= self.MAX_GAP_SEC:
+            self.seconds += now - self._stamp
+            self.bytes += delta
+        self._stamp = now
+        self.limited = self.limited or rate_limited
+
+
+class ConnectionTuner:
+    """호스트별 연결 수 선택 / 처리량 기록"""
+
+    ALPHA = 0.3  # EWMA 가중치 (CDN 상태 변화를 따라가도록 최근 표본 비중 높게)
+    MIN_BYTES = 4 * 1024 * 1024
+    MIN_SECONDS = 2.0
+
+    def __init__(self, explore: float = 0.15):
+        self.enabled = True
+        self.explore = explore
+        self._lock = threading.Lock()
+        # host → {connections: [bps, samples, updated(epoch)]}
+        self._table: Dict[str, Dict[int, List[float]]] = {}
+
+    def configure(self, enabled: Optional[bool] = None, explore: Optional[float] = None) -> None:
+        if enabled is not None:
+            self.enabled = bool(enabled)
+        if explore is not None:
+            self.explore = max(0.0, min(1.0, float(explore)))
+
+    def load(self, rows: Iterable[Tuple[str, int, float, int, float]]) -> None:
+        """(host, connections, bps, samples, updated) 목록으로 표 복원"""
+        with self._lock:
+            self._table.clear()
+            for host, connections, bps, samples, updated in rows:
+                self._table.setdefault(host, {})[int(connections)] = [float(bps), int(samples), float(updated or 0)]
+
+    def choose(self, host: str, default: int) -> int:
+        """다음 다운로드 연결 수 (기록 없으면 기본값)"""
+        default = max(1, min(16, int(default or 16)))
+        if not self.enabled or not host:
+            return default
+        with self._lock:
+            stats = dict(self._table.get(host) or {})
+        if not stats:
+            return default
+        best = max(stats, key=lambda c: stats[c][0])
+        if random.random() >= self.explore:
+            return best
+        ladder = sorted(set(LADDER) | {default, best})
+        index = ladder.index(best)
+        neighbours = [ladder[i] for i in (index - 1, index + 1) if 0 <= i < len(ladder)]
+        fewest = min(stats.get(c, [0, 0])[1] for c in neighbours)
+        return random.choice([c for c in neighbours if stats.get(c, [0, 0])[1] == fewest])
+
+    def record(self, host: str, connections: int, nbytes: int, seconds: float) -> Optional[Tuple[float, int]]:
+        """처리량 표본 반영, 반영했으면 (EWMA bps, 표본 수) 반환 (너무 작은 전송은 무시)"""
+        if not host or not connections or nbytes < self.MIN_BYTES or seconds < self.MIN_SECONDS:
+            return None
+        bps = nbytes / seconds
+        with self._lock:
+            entry = self._table.setdefault(host, {}).get(int(connections))
+            if entry is None:
+                entry = self._table[host][int(connections)] = [bps, 0, 0.0]
+            else:
+                entry[0] = entry[0] * (1 - self.ALPHA) + bps * self.ALPHA
+            entry[1] += 1
+            entry[2] = time.time()
+            result = (entry[0], entry[1])
+        logger.debug(f'[GDM] throughput {host} x{connections}: {bps / 1024 ** 2:.2f}MB/s (ewma {result[0] / 1024 ** 2:.2f}MB/s)')
+        return result
+
+    def reset(self, host: Optional[str] = None) -> None:
+        with self._lock:
+            if host:
+                self._table.pop(host, None)
+            else:
+                self._table.clear()
+
+    def table(self) -> List[Dict[str, Any]]:
+        """설정 화면 표시용 (호스트 이름순, 연결 수 오름차순)"""
+        with self._lock:
+            snapshot = {host: {c: list(v) for c, v in stats.items()} for host, stats in self._table.items()}
+        rows = []
+        for host in sorted(snapshot):
+            stats = snapshot[host]
+            best = max(stats, key=lambda c: stats[c][0])
+            rows.append({
+                'host': host,
+                'best': best,
+                'entries': [
+                    {'connections': c, 'mbps': round(stats[c][0] / 1024 ** 2, 2), 'samples': int(stats[c][1])}
+                    for c in sorted(stats)
+                ],
+            })
+        return rows